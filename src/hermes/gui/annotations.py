@@ -0,0 +1,272 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from bisect import bisect_left, bisect_right, insort
+from threading import Lock
+from dash import Output, Input
+import plotly.colors as pc
+import numpy as np
+
+from hermes.base.stream import Stream
+from hermes.gui.gui_utils import app
+
+NOTES_DEVICE_NAME = "experiment-notes"
+NOTES_STREAM_NAME = "notes"
+
+
+class AnnotationTimeline:
+    """Thread-safe, time-sorted index of activity marks and notes, for overlays on plots.
+
+    Each activity lasts until the next activity is marked, and each note is a single instant.
+    Annotations are kept in one list sorted by time, so the ones in a visible time range
+    form a contiguous span of indices, found by binary search. Indices stay stable
+    while annotations arrive in time order, letting widgets draw them incrementally.
+    An annotation arriving out of order bumps the `generation`, so widgets redraw all.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._generation: int = 0
+        self._times_s: list[float] = []
+        self._labels: list[str] = []
+        self._is_activity: list[bool] = []
+        self._activity_times_s: list[float] = []
+        self._colors: dict[str, str] = {}
+        self._palette = pc.qualitative.Plotly
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def add_activity(self, time_s: float, label: str) -> None:
+        """Mark the start of an activity, which ends the previous one.
+
+        Args:
+            time_s (float): Start time of the activity.
+            label (str): Name of the activity.
+        """
+        with self._lock:
+            self._insert(time_s, label, True)
+            insort(self._activity_times_s, time_s)
+            if label not in self._colors:
+                self._colors[label] = self._palette[
+                    len(self._colors) % len(self._palette)
+                ]
+
+    def add_note(self, time_s: float, text: str) -> None:
+        """Add a note at an instant.
+
+        Args:
+            time_s (float): Time of the note.
+            text (str): Content of the note.
+        """
+        with self._lock:
+            self._insert(time_s, text, False)
+
+    def on_data_packet(
+        self, process_time_s: float, data: dict, stream: Stream | None = None
+    ) -> None:
+        """Add the note carried by a received data packet, if any.
+
+        The note is placed at the timestamp it was entered at, as buffered in the `Stream`
+        the packet was appended to, on the clock of the plotted samples, falling back
+        to the packet's time-of-arrival.
+
+        Args:
+            process_time_s (float): Time-of-arrival of the packet.
+            data (dict): Newly received sample, keyed by device and sub-stream names.
+            stream (Stream | None, optional): `Stream` the packet was appended to. Defaults to `None`.
+        """
+        note = (data.get(NOTES_DEVICE_NAME) or {}).get(NOTES_STREAM_NAME)
+        if note is None:
+            return
+        time_s = process_time_s
+        if stream is not None:
+            new_data = stream.get_data(
+                device_name=NOTES_DEVICE_NAME,
+                stream_name=NOTES_STREAM_NAME,
+                starting_index=-1,
+            )
+            if new_data is not None and len(new_data["time_s"]):
+                time_s = new_data["time_s"][-1]
+        note = (
+            np.asarray(note).ravel()[0] if not isinstance(note, (str, bytes)) else note
+        )
+        if isinstance(note, bytes):
+            note = note.decode("utf-8", errors="replace")
+        self.add_note(time_s, str(note))
+
+    def get_span(self, start_s: float, end_s: float) -> tuple[int, int, int]:
+        """Find the annotations visible within a time range, in O(log n).
+
+        Includes the activity in progress at `start_s`, if any.
+
+        Args:
+            start_s (float): Start of the visible range.
+            end_s (float): End of the visible range.
+
+        Returns:
+            tuple[int, int, int]: Generation of the index, and the start and end indices of the span.
+        """
+        with self._lock:
+            lo = bisect_left(self._times_s, start_s)
+            i = bisect_right(self._activity_times_s, start_s)
+            if i > 0:
+                lo = min(lo, bisect_left(self._times_s, self._activity_times_s[i - 1]))
+            hi = max(lo, bisect_right(self._times_s, end_s))
+            return self._generation, lo, hi
+
+    def get_shapes(self, lo: int, hi: int, now_s: float) -> list[dict]:
+        """Build the Plotly layout shapes of a span of annotations.
+
+        Args:
+            lo (int): Start index of the span.
+            hi (int): End index of the span.
+            now_s (float): End of the activity still in progress.
+
+        Returns:
+            list[dict]: Shaded region for each activity and vertical line for each note, named '<generation>:<index>'.
+        """
+        with self._lock:
+            return [self._get_shape(k, now_s) for k in range(lo, hi)]
+
+    def get_end(self, index: int, now_s: float) -> float:
+        """Get the end time of an activity.
+
+        Args:
+            index (int): Index of the activity.
+            now_s (float): End of the activity still in progress.
+
+        Returns:
+            float: Start time of the next activity, or `now_s` if none marked yet.
+        """
+        with self._lock:
+            return self._get_end(index, now_s)
+
+    def _insert(self, time_s: float, label: str, is_activity: bool) -> None:
+        """[Internal] Non thread-safe insertion in time order."""
+        k = bisect_right(self._times_s, time_s)
+        if k < len(self._times_s):
+            # Shifts indices of the later annotations, invalidating drawn ones.
+            self._generation += 1
+        self._times_s.insert(k, time_s)
+        self._labels.insert(k, label)
+        self._is_activity.insert(k, is_activity)
+
+    def _get_end(self, index: int, now_s: float) -> float:
+        i = bisect_right(self._activity_times_s, self._times_s[index])
+        return (
+            self._activity_times_s[i]
+            if i < len(self._activity_times_s)
+            else max(now_s, self._times_s[index])
+        )
+
+    def _get_shape(self, index: int, now_s: float) -> dict:
+        time_s = self._times_s[index]
+        name = "%d:%d" % (self._generation, index)
+        if self._is_activity[index]:
+            return {
+                "type": "rect",
+                "name": name,
+                "xref": "x",
+                "yref": "paper",
+                "x0": time_s,
+                "x1": self._get_end(index, now_s),
+                "y0": 0,
+                "y1": 1,
+                "fillcolor": self._colors[self._labels[index]],
+                "opacity": 0.15,
+                "layer": "below",
+                "line": {"width": 0},
+                "label": {
+                    "text": self._labels[index],
+                    "textposition": "top left",
+                    "font": {"size": 10},
+                },
+            }
+        else:
+            return {
+                "type": "line",
+                "name": name,
+                "xref": "x",
+                "yref": "paper",
+                "x0": time_s,
+                "x1": time_s,
+                "y0": 0,
+                "y1": 1,
+                "line": {"width": 1, "dash": "dot", "color": "#6c757d"},
+                "label": {
+                    "text": self._labels[index],
+                    "textposition": "end",
+                    "textangle": 0,
+                    "font": {"size": 10},
+                },
+            }
+
+
+def add_shapes_probe(graph_id: str | dict, store_id: str | dict) -> None:
+    """Report the span of annotations drawn on a client's figure to the server via a `dcc.Store`.
+
+    Runs in the browser after every figure update, reading the names of the first and last
+    shapes, so the server can send only the shapes that changed to each client.
+
+    Args:
+        graph_id (str | dict): Id, or pattern-matching id, of the `dcc.Graph` with the annotation shapes.
+        store_id (str | dict): Id, or pattern-matching id, of the `dcc.Store` receiving the generation,
+            span, and last drawn activity.
+    """
+    app.clientside_callback(
+        """
+        function(figure) {
+            var shapes = (figure && figure.layout && figure.layout.shapes) || [];
+            if (!shapes.length) {
+                return null;
+            }
+            var first = shapes[0].name.split(':');
+            var last = shapes[shapes.length - 1].name.split(':');
+            var activity = null;
+            for (var k = shapes.length - 1; k >= 0; k--) {
+                if (shapes[k].type === 'rect') {
+                    activity = Number(shapes[k].name.split(':')[1]);
+                    break;
+                }
+            }
+            return {
+                generation: Number(first[0]),
+                lo: Number(first[1]),
+                hi: Number(last[1]) + 1,
+                activity: activity
+            };
+        }
+        """,
+        Output(store_id, component_property="data"),
+        Input(graph_id, component_property="figure"),
+    )
+
+
+# Shared by all widgets of the dashboard, like the Dash `app`.
+annotation_timeline = AnnotationTimeline()
@@ -0,0 +1,183 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import gzip
+import re
+import time
+from threading import Lock
+from flask import Flask, Response, request
+
+try:
+    import brotli
+
+    IS_BROTLI_AVAILABLE = True
+except ImportError:
+    IS_BROTLI_AVAILABLE = False
+
+
+# Base64 images embedded in JSON, e.g. video frames in figure updates, don't compress further.
+_IMAGE_DATA_URI = re.compile(rb"data:image/(?:jpeg|png|webp);base64,[A-Za-z0-9+/=]+")
+
+
+class ResponseCompressor:
+    """Payload-aware compression of the Flask server's responses.
+
+    Compresses large text and JSON responses, like Dash update callbacks full of numeric
+    arrays, with Brotli (if installed) or gzip at a fast level, as accepted by the client.
+    Skips small responses, streamed ones (MJPEG, file downloads), already compressed media
+    types, and JSON mostly made of base64-encoded JPEG/PNG images. Keeps track of the
+    compression ratio and CPU time spent per content type, for diagnostics.
+    """
+
+    def __init__(
+        self,
+        min_size_bytes: int = 1024,
+        gzip_level: int = 1,
+        brotli_quality: int = 1,
+        max_image_ratio: float = 0.5,
+        is_brotli: bool = True,
+    ):
+        """Constructor of the response compressor.
+
+        Args:
+            min_size_bytes (int, optional): Size below which responses are sent as is. Defaults to `1024`.
+            gzip_level (int, optional): Gzip compression level, favoring speed. Defaults to `1`.
+            brotli_quality (int, optional): Brotli compression quality, favoring speed. Defaults to `1`.
+            max_image_ratio (float, optional): Share of base64 images in a response above which to not compress it. Defaults to `0.5`.
+            is_brotli (bool, optional): Whether to prefer Brotli over gzip, if installed. Defaults to `True`.
+        """
+        self._min_size_bytes = min_size_bytes
+        self._gzip_level = gzip_level
+        self._brotli_quality = brotli_quality
+        self._max_image_ratio = max_image_ratio
+        self._is_brotli = is_brotli and IS_BROTLI_AVAILABLE
+        self._lock = Lock()
+        self._statistics: dict[str, dict[str, float]] = {}
+
+    def init_app(self, server: Flask) -> None:
+        """Compress the responses of a Flask server from now on.
+
+        Args:
+            server (Flask): Server to compress the responses of.
+        """
+        server.after_request(self._compress)
+
+    def get_statistics(self) -> dict[str, dict[str, float]]:
+        """Summarize the compression of the responses so far, per content type.
+
+        Returns:
+            dict[str, dict[str, float]]: Number of compressed responses and of those skipped for carrying mostly images,
+                bytes in and out, compression ratio, and CPU time spent per compressed MB, keyed by content type.
+        """
+        with self._lock:
+            summary = {}
+            for mimetype, s in self._statistics.items():
+                summary[mimetype] = {
+                    **s,
+                    "ratio": (
+                        s["bytes_in"] / s["bytes_out"] if s["bytes_out"] else None
+                    ),
+                    "cpu_ms_per_mb": (
+                        1000 * s["cpu_s"] / (s["bytes_in"] / 2**20)
+                        if s["bytes_in"]
+                        else None
+                    ),
+                }
+            return summary
+
+    def _compress(self, response: Response) -> Response:
+        """[Internal] Compress the response in place, if it pays off."""
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code != 200
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+        mimetype = response.mimetype or ""
+        if not (
+            mimetype.startswith("text/")
+            or mimetype in ("application/json", "application/javascript")
+            or mimetype.endswith("+json")
+            or mimetype == "image/svg+xml"
+        ):
+            return response
+
+        accepted = request.headers.get("Accept-Encoding", "")
+        if self._is_brotli and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            return response
+
+        body = response.get_data()
+        if len(body) < self._min_size_bytes:
+            return response
+        if b";base64," in body:
+            num_image_bytes = sum(
+                m.end() - m.start() for m in _IMAGE_DATA_URI.finditer(body)
+            )
+            if num_image_bytes > self._max_image_ratio * len(body):
+                self._record(mimetype, len(body), None, 0.0)
+                return response
+
+        start_s = time.thread_time()
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=self._brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=self._gzip_level)
+        self._record(mimetype, len(body), len(compressed), time.thread_time() - start_s)
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        response.headers["Content-Length"] = str(len(compressed))
+        response.vary.add("Accept-Encoding")
+        return response
+
+    def _record(
+        self, mimetype: str, bytes_in: int, bytes_out: int | None, cpu_s: float
+    ) -> None:
+        """[Internal] Account for a compressed, or skipped if `bytes_out` is `None`, response."""
+        with self._lock:
+            s = self._statistics.setdefault(
+                mimetype,
+                {
+                    "num_compressed": 0,
+                    "num_skipped": 0,
+                    "bytes_in": 0,
+                    "bytes_out": 0,
+                    "cpu_s": 0.0,
+                },
+            )
+            if bytes_out is None:
+                s["num_skipped"] += 1
+            else:
+                s["num_compressed"] += 1
+                s["bytes_in"] += bytes_in
+                s["bytes_out"] += bytes_out
+                s["cpu_s"] += cpu_s
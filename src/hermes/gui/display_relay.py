@@ -0,0 +1,234 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import argparse
+import zmq
+
+from hermes.utils.msgpack_utils import deserialize, serialize
+from hermes.utils.time_utils import get_time
+from hermes.utils.zmq_utils import *
+
+PORT_DISPLAY_RELAY = "42073"
+DEFAULT_RELAY_RATE_HZ = 30.0
+
+
+class DisplayRelay:
+    """Per-host forwarder of display-rate data to remote aggregating dashboards.
+
+    Runs next to the master Broker of a HERMES host, subscribes to the local data of
+    the requested topics, and republishes the latest sample of each device at most
+    `max_rate_hz` times per second. Only display-rate data therefore crosses the network
+    to a `DataVisualizer` aggregating several hosts. Devices sharing a topic are
+    downsampled independently, so a fast device does not starve a slow one, and the
+    latest sample held back within a period is sent once the period elapses, so the
+    newest state of every device always reaches the dashboard. End-of-stream packets
+    are forwarded after the samples held back on their topic.
+
+    Forwarded devices no longer carry contiguous samples, so a device whose widgets need
+    every sample (e.g. a spectrogram) should be given a rate limit of `inf`.
+    """
+
+    def __init__(
+        self,
+        topics: list[str],
+        max_rate_hz: float = DEFAULT_RELAY_RATE_HZ,
+        rate_limits_hz: dict[str, float] | None = None,
+        port_sub: str = PORT_FRONTEND,
+        port_pub: str = PORT_DISPLAY_RELAY,
+    ):
+        """Constructor of the display relay.
+
+        Args:
+            topics (list[str]): Topics of the local Nodes to forward.
+            max_rate_hz (float, optional): Default maximal sample rate of each forwarded device. Defaults to `30.0`.
+            rate_limits_hz (dict[str, float] | None, optional): Overrides of `max_rate_hz`, keyed by topic,
+                or by 'topic/device' for a single device of a topic. Defaults to `None`.
+            port_sub (str, optional): Local port of the master Broker relaying data. Defaults to `PORT_FRONTEND`.
+            port_pub (str, optional): Port to publish the rate-limited data on, for remote dashboards. Defaults to `PORT_DISPLAY_RELAY`.
+        """
+        self._topics = topics
+        self._default_period_s = 1.0 / max_rate_hz
+        self._min_period_s = {
+            key: 1.0 / rate_hz for key, rate_hz in (rate_limits_hz or {}).items()
+        }
+        # Latest held back packet and last forward time of each device, keyed by topic and device names.
+        self._pending: dict[tuple[str, str], tuple[bytes, dict]] = {}
+        self._last_forward_s: dict[tuple[str, str], float] = {}
+        self._port_sub = port_sub
+        self._port_pub = port_pub
+        self._is_running = False
+        self._num_received: int = 0
+        self._num_forwarded: int = 0
+
+    @property
+    def num_received(self) -> int:
+        return self._num_received
+
+    @property
+    def num_forwarded(self) -> int:
+        return self._num_forwarded
+
+    def __call__(self) -> None:
+        """Forward packets until `stop` is called."""
+        ctx: zmq.Context = zmq.Context.instance()
+        sub: zmq.SyncSocket = ctx.socket(zmq.SUB)
+        sub.connect("tcp://%s:%s" % (DNS_LOCALHOST, self._port_sub))
+        for topic in self._topics:
+            sub.subscribe(topic)
+        pub: zmq.SyncSocket = ctx.socket(zmq.PUB)
+        pub.bind("tcp://*:%s" % self._port_pub)
+
+        poller = zmq.Poller()
+        poller.register(sub, zmq.POLLIN)
+        self._is_running = True
+        try:
+            while self._is_running:
+                packets = []
+                if poller.poll(timeout=self._get_poll_timeout_ms(get_time())):
+                    topic, payload = sub.recv_multipart()
+                    self._num_received += 1
+                    packets += self._on_packet(topic, payload, get_time())
+                packets += self._flush(get_time())
+                for packet in packets:
+                    pub.send_multipart(packet)
+                    self._num_forwarded += 1
+        finally:
+            sub.close()
+            pub.close()
+
+    def stop(self) -> None:
+        """Stop forwarding, returns once the current packet is handled."""
+        self._is_running = False
+
+    def _on_packet(
+        self, topic: bytes, payload: bytes, now_s: float
+    ) -> list[tuple[bytes, bytes]]:
+        """[Internal] Hold back the samples of a received packet per device, forwarding those due.
+
+        Args:
+            topic (bytes): Topic frame of the packet.
+            payload (bytes): Serialized packet, or the 'END' command.
+            now_s (float): Time of arrival of the packet.
+
+        Returns:
+            list[tuple[bytes, bytes]]: Topic and payload frames of the packets to forward now.
+        """
+        topic_name = topic.decode("utf-8").split(".")[0]
+        if payload == CMD_END.encode("utf-8"):
+            return self._flush(now_s, ending_topic_name=topic_name) + [(topic, payload)]
+        msg = deserialize(payload)
+        for device_name, device_data in msg["data"].items():
+            if device_data is not None:
+                self._pending[(topic_name, device_name)] = (
+                    topic,
+                    {**msg, "data": {device_name: device_data}},
+                )
+        return self._flush(now_s)
+
+    def _flush(
+        self, now_s: float, ending_topic_name: str | None = None
+    ) -> list[tuple[bytes, bytes]]:
+        """[Internal] Take the held back samples of the devices whose period elapsed.
+
+        Args:
+            now_s (float): Current time.
+            ending_topic_name (str | None, optional): Topic whose held back samples to take
+                regardless of their period, before its end-of-stream. Defaults to `None`.
+
+        Returns:
+            list[tuple[bytes, bytes]]: Topic and payload frames of the packets to forward.
+        """
+        packets = []
+        for key in list(self._pending.keys()):
+            if key[0] == ending_topic_name or self._get_due_s(key) <= now_s:
+                topic, msg = self._pending.pop(key)
+                self._last_forward_s[key] = now_s
+                packets.append((topic, serialize(**msg)))
+        return packets
+
+    def _get_due_s(self, key: tuple[str, str]) -> float:
+        """[Internal] Earliest time to forward the next sample of a device."""
+        topic_name, device_name = key
+        min_period_s = self._min_period_s.get(
+            "%s/%s" % key,
+            self._min_period_s.get(topic_name, self._default_period_s),
+        )
+        return self._last_forward_s.get(key, float("-inf")) + min_period_s
+
+    def _get_poll_timeout_ms(self, now_s: float) -> int:
+        """[Internal] How long to wait for packets before the next held back sample is due."""
+        if not self._pending:
+            return 100
+        due_s = min(self._get_due_s(key) for key in self._pending.keys())
+        return int(min(max(due_s - now_s, 0.0), 0.1) * 1000)
+
+
+def _parse_rate_limit(value: str) -> tuple[str, float]:
+    """[Internal] Parse a 'topic=hz' or 'topic/device=hz' command line rate limit."""
+    key, sep, rate_hz = value.rpartition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(
+            "Rate limit '%s' is not of the form 'topic[/device]=hz'." % value
+        )
+    return key, float(rate_hz)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Forward rate-limited HERMES data of this host to remote dashboards."
+    )
+    parser.add_argument(
+        "topics", nargs="+", help="Topics of the local Nodes to forward."
+    )
+    parser.add_argument("--max-rate-hz", type=float, default=DEFAULT_RELAY_RATE_HZ)
+    parser.add_argument(
+        "--rate-limits",
+        nargs="*",
+        type=_parse_rate_limit,
+        default=[],
+        metavar="TOPIC[/DEVICE]=HZ",
+        help="Overrides of the maximal rate, e.g. 'emg=inf' to forward every sample.",
+    )
+    parser.add_argument("--port-sub", default=PORT_FRONTEND)
+    parser.add_argument("--port-pub", default=PORT_DISPLAY_RELAY)
+    args = parser.parse_args()
+
+    relay = DisplayRelay(
+        topics=args.topics,
+        max_rate_hz=args.max_rate_hz,
+        rate_limits_hz=dict(args.rate_limits),
+        port_sub=args.port_sub,
+        port_pub=args.port_pub,
+    )
+    try:
+        relay()
+    except KeyboardInterrupt:
+        relay.stop()
+
+
+if __name__ == "__main__":
+    main()
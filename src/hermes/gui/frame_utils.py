@@ -0,0 +1,266 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import base64
+from io import BytesIO
+from threading import Lock
+from dash import Output, Input
+import numpy as np
+from PIL import Image
+
+from hermes.gui.gui_utils import app
+
+DEFAULT_TIER_WIDTHS = [320, 640, 1280]
+
+
+def encode_image(frame: np.ndarray, format: str = "JPEG", quality: int = 80) -> bytes:
+    """Compress an RGB or grayscale frame into an image file.
+
+    Args:
+        frame (np.ndarray): Image of shape (H, W) or (H, W, 3).
+        format (str, optional): Image format supported by Pillow, `JPEG` or `PNG`. Defaults to `JPEG`.
+        quality (int, optional): JPEG quality in [1, 95]. Defaults to `80`.
+
+    Returns:
+        bytes: Encoded image.
+    """
+    buffer = BytesIO()
+    Image.fromarray(np.ascontiguousarray(frame, dtype=np.uint8)).save(
+        buffer, format=format, quality=quality
+    )
+    return buffer.getvalue()
+
+
+def to_data_uri(frame: np.ndarray, format: str = "JPEG", quality: int = 80) -> str:
+    """Encode a frame as a base64 data URI, e.g. for the `source` of a `go.Image` trace.
+
+    Args:
+        frame (np.ndarray): Image of shape (H, W) or (H, W, 3).
+        format (str, optional): Image format supported by Pillow, `JPEG` or `PNG`. Defaults to `JPEG`.
+        quality (int, optional): JPEG quality in [1, 95]. Defaults to `80`.
+
+    Returns:
+        str: Data URI of the encoded image.
+    """
+    return "data:image/%s;base64,%s" % (
+        format.lower(),
+        base64.b64encode(encode_image(frame, format, quality)).decode("ascii"),
+    )
+
+
+def downscale_area(frame: np.ndarray, factor: int) -> np.ndarray:
+    """Downscale a frame by an integer factor with area (box) resampling.
+
+    Crops the trailing rows and columns that do not fill a whole block.
+    Sums the rows, then the columns, of each `factor x factor` block with `2 * factor`
+    vectorized additions of contiguous slices, into a narrow accumulator (`uint32` for
+    8- and 16-bit frames), and divides with rounding, instead of promoting every pixel
+    to `float64` in a strided reduction.
+
+    Args:
+        frame (np.ndarray): Image of shape (H, W) or (H, W, C).
+        factor (int): Integer downscaling factor, `1` returns the frame as is.
+
+    Returns:
+        np.ndarray: Downscaled image of the same dtype as the input.
+    """
+    if factor <= 1:
+        return frame
+    h = (frame.shape[0] // factor) * factor
+    w = (frame.shape[1] // factor) * factor
+    is_integer = np.issubdtype(frame.dtype, np.integer)
+    if not is_integer:
+        acc_dtype = np.result_type(frame.dtype, np.float32)
+    elif frame.dtype.itemsize <= 2 and np.issubdtype(frame.dtype, np.unsignedinteger):
+        acc_dtype = np.uint32
+    else:
+        acc_dtype = np.int64
+
+    # (H/f, f, W x C): add up the f rows of each block.
+    rows = frame[:h, :w].reshape(h // factor, factor, -1)
+    row_sums = rows[:, 0].astype(acc_dtype)
+    for i in range(1, factor):
+        row_sums += rows[:, i]
+    # (H/f, W/f, f, C): add up the f columns of each block.
+    cols = row_sums.reshape(h // factor, w // factor, factor, *frame.shape[2:])
+    sums = cols[:, :, 0].copy()
+    for j in range(1, factor):
+        sums += cols[:, :, j]
+
+    n = factor * factor
+    if is_integer:
+        return ((sums + n // 2) // n).astype(frame.dtype)
+    return (sums / n).astype(frame.dtype, copy=False)
+
+
+class FrameTiers:
+    """Cache of downscaled copies of the newest video frame.
+
+    Each resolution tier is computed at most once per new frame, on first request,
+    and shared by all clients asking for it. Tiers are derived from the closest
+    already computed tier whose factor divides the requested one. The encoded data URI
+    of each tier is cached too, so a frame is compressed at most once per tier.
+    """
+
+    def __init__(self, tier_widths: list[int]):
+        """Constructor of the frame tier cache.
+
+        Args:
+            tier_widths (list[int]): Minimal widths [px] of the downscaled tiers to serve.
+        """
+        self._tier_widths = sorted(tier_widths)
+        self._lock = Lock()
+        self._frame_key = None
+        self._tiers: dict[int, np.ndarray] = {}
+        self._data_uris: dict[int, str] = {}
+
+    def update(self, frame: np.ndarray, key=None) -> None:
+        """Register a new frame, invalidating its downscaled tiers.
+
+        Args:
+            frame (np.ndarray): Full resolution frame.
+            key (optional): Identifier of the frame (e.g. its timestamp), to skip repeated updates.
+                Defaults to `None`, which always treats the frame as new.
+        """
+        with self._lock:
+            if key is not None and key == self._frame_key:
+                return
+            self._frame_key = key
+            self._tiers = {1: frame}
+            self._data_uris = {}
+
+    def get(
+        self, client_width_px: int | None = None, is_full_resolution: bool = False
+    ) -> tuple[np.ndarray, int]:
+        """Get the tier of the current frame best matching the client's display width.
+
+        Args:
+            client_width_px (int | None, optional): Width of the displaying element in the client's browser.
+                Defaults to `None`, which selects the smallest tier.
+            is_full_resolution (bool, optional): Whether to bypass tiers and serve the native frame. Defaults to `False`.
+
+        Returns:
+            tuple[np.ndarray, int]: Downscaled frame and its integer downscaling factor w.r.t. native resolution.
+        """
+        with self._lock:
+            return self._get_tier(client_width_px, is_full_resolution)
+
+    def get_data_uri(
+        self,
+        client_width_px: int | None = None,
+        is_full_resolution: bool = False,
+        quality: int = 80,
+    ) -> tuple[str, int]:
+        """Get the JPEG data URI of the tier of the current frame best matching the client's display width.
+
+        Args:
+            client_width_px (int | None, optional): Width of the displaying element in the client's browser.
+                Defaults to `None`, which selects the smallest tier.
+            is_full_resolution (bool, optional): Whether to bypass tiers and serve the native frame. Defaults to `False`.
+            quality (int, optional): JPEG quality in [1, 95], the same for all calls. Defaults to `80`.
+
+        Returns:
+            tuple[str, int]: Data URI of the encoded tier and its integer downscaling factor w.r.t. native resolution.
+        """
+        with self._lock:
+            img, factor = self._get_tier(client_width_px, is_full_resolution)
+            if factor not in self._data_uris:
+                self._data_uris[factor] = to_data_uri(img, quality=quality)
+            return self._data_uris[factor], factor
+
+    def get_factor(
+        self,
+        native_width_px: int,
+        client_width_px: int | None = None,
+        is_full_resolution: bool = False,
+    ) -> int:
+        """Get the downscaling factor of the tier a client would be served, without computing it.
+
+        Args:
+            native_width_px (int): Width of the full resolution frame.
+            client_width_px (int | None, optional): Width of the displaying element in the client's browser.
+                Defaults to `None`, which selects the smallest tier.
+            is_full_resolution (bool, optional): Whether to bypass tiers and serve the native frame. Defaults to `False`.
+
+        Returns:
+            int: Integer downscaling factor w.r.t. native resolution.
+        """
+        if is_full_resolution:
+            return 1
+        return self._get_factor(native_width_px, client_width_px)
+
+    def _get_tier(
+        self, client_width_px: int | None, is_full_resolution: bool
+    ) -> tuple[np.ndarray, int]:
+        """[Internal] Non thread-safe lookup of a tier, downscaling it on first request."""
+        full = self._tiers[1]
+        if is_full_resolution:
+            return full, 1
+        factor = self._get_factor(full.shape[1], client_width_px)
+        if factor not in self._tiers:
+            base = max(f for f in self._tiers if factor % f == 0)
+            self._tiers[factor] = downscale_area(self._tiers[base], factor // base)
+        return self._tiers[factor], factor
+
+    def _get_factor(self, native_width_px: int, client_width_px: int | None) -> int:
+        """[Internal] Pick the smallest tier at least as wide as the client's element."""
+        if client_width_px is None:
+            width = self._tier_widths[0]
+        else:
+            width = next(
+                (w for w in self._tier_widths if w >= client_width_px),
+                self._tier_widths[-1],
+            )
+        return max(1, native_width_px // width)
+
+
+def add_width_probe(element_id: dict, interval_id: dict, store_id: dict) -> None:
+    """Report the rendered width of DOM elements to the server via `dcc.Store`s.
+
+    Runs in the browser on every tick of each element's interval, without a server roundtrip.
+    Registered once for all widgets of a type, with pattern-matching ids indexed by `MATCH`.
+
+    Args:
+        element_id (dict): Pattern-matching id of the elements whose width to measure.
+        interval_id (dict): Pattern-matching id of the `dcc.Interval`s driving the measurement.
+        store_id (dict): Pattern-matching id of the `dcc.Store`s receiving the width [px].
+    """
+    # Dash renders dict ids as their JSON with sorted keys.
+    app.clientside_callback(
+        """
+        function(n) {
+            var index = dash_clientside.callback_context.outputs_list.id.index;
+            var el = document.getElementById(
+                JSON.stringify({index: index, type: '%s'})
+            );
+            var width = el ? el.clientWidth : window.innerWidth;
+            return Math.round(width * (window.devicePixelRatio || 1));
+        }
+        """ % element_id["type"],
+        Output(store_id, component_property="data"),
+        Input(interval_id, component_property="n_intervals"),
+    )
@@ -0,0 +1,225 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import sys
+from importlib.metadata import PackageNotFoundError, packages_distributions, version
+from threading import Lock
+from dash import Dash
+from flask import Flask, Response, request
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "hermes-gui")
+
+
+def _get_code_version(stream_classes: list[type] | None = None) -> str:
+    """[Internal] Identify the installed code building the layout, to invalidate layouts built by other versions of it.
+
+    Covers the GUI package and the device packages whose `Stream` classes build the widgets,
+    by their distribution versions and the modification times of their sources, for editable installs.
+    """
+    try:
+        package_version = version("pysio-hermes-gui")
+    except PackageNotFoundError:
+        package_version = "unknown"
+    sources = glob.glob(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "**", "*.py"),
+        recursive=True,
+    )
+    versions = [
+        "%s-%d"
+        % (
+            package_version,
+            max((os.stat(path).st_mtime_ns for path in sources), default=0),
+        )
+    ]
+    stream_classes = stream_classes or []
+    distributions = packages_distributions() if stream_classes else {}
+    for cls in stream_classes:
+        module = sys.modules.get(cls.__module__)
+        path = getattr(module, "__file__", None)
+        versions.append(
+            "%s.%s-%s-%d"
+            % (
+                cls.__module__,
+                cls.__qualname__,
+                ",".join(
+                    sorted(
+                        "%s=%s" % (name, _get_distribution_version(name))
+                        for name in distributions.get(cls.__module__.split(".")[0], [])
+                    )
+                ),
+                os.stat(path).st_mtime_ns if path and os.path.isfile(path) else 0,
+            )
+        )
+    return ";".join(versions)
+
+
+def _get_distribution_version(name: str) -> str:
+    """[Internal] Version of an installed distribution, or 'unknown'."""
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class LayoutCache:
+    """Serialized Dash layout and callback graph of a dashboard, reused across page loads and restarts.
+
+    The layout of a dashboard depends only on its experiment config and the GUI code.
+    It is serialized to JSON once, on the first page load, kept in memory, and stored
+    on disk under a key hashed from both, so a restart with the same config serves it
+    without building the widgets' figure templates or serializing the layout again.
+    The callback graph is serialized once too. Both are sent with the key as `ETag`,
+    letting browsers revalidate them instead of downloading them on every reload.
+    Only the most recently used layouts are kept on disk.
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        stream_classes: list[type] | None = None,
+        cache_dir: str | None = None,
+        max_entries: int = 16,
+    ):
+        """Constructor of the layout cache.
+
+        Args:
+            config (dict): JSON-serializable experiment config the layout is built from.
+            stream_classes (list[type] | None, optional): `Stream` classes building the widgets of the layout. Defaults to `None`.
+            cache_dir (str | None, optional): Directory to store layouts in. Defaults to `~/.cache/hermes-gui`.
+            max_entries (int, optional): Number of most recently used layouts to keep on disk. Defaults to `16`.
+        """
+        self._key = hashlib.sha256(
+            json.dumps(
+                {"config": config, "code": _get_code_version(stream_classes)},
+                sort_keys=True,
+                default=str,
+            ).encode("utf-8")
+        ).hexdigest()
+        self._cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self._path = os.path.join(self._cache_dir, "layout-%s.json" % self._key)
+        self._lock = Lock()
+        self._logger = logging.getLogger(__name__)
+        self._app: Dash | None = None
+        self._layout: bytes | None = None
+        self._dependencies: bytes | None = None
+        if os.path.isfile(self._path):
+            with open(self._path, "rb") as f:
+                self._layout = f.read()
+            # Mark as recently used, to outlive the pruning of stale layouts.
+            try:
+                os.utime(self._path)
+            except OSError:
+                pass
+        self._is_hit = self._layout is not None
+        self._prune(max_entries)
+
+    @property
+    def key(self) -> str:
+        return self._key
+
+    @property
+    def is_hit(self) -> bool:
+        """Whether the layout of this config was stored by a previous run."""
+        return self._is_hit
+
+    def init_app(self, app: Dash, server: Flask) -> None:
+        """Serve the layout and the callback graph of a Dash app from the cache from now on.
+
+        Args:
+            app (Dash): App whose `layout` and callbacks to serve.
+            server (Flask): Server of the app.
+        """
+        self._app = app
+        self._logger = server.logger
+        self._routes = {
+            "%s_dash-layout" % app.config.routes_pathname_prefix: self._get_layout,
+            "%s_dash-dependencies"
+            % app.config.routes_pathname_prefix: self._get_dependencies,
+        }
+        server.before_request(self._serve)
+
+    def _serve(self) -> Response | None:
+        """[Internal] Answer requests for the layout or the callback graph, leaving others to Dash."""
+        get_content = self._routes.get(request.path)
+        if get_content is None or request.method != "GET":
+            return None
+        if self._key in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = Response(get_content(), mimetype="application/json")
+        response.set_etag(self._key)
+        return response
+
+    def _get_layout(self) -> bytes:
+        """[Internal] Get the serialized layout, serializing and storing it on first use."""
+        with self._lock:
+            if self._layout is None:
+                self._layout = self._app.serve_layout().get_data()
+                self._store(self._layout)
+            return self._layout
+
+    def _get_dependencies(self) -> bytes:
+        """[Internal] Get the serialized callback graph, registered by then with the Dash server's setup."""
+        with self._lock:
+            if self._dependencies is None:
+                self._dependencies = self._app.dependencies().get_data()
+            return self._dependencies
+
+    def _store(self, layout: bytes) -> None:
+        """[Internal] Write the serialized layout to disk atomically, not to serve a partial one to another run."""
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            tmp_path = "%s.%d.tmp" % (self._path, os.getpid())
+            with open(tmp_path, "wb") as f:
+                f.write(layout)
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            self._logger.warning(
+                "Could not cache the dashboard layout in %s: %s", self._path, e
+            )
+
+    def _prune(self, max_entries: int) -> None:
+        """[Internal] Delete all but the most recently used stored layouts, e.g. of old configs or code versions."""
+        paths = glob.glob(os.path.join(self._cache_dir, "layout-*.json"))
+        if len(paths) <= max_entries:
+            return
+        try:
+            paths.sort(key=os.path.getmtime, reverse=True)
+        except OSError:
+            return
+        for path in paths[max_entries:]:
+            if path == self._path:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
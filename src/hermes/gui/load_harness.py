@@ -0,0 +1,445 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlparse
+import numpy as np
+import zmq
+
+from hermes.utils.msgpack_utils import serialize
+from hermes.utils.time_utils import get_time
+from hermes.utils.zmq_utils import *
+
+LOCAL_HOSTNAMES = ("localhost", "127.0.0.1", "::1")
+
+
+class SyntheticPublisher:
+    """Stand-in for the local Broker, publishing random samples on localhost.
+
+    Point a `DataVisualizer`'s `port_sub` and `port_sync` at the publisher's ports to feed
+    its widgets with packets of the same shape as the real Producers would send. The
+    publisher answers the Nodes' startup and exit handshakes like the Broker does,
+    so the `DataVisualizer` starts polling data without a running Broker.
+    """
+
+    def __init__(
+        self,
+        topic_specs: dict[str, dict[str, dict[str, list[int]]]],
+        rate_hz: float = 100.0,
+        port_pub: str = PORT_FRONTEND,
+        port_sync: str = PORT_SYNC_HOST,
+    ):
+        """Constructor of the synthetic publisher.
+
+        Args:
+            topic_specs (dict[str, dict[str, dict[str, list[int]]]]): Sample shape of each sub-stream,
+                keyed by topic, device name, and sub-stream name.
+            rate_hz (float, optional): Packet rate of each topic. Defaults to `100.0`.
+            port_pub (str, optional): Local port to publish on. Defaults to `PORT_FRONTEND`.
+            port_sync (str, optional): Local port to answer the Nodes' handshakes on. Defaults to `PORT_SYNC_HOST`.
+        """
+        self._topic_specs = topic_specs
+        self._period_s = 1.0 / rate_hz
+        self._port_pub = port_pub
+        self._port_sync = port_sync
+        self._is_running = False
+        self._thread: threading.Thread | None = None
+        self._is_bound = threading.Event()
+
+    def start(self) -> None:
+        """Start publishing in a background thread, once the sockets are bound."""
+        self._is_running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._is_bound.wait()
+
+    def stop(self) -> None:
+        self._is_running = False
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        ctx = zmq.Context.instance()
+        pub: zmq.SyncSocket = ctx.socket(zmq.PUB)
+        pub.bind("tcp://%s:%s" % (IP_LOOPBACK, self._port_pub))
+        sync: zmq.SyncSocket = ctx.socket(zmq.ROUTER)
+        sync.bind("tcp://%s:%s" % (IP_LOOPBACK, self._port_sync))
+        self._is_bound.set()
+        poller = zmq.Poller()
+        poller.register(sync, zmq.POLLIN)
+        rng = np.random.default_rng()
+        next_time_s = time.perf_counter()
+        try:
+            while self._is_running:
+                timeout_ms = int(max(0.0, next_time_s - time.perf_counter()) * 1000)
+                if poller.poll(timeout_ms):
+                    self._on_sync_request(sync)
+                    continue
+                for topic, device_specs in self._topic_specs.items():
+                    data = {
+                        device_name: {
+                            stream_name: rng.standard_normal(shape).astype(np.float32)
+                            for stream_name, shape in stream_specs.items()
+                        }
+                        for device_name, stream_specs in device_specs.items()
+                    }
+                    pub.send_multipart(
+                        [
+                            ("%s.data" % topic).encode("utf-8"),
+                            serialize(time_s=get_time(), data=data),
+                        ]
+                    )
+                next_time_s += self._period_s
+        finally:
+            pub.close()
+            sync.close()
+
+    def _on_sync_request(self, sync: zmq.SyncSocket) -> None:
+        """Release a Node waiting on its startup ('HELLO') or exit ('EXIT?') handshake."""
+        address, _, node_name, cmd = sync.recv_multipart()
+        reply = CMD_GO if cmd == CMD_HELLO.encode("utf-8") else CMD_BYE
+        sync.send_multipart(
+            [address, b"", IP_LOOPBACK.encode("utf-8"), reply.encode("utf-8")]
+        )
+
+
+class DashLoadTester:
+    """Simulated browser clients replaying the interval-driven updates of a Dash dashboard.
+
+    Discovers the callbacks triggered by `dcc.Interval`s from the app's dependency graph
+    and layout, then runs increasing numbers of clients, each sending every such
+    `_dash-update-component` request at its interval's period, and measures
+    throughput, latency percentiles, and error rates at each step.
+    """
+
+    def __init__(self, base_url: str = "http://%s:%s" % (IP_LOOPBACK, PORT_GUI)):
+        """Constructor of the load tester.
+
+        Args:
+            base_url (str, optional): Address of the dashboard, must be on localhost. Defaults to the local `PORT_GUI`.
+
+        Raises:
+            ValueError: If the dashboard is not served on localhost.
+        """
+        if urlparse(base_url).hostname not in LOCAL_HOSTNAMES:
+            raise ValueError(
+                "Load testing is restricted to localhost, got %s." % base_url
+            )
+        self._base_url = base_url.rstrip("/")
+        self._requests: list[tuple[float, bytes]] = []
+
+    def discover(self) -> int:
+        """Build the update requests that the layout's intervals generate.
+
+        Pattern-matching callbacks, shared by all widgets of a type, are expanded into
+        one request per widget, as the browser sends them.
+
+        Returns:
+            int: Number of interval-driven callbacks found, per widget.
+        """
+        layout = self._get_json("/_dash-layout")
+        dependencies = self._get_json("/_dash-dependencies")
+        props = {}
+        self._collect_props(layout, props)
+
+        self._requests = []
+        for callback in dependencies:
+            # Clientside callbacks run in the browser, without requests to the server.
+            if callback.get("clientside_function") is not None:
+                continue
+            for match in self._get_matches(callback["inputs"], props):
+                inputs = [
+                    (self._resolve_id(i["id"], match), i["property"])
+                    for i in callback["inputs"]
+                ]
+                interval_inputs = [
+                    (component_id, prop)
+                    for component_id, prop in inputs
+                    if prop == "n_intervals"
+                    and props.get(self._stringify_id(component_id), {}).get("interval")
+                    is not None
+                ]
+                if not interval_inputs:
+                    continue
+                period_s = (
+                    min(
+                        props[self._stringify_id(component_id)]["interval"]
+                        for component_id, _ in interval_inputs
+                    )
+                    / 1000
+                )
+                body = {
+                    "output": callback["output"],
+                    "outputs": self._parse_outputs(callback["output"], match),
+                    "inputs": [
+                        {
+                            "id": component_id,
+                            "property": prop,
+                            "value": props.get(
+                                self._stringify_id(component_id), {}
+                            ).get(prop, 1)
+                            or 1,
+                        }
+                        for component_id, prop in inputs
+                    ],
+                    "changedPropIds": [
+                        "%s.%s" % (self._stringify_id(component_id), prop)
+                        for component_id, prop in interval_inputs
+                    ],
+                    "state": [
+                        {
+                            "id": self._resolve_id(s["id"], match),
+                            "property": s["property"],
+                            "value": props.get(
+                                self._stringify_id(self._resolve_id(s["id"], match)),
+                                {},
+                            ).get(s["property"]),
+                        }
+                        for s in callback.get("state", [])
+                    ],
+                }
+                self._requests.append((period_s, json.dumps(body).encode("utf-8")))
+        return len(self._requests)
+
+    def run(self, num_clients: list[int], duration_s: float = 10.0) -> list[dict]:
+        """Run each load step in turn and report its statistics.
+
+        Args:
+            num_clients (list[int]): Number of simultaneous clients of each step.
+            duration_s (float, optional): Duration of each step. Defaults to `10.0`.
+
+        Returns:
+            list[dict]: Statistics of each step.
+        """
+        if not self._requests:
+            self.discover()
+        return [self._run_step(n, duration_s) for n in num_clients]
+
+    def _run_step(self, num_clients: int, duration_s: float) -> dict:
+        latencies_s: list[float] = []
+        num_errors = [0]
+        lock = threading.Lock()
+        end_time_s = time.perf_counter() + duration_s
+
+        def client():
+            # Each client fires every interval-driven request on its own schedule.
+            next_fire_s = [time.perf_counter()] * len(self._requests)
+            while True:
+                k = int(np.argmin(next_fire_s))
+                now = time.perf_counter()
+                if next_fire_s[k] >= end_time_s or now >= end_time_s:
+                    return
+                time.sleep(max(0.0, next_fire_s[k] - now))
+                period_s, body = self._requests[k]
+                start_s = time.perf_counter()
+                is_error = False
+                try:
+                    self._post("/_dash-update-component", body)
+                except (urllib.error.URLError, OSError):
+                    is_error = True
+                latency_s = time.perf_counter() - start_s
+                with lock:
+                    latencies_s.append(latency_s)
+                    num_errors[0] += is_error
+                next_fire_s[k] = max(next_fire_s[k] + period_s, start_s)
+
+        start_s = time.perf_counter()
+        threads = [threading.Thread(target=client) for _ in range(num_clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed_s = time.perf_counter() - start_s
+
+        latencies_ms = 1000 * np.asarray(latencies_s)
+        num_requests = len(latencies_ms)
+        p50, p95, p99 = (
+            np.percentile(latencies_ms, [50, 95, 99]).tolist()
+            if num_requests
+            else (np.nan, np.nan, np.nan)
+        )
+        return {
+            "clients": num_clients,
+            "requests": num_requests,
+            "throughput_rps": num_requests / elapsed_s,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "error_rate": num_errors[0] / num_requests if num_requests else 0.0,
+        }
+
+    def _get_json(self, path: str):
+        with urllib.request.urlopen(self._base_url + path, timeout=10) as response:
+            return json.loads(response.read())
+
+    def _post(self, path: str, body: bytes) -> None:
+        request = urllib.request.Request(
+            self._base_url + path,
+            data=body,
+            headers={"Content-Type": "application/json"},
+        )
+        # `no_update` responses come back as '204 No Content', a success.
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+
+    @classmethod
+    def _parse_outputs(
+        cls, output: str, match: dict | None = None
+    ) -> dict | list[dict]:
+        """[Internal] Convert Dash's output specification string into the request's `outputs` field."""
+        match = match or {}
+
+        def parse(spec: str) -> dict:
+            component_id, component_property = spec.rsplit(".", 1)
+            return {
+                "id": cls._resolve_id(component_id, match),
+                "property": component_property.split("@")[0],
+            }
+
+        if output.startswith(".."):
+            return [parse(spec) for spec in output.strip(".").split("...")]
+        return parse(output)
+
+    @staticmethod
+    def _stringify_id(component_id: str | dict) -> str:
+        """[Internal] Key of a component id, as Dash renders dict ids: JSON with sorted keys."""
+        if isinstance(component_id, dict):
+            return json.dumps(component_id, sort_keys=True, separators=(",", ":"))
+        return component_id
+
+    @staticmethod
+    def _resolve_id(component_id: str, match: dict) -> str | dict:
+        """[Internal] Substitute the `MATCH` wildcards of a pattern-matching id of the dependency graph."""
+        if not component_id.startswith("{"):
+            return component_id
+        pattern = json.loads(component_id)
+        return {
+            key: match[key] if value == ["MATCH"] else value
+            for key, value in pattern.items()
+        }
+
+    @staticmethod
+    def _get_matches(inputs: list[dict], props: dict) -> list[dict]:
+        """[Internal] Find the values of the `MATCH` wildcards of a callback's inputs in the layout."""
+        patterns = [json.loads(i["id"]) for i in inputs if i["id"].startswith("{")]
+        patterns = [p for p in patterns if ["MATCH"] in p.values()]
+        if not patterns:
+            return [{}]
+        pattern = patterns[0]
+        matches = []
+        for key in props:
+            if not key.startswith("{"):
+                continue
+            component_id = json.loads(key)
+            if component_id.keys() == pattern.keys() and all(
+                component_id[k] == v for k, v in pattern.items() if v != ["MATCH"]
+            ):
+                matches.append(
+                    {k: component_id[k] for k, v in pattern.items() if v == ["MATCH"]}
+                )
+        return matches
+
+    @classmethod
+    def _collect_props(cls, component, props: dict) -> None:
+        """[Internal] Map ids of all components of the serialized layout to their properties."""
+        if isinstance(component, list):
+            for child in component:
+                cls._collect_props(child, props)
+        elif isinstance(component, dict) and "props" in component:
+            component_props = component["props"]
+            if "id" in component_props:
+                props[cls._stringify_id(component_props["id"])] = component_props
+            cls._collect_props(component_props.get("children"), props)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure how many simultaneous viewers a local HERMES dashboard sustains."
+    )
+    parser.add_argument("--url", default="http://%s:%s" % (IP_LOOPBACK, PORT_GUI))
+    parser.add_argument(
+        "--clients",
+        default="1,2,4,8,16,32",
+        help="Comma-separated number of clients of each load step.",
+    )
+    parser.add_argument("--duration-s", type=float, default=10.0)
+    parser.add_argument(
+        "--synthetic-spec",
+        default=None,
+        help="JSON file of {topic: {device: {stream: shape}}} to publish synthetic data for.",
+    )
+    parser.add_argument("--synthetic-rate-hz", type=float, default=100.0)
+    parser.add_argument("--synthetic-port", default=PORT_FRONTEND)
+    parser.add_argument("--synthetic-sync-port", default=PORT_SYNC_HOST)
+    args = parser.parse_args()
+
+    publisher = None
+    if args.synthetic_spec is not None:
+        with open(args.synthetic_spec) as f:
+            publisher = SyntheticPublisher(
+                topic_specs=json.load(f),
+                rate_hz=args.synthetic_rate_hz,
+                port_pub=args.synthetic_port,
+                port_sync=args.synthetic_sync_port,
+            )
+        publisher.start()
+
+    try:
+        tester = DashLoadTester(args.url)
+        print("Found %d interval-driven callbacks." % tester.discover(), flush=True)
+        print(
+            "%8s %9s %10s %9s %9s %9s %7s"
+            % ("clients", "requests", "req/s", "p50 ms", "p95 ms", "p99 ms", "errors"),
+            flush=True,
+        )
+        for n in [int(n) for n in args.clients.split(",")]:
+            (step,) = tester.run([n], args.duration_s)
+            print(
+                "%8d %9d %10.1f %9.1f %9.1f %9.1f %6.1f%%"
+                % (
+                    step["clients"],
+                    step["requests"],
+                    step["throughput_rps"],
+                    step["p50_ms"],
+                    step["p95_ms"],
+                    step["p99_ms"],
+                    100 * step["error_rate"],
+                ),
+                flush=True,
+            )
+    finally:
+        if publisher is not None:
+            publisher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from threading import Condition, Thread
+from typing import Callable, Iterator
+import numpy as np
+
+from hermes.gui.frame_utils import encode_image
+
+MJPEG_BOUNDARY = "frame"
+
+
+class FrameBroadcaster:
+    """Fan-out of live video frames to MJPEG clients.
+
+    New frames are handed off without blocking the caller and are preprocessed
+    and JPEG-compressed once in a dedicated thread, only while at least one client
+    is connected.
+    Each client waits for the newest encoded frame, so a slow client skips
+    the frames it could not keep up with, without affecting the others.
+    New clients start from the frame currently shown to the other clients, if any,
+    and never from one cached before the last client disconnected.
+    """
+
+    def __init__(
+        self,
+        quality: int = 80,
+        transform: Callable[[np.ndarray], np.ndarray] | None = None,
+    ):
+        """Constructor of the MJPEG broadcaster.
+
+        Args:
+            quality (int, optional): JPEG quality of broadcasted frames. Defaults to `80`.
+            transform (Callable[[np.ndarray], np.ndarray] | None, optional): Preprocessing of each frame
+                before compression (e.g. downscaling), run in the encoder thread. Defaults to `None`.
+        """
+        self._quality = quality
+        self._transform = transform
+        self._cv = Condition()
+        self._pending_frame: np.ndarray | None = None
+        self._jpeg: bytes | None = None
+        self._seq: int = 0
+        self._num_clients: int = 0
+        self._is_closed: bool = False
+        self._encoder_thread = Thread(target=self._encode_loop, daemon=True)
+        self._encoder_thread.start()
+
+    def publish(self, frame: np.ndarray) -> None:
+        """Hand off a new frame to be broadcasted, replacing one not yet encoded.
+
+        Args:
+            frame (np.ndarray): Newest video frame.
+        """
+        with self._cv:
+            if self._num_clients:
+                self._pending_frame = frame
+                self._cv.notify_all()
+
+    def stream(self) -> Iterator[bytes]:
+        """Generate the `multipart/x-mixed-replace` body for one client.
+
+        Yields:
+            Iterator[bytes]: Multipart chunks, each containing the newest JPEG frame.
+        """
+        with self._cv:
+            self._num_clients += 1
+            # Start from the current frame only while it is live for other clients.
+            last_seq = self._seq if self._jpeg is None else self._seq - 1
+        try:
+            while True:
+                with self._cv:
+                    self._cv.wait_for(lambda: self._is_closed or self._seq > last_seq)
+                    if self._is_closed:
+                        return
+                    jpeg, last_seq = self._jpeg, self._seq
+                yield (
+                    b"--%s\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n"
+                    % (MJPEG_BOUNDARY.encode("utf-8"), len(jpeg))
+                    + jpeg
+                    + b"\r\n"
+                )
+        finally:
+            with self._cv:
+                self._num_clients -= 1
+                if not self._num_clients:
+                    # Frames stop being encoded, so the cached one goes stale.
+                    self._jpeg = None
+                    self._pending_frame = None
+
+    def close(self) -> None:
+        """Release all connected clients and stop the encoder thread."""
+        with self._cv:
+            self._is_closed = True
+            self._cv.notify_all()
+        self._encoder_thread.join()
+
+    def _encode_loop(self) -> None:
+        """[Internal] Compress the newest pending frame and wake up waiting clients."""
+        while True:
+            with self._cv:
+                self._cv.wait_for(
+                    lambda: self._is_closed or self._pending_frame is not None
+                )
+                if self._is_closed:
+                    return
+                frame, self._pending_frame = self._pending_frame, None
+            if self._transform is not None:
+                frame = self._transform(frame)
+            jpeg = encode_image(frame, format="JPEG", quality=self._quality)
+            with self._cv:
+                if not self._num_clients:
+                    continue
+                self._jpeg = jpeg
+                self._seq += 1
+                self._cv.notify_all()
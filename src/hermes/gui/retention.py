@@ -0,0 +1,284 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from collections import OrderedDict, deque
+import math
+import numpy as np
+
+from hermes.base.stream import Stream
+from hermes.gui.widgets import Visualizer
+
+
+class BufferRetention:
+    """Bookkeeping of the buffered samples of one device tree, updated in O(1) per packet.
+
+    Tracks the count and arrival times of the buffered samples, instead of inspecting the
+    `Stream`, to decide how many of the oldest to evict and to estimate memory use.
+    All sub-streams of a device are appended together, so they are evicted together too,
+    to keep their samples index-aligned with each other and with 'process_time_s'.
+    """
+
+    __slots__ = (
+        "num_timesteps",
+        "duration_s",
+        "sample_bytes",
+        "num_samples",
+        "_arrivals_s",
+    )
+
+    def __init__(
+        self, num_timesteps: int, duration_s: float, sample_bytes: dict[str, int]
+    ):
+        self.num_timesteps = num_timesteps
+        self.duration_s = duration_s
+        self.sample_bytes = sample_bytes
+        self.num_samples: int = 0
+        self._arrivals_s: deque[float] = deque()
+
+    def append(self, arrival_s: float) -> None:
+        self.num_samples += 1
+        self._arrivals_s.append(arrival_s)
+
+    def evict(self, now_s: float) -> int:
+        """Forget the samples that are neither among the newest `num_timesteps`, nor within `duration_s`.
+
+        Args:
+            now_s (float): Current time, on the clock of the arrival times.
+
+        Returns:
+            int: Number of the oldest samples to clear from each sub-stream of the `Stream`.
+        """
+        oldest_s = now_s - self.duration_s
+        num_to_evict = 0
+        while (
+            self.num_samples - num_to_evict > self.num_timesteps
+            and self._arrivals_s[num_to_evict] < oldest_s
+        ):
+            num_to_evict += 1
+        for _ in range(num_to_evict):
+            self._arrivals_s.popleft()
+        self.num_samples -= num_to_evict
+        return num_to_evict
+
+    @property
+    def memory_bytes(self) -> dict[str, int]:
+        return {
+            stream_name: self.num_samples * num_bytes
+            for stream_name, num_bytes in self.sample_bytes.items()
+        }
+
+
+class RetentionPolicy:
+    """Bounds the samples buffered in the `Stream`s of a `DataVisualizer` to what its widgets read.
+
+    Merges the history declared by all widgets with `Visualizer.get_retention` for the
+    sub-streams of each device, keeping the largest number of newest samples and the
+    longest duration. Devices no widget reads keep only the latest sample, while the devices of
+    the `Stream` of a widget that does not declare its needs, and the devices `Storage` dumps to
+    disk at the end of the session, are never evicted. Eviction runs
+    periodically in the data receiving thread, at O(1) cost per evicted sample.
+    """
+
+    def __init__(
+        self,
+        streams: OrderedDict[str, Stream],
+        visualizers: list[Visualizer],
+        period_s: float = 1.0,
+        is_evicting: bool = True,
+        unbounded_devices: list[tuple[str, str]] | None = None,
+    ):
+        """Constructor of the retention policy.
+
+        Args:
+            streams (OrderedDict[str, Stream]): Streams of the `DataVisualizer`, keyed by topic.
+            visualizers (list[Visualizer]): Widgets whose declared needs to retain data for.
+            period_s (float, optional): Period of evicting old samples. Defaults to `1.0`.
+            is_evicting (bool, optional): Whether to evict old samples, or only track memory use.
+                Defaults to `True`.
+            unbounded_devices (list[tuple[str, str]] | None, optional): Topic and device names
+                to never evict, e.g. per `get_dumped_devices`. Defaults to `None`.
+        """
+        self._streams = streams
+        self._period_s = period_s
+        self._is_evicting = is_evicting
+        self._last_eviction_s: float | None = None
+
+        required: dict[tuple[Stream, str], tuple[int, float]] = {}
+        unbounded_streams: list[Stream] = []
+        for visualizer in visualizers:
+            retention = visualizer.get_retention()
+            if retention is None:
+                if visualizer.stream is not None:
+                    unbounded_streams.append(visualizer.stream)
+                continue
+            for (stream, device_name, _), (
+                num_timesteps,
+                duration_s,
+            ) in retention.items():
+                num_timesteps_max, duration_s_max = required.get(
+                    (stream, device_name), (1, 0.0)
+                )
+                required[(stream, device_name)] = (
+                    max(num_timesteps, num_timesteps_max),
+                    max(duration_s, duration_s_max),
+                )
+
+        self._buffers: OrderedDict[tuple[str, str], BufferRetention] = OrderedDict()
+        for topic_name, stream in streams.items():
+            for device_name in stream.get_device_names():
+                num_timesteps, duration_s = required.get(
+                    (stream, device_name), (1, 0.0)
+                )
+                if any(stream is s for s in unbounded_streams) or (
+                    (topic_name, device_name) in (unbounded_devices or ())
+                ):
+                    duration_s = math.inf
+                self._buffers[(topic_name, device_name)] = BufferRetention(
+                    num_timesteps=num_timesteps,
+                    duration_s=duration_s,
+                    sample_bytes={
+                        stream_name: self._get_sample_bytes(
+                            stream.get_stream_info(device_name, stream_name)
+                        )
+                        for stream_name in stream.get_stream_names(device_name)
+                    },
+                )
+
+    @staticmethod
+    def get_dumped_devices(
+        streams: OrderedDict[str, Stream], logging_spec: object
+    ) -> list[tuple[str, str]]:
+        """Find the devices whose samples `Storage` dumps to disk only at the end of the session.
+
+        Streaming logging writes the buffered samples out periodically, but dumping needs all of
+        them until the end, so only the devices with a sub-stream of a dumped type are listed:
+        video for `dump_video`, audio for `dump_audio`, any other for `dump_csv`, and any for `dump_hdf5`.
+
+        Args:
+            streams (OrderedDict[str, Stream]): Streams of the `DataVisualizer`, keyed by topic.
+            logging_spec (object): `LoggingSpec` of the `Storage` sharing the `Stream`s.
+
+        Returns:
+            list[tuple[str, str]]: Topic and device names of the dumped devices.
+        """
+        is_dump = {
+            flag: bool(getattr(logging_spec, flag, False))
+            for flag in ("dump_hdf5", "dump_video", "dump_csv", "dump_audio")
+        }
+        dumped_devices: list[tuple[str, str]] = []
+        for topic_name, stream in streams.items():
+            for device_name in stream.get_device_names():
+                for stream_name in stream.get_stream_names(device_name):
+                    info = stream.get_stream_info(device_name, stream_name)
+                    is_video = bool(info.get("is_video"))
+                    is_audio = bool(info.get("is_audio"))
+                    if (
+                        is_dump["dump_hdf5"]
+                        or (is_dump["dump_video"] and is_video)
+                        or (is_dump["dump_audio"] and is_audio)
+                        or (is_dump["dump_csv"] and not (is_video or is_audio))
+                    ):
+                        dumped_devices.append((topic_name, device_name))
+                        break
+        return dumped_devices
+
+    @property
+    def is_evicting(self) -> bool:
+        return self._is_evicting
+
+    def on_data_packet(self, topic: str, process_time_s: float, data: dict) -> None:
+        """Account for a packet appended to the topic's `Stream`, and evict old samples when due.
+
+        Must be called from the thread appending the data to the `Stream`s.
+
+        Args:
+            topic (str): Topic of the `Stream` the packet was appended to.
+            process_time_s (float): Time-of-arrival of the packet.
+            data (dict): Newly received sample, keyed by device and sub-stream names.
+        """
+        for device_name, streams_data in data.items():
+            buffer = self._buffers.get((topic, device_name))
+            if buffer is not None and streams_data is not None:
+                buffer.append(process_time_s)
+
+        if not self._is_evicting:
+            return
+        if self._last_eviction_s is None:
+            self._last_eviction_s = process_time_s
+        elif process_time_s - self._last_eviction_s >= self._period_s:
+            self._last_eviction_s = process_time_s
+            self.evict(process_time_s)
+
+    def evict(self, now_s: float) -> None:
+        """Clear the samples of every device older than its widgets need.
+
+        Args:
+            now_s (float): Current time, on the clock of the packets' time-of-arrival.
+        """
+        for (topic_name, device_name), buffer in self._buffers.items():
+            num_to_evict = buffer.evict(now_s)
+            if not num_to_evict:
+                continue
+            for stream_name in buffer.sample_bytes.keys():
+                self._streams[topic_name].clear_data(
+                    device_name=device_name,
+                    stream_name=stream_name,
+                    num_oldest_to_clear=num_to_evict,
+                )
+
+    def get_memory_usage(self) -> dict[str, dict[str, dict[str, int]]]:
+        """Estimate the memory held by the buffered samples of each sub-stream.
+
+        Returns:
+            dict[str, dict[str, dict[str, int]]]: Bytes of sample data, keyed by topic, device and sub-stream names.
+        """
+        usage: dict[str, dict[str, dict[str, int]]] = {}
+        for (topic_name, device_name), buffer in self._buffers.items():
+            usage.setdefault(topic_name, {})[device_name] = buffer.memory_bytes
+        return usage
+
+    def get_device_memory_bytes(self, topic: str, device_name: str) -> int:
+        """Estimate the memory held by the buffered samples of all sub-streams of a device.
+
+        Args:
+            topic (str): Topic of the `Stream`.
+            device_name (str): Device tree name.
+
+        Returns:
+            int: Bytes of sample data.
+        """
+        buffer = self._buffers.get((topic, device_name))
+        return sum(buffer.memory_bytes.values()) if buffer is not None else 0
+
+    @staticmethod
+    def _get_sample_bytes(info: dict) -> int:
+        """[Internal] Size of the array of one sample, per the declared data type and sample size."""
+        try:
+            itemsize = np.dtype(info["data_type"]).itemsize
+        except (KeyError, TypeError):
+            itemsize = 0
+        return itemsize * math.prod(info.get("sample_size") or (1,))
@@ -0,0 +1,213 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from collections import deque
+import random
+import threading
+import time
+
+RENDER_PRIORITIES = ("high", "normal", "low")
+
+RENDER = "render"
+DEGRADE = "degrade"
+SKIP = "skip"
+
+
+class RenderScheduler:
+    """Admission control of periodic widget renders against a CPU-time budget of the GUI process.
+
+    Measures the CPU time the whole process spent (receiving and decoding data, encoding
+    frames, serving callbacks) over a sliding window of ticks, and compares it with the budget.
+    High-priority widgets always render. Under load, normal-priority widgets render on a
+    fraction of their ticks, and low-priority widgets render first at a lower resolution,
+    then also on a fraction of their ticks. Admission is randomized so that concurrent
+    clients of the same widget are degraded fairly. Per-widget decisions and render costs
+    are tracked for diagnostics.
+    """
+
+    def __init__(
+        self,
+        tick_ms: float = 100.0,
+        budget_ms: float = 50.0,
+        window_ticks: int = 10,
+        low_load: float = 0.5,
+        normal_skip_ratio: float = 0.5,
+        low_skip_ratio: float = 0.8,
+    ):
+        self.configure(
+            tick_ms=tick_ms,
+            budget_ms=budget_ms,
+            window_ticks=window_ticks,
+            low_load=low_load,
+            normal_skip_ratio=normal_skip_ratio,
+            low_skip_ratio=low_skip_ratio,
+        )
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._samples: deque[tuple[float, float]] = deque()
+        self._load: float = 0.0
+        self._widgets: dict[str, dict] = {}
+
+    def configure(
+        self,
+        tick_ms: float = 100.0,
+        budget_ms: float = 50.0,
+        window_ticks: int = 10,
+        low_load: float = 0.5,
+        normal_skip_ratio: float = 0.5,
+        low_skip_ratio: float = 0.8,
+    ) -> None:
+        """Set the budget and the degradation policy.
+
+        Args:
+            tick_ms (float, optional): Duration of a tick. Defaults to `100.0`.
+            budget_ms (float, optional): CPU time the process may spend per tick, across all its threads. Defaults to `50.0`.
+            window_ticks (int, optional): Number of ticks to average the load over. Defaults to `10`.
+            low_load (float, optional): Fraction of the budget above which low-priority widgets start to degrade. Defaults to `0.5`.
+            normal_skip_ratio (float, optional): Fraction of ticks normal-priority widgets skip when over budget. Defaults to `0.5`.
+            low_skip_ratio (float, optional): Fraction of ticks low-priority widgets skip when over budget. Defaults to `0.8`.
+        """
+        self._tick_s = tick_ms / 1000
+        self._budget_s = budget_ms / 1000
+        self._window_s = window_ticks * self._tick_s
+        self._low_load = low_load
+        self._normal_skip_ratio = normal_skip_ratio
+        self._low_skip_ratio = low_skip_ratio
+
+    @property
+    def load(self) -> float:
+        """CPU time spent per tick over the recent window, as a fraction of the budget."""
+        now_s = time.perf_counter()
+        with self._lock:
+            if not self._samples or now_s - self._samples[-1][0] >= self._tick_s:
+                self._samples.append((now_s, time.process_time()))
+                while (
+                    len(self._samples) > 2
+                    and now_s - self._samples[1][0] >= self._window_s
+                ):
+                    self._samples.popleft()
+                (t0, cpu0), (t1, cpu1) = self._samples[0], self._samples[-1]
+                self._load = (
+                    (cpu1 - cpu0) / (t1 - t0) * self._tick_s / self._budget_s
+                    if t1 > t0
+                    else 0.0
+                )
+            return self._load
+
+    def admit(self, widget_id: str, priority: str) -> str:
+        """Decide whether a widget renders on this tick, and at what quality.
+
+        Remembers the decision for the calling thread, see `is_degraded`.
+
+        Args:
+            widget_id (str): Unique name of the widget.
+            priority (str): Priority class of the widget, one of `RENDER_PRIORITIES`.
+
+        Returns:
+            str: One of `RENDER`, `DEGRADE` (render at lower quality), or `SKIP`.
+        """
+        load = self.load
+        if priority == "high":
+            decision = RENDER
+        elif priority == "normal":
+            decision = (
+                RENDER
+                if load < 1.0 or random.random() >= self._normal_skip_ratio
+                else SKIP
+            )
+        elif load < self._low_load:
+            decision = RENDER
+        elif load < 1.0 or random.random() >= self._low_skip_ratio:
+            decision = DEGRADE
+        else:
+            decision = SKIP
+        self._local.decision = decision
+
+        with self._lock:
+            widget = self._widgets.setdefault(
+                widget_id,
+                {
+                    "priority": priority,
+                    "num_rendered": 0,
+                    "num_degraded": 0,
+                    "num_skipped": 0,
+                    "cpu_ms_mean": None,
+                },
+            )
+            widget["last_decision"] = decision
+            if decision == RENDER:
+                widget["num_rendered"] += 1
+            elif decision == DEGRADE:
+                widget["num_degraded"] += 1
+            else:
+                widget["num_skipped"] += 1
+        return decision
+
+    def is_degraded(self) -> bool:
+        """Whether the render admitted last in the calling thread should lower its quality.
+
+        Returns:
+            bool: `True` if admitted with `DEGRADE`.
+        """
+        return getattr(self._local, "decision", RENDER) == DEGRADE
+
+    def record(self, widget_id: str, cpu_s: float) -> None:
+        """Account for the CPU time a widget's render took.
+
+        Args:
+            widget_id (str): Unique name of the widget.
+            cpu_s (float): CPU time of the render in the calling thread.
+        """
+        with self._lock:
+            widget = self._widgets.get(widget_id)
+            if widget is None:
+                return
+            cpu_ms = 1000 * cpu_s
+            widget["cpu_ms_mean"] = (
+                cpu_ms
+                if widget["cpu_ms_mean"] is None
+                else widget["cpu_ms_mean"] + 0.1 * (cpu_ms - widget["cpu_ms_mean"])
+            )
+
+    def get_statistics(self) -> dict:
+        """Summarize the load and the scheduling decisions, for diagnostics.
+
+        Returns:
+            dict: Current load w.r.t. the budget, and per-widget decision counts and mean render CPU time.
+        """
+        load = self.load
+        with self._lock:
+            return {
+                "budget_ms_per_tick": 1000 * self._budget_s,
+                "tick_ms": 1000 * self._tick_s,
+                "load": load,
+                "widgets": {k: dict(v) for k, v in self._widgets.items()},
+            }
+
+
+# Shared by all widgets of the dashboard, like the Dash `app`.
+render_scheduler = RenderScheduler()
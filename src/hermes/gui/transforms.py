@@ -0,0 +1,252 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from abc import ABC, abstractmethod
+import numpy as np
+
+try:
+    from scipy import signal
+
+    IS_SCIPY_AVAILABLE = True
+except ImportError:
+    IS_SCIPY_AVAILABLE = False
+
+
+class Transform(ABC):
+    """Stateful transform of a multi-channel signal, applied to consecutive blocks of new samples.
+
+    Blocks are `(samples, channels)` arrays, processed vectorized across channels, with any
+    state carried over to the next block, so the output is the same as if the whole
+    signal was transformed at once.
+    """
+
+    @abstractmethod
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        """Transform the next block of samples.
+
+        Args:
+            x (np.ndarray): New samples of shape `(samples, channels)`.
+
+        Returns:
+            np.ndarray: Transformed samples, one per input sample.
+        """
+        pass
+
+    def get_num_channels(self, num_channels: int) -> int:
+        """Number of output channels for a given number of input channels."""
+        return num_channels
+
+    def reset(self) -> None:
+        """Forget the state carried over from previous blocks."""
+        pass
+
+
+class SosFilter(Transform):
+    """IIR filter as a cascade of second-order sections, with the filter state carried across blocks.
+
+    Runs `scipy.signal.sosfilt`, compiled and vectorized across channels, so requires `scipy`.
+    """
+
+    def __init__(self, sos: np.ndarray):
+        """Constructor of the SOS filter.
+
+        Args:
+            sos (np.ndarray): Second-order sections of shape `(sections, 6)`, as `[b0, b1, b2, a0, a1, a2]` rows.
+
+        Raises:
+            ImportError: If `scipy` is not installed.
+        """
+        if not IS_SCIPY_AVAILABLE:
+            raise ImportError("IIR filtering requires 'scipy'.")
+        self._sos = np.atleast_2d(np.asarray(sos, dtype=np.float64))
+        # Normalize the sections by their a0.
+        self._sos = self._sos / self._sos[:, 3:4]
+        self._zi: np.ndarray | None = None
+
+    @classmethod
+    def from_butter(
+        cls,
+        order: int,
+        cutoff_hz: float | list[float],
+        btype: str,
+        sampling_rate_hz: float,
+    ) -> "SosFilter":
+        """Design a Butterworth filter, requires `scipy`.
+
+        Args:
+            order (int): Order of the filter.
+            cutoff_hz (float | list[float]): Cutoff frequency, or band edges for band filters.
+            btype (str): One of 'lowpass', 'highpass', 'bandpass', 'bandstop'.
+            sampling_rate_hz (float): Sampling rate of the filtered signal.
+
+        Raises:
+            ImportError: If `scipy` is not installed.
+
+        Returns:
+            SosFilter: Filter with a fresh state.
+        """
+        if not IS_SCIPY_AVAILABLE:
+            raise ImportError("Designing Butterworth filters requires 'scipy'.")
+        return cls(
+            signal.butter(
+                order, cutoff_hz, btype=btype, fs=sampling_rate_hz, output="sos"
+            )
+        )
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        if self._zi is None:
+            # Start from the steady state of the first sample, to avoid a step transient.
+            self._zi = signal.sosfilt_zi(self._sos)[..., None] * np.asarray(
+                x[0], dtype=np.float64
+            )
+        y, self._zi = signal.sosfilt(self._sos, x, axis=0, zi=self._zi)
+        return y
+
+    def reset(self) -> None:
+        self._zi = None
+
+
+class MovingRms(Transform):
+    """Root-mean-square over a sliding window of the newest samples, e.g. an EMG envelope."""
+
+    def __init__(self, window_size: int):
+        """Constructor of the moving RMS.
+
+        Args:
+            window_size (int): Number of samples in the window.
+        """
+        self._window_size = window_size
+        self._tail: np.ndarray | None = None
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        squared = np.square(x, dtype=np.float64)
+        if self._tail is None:
+            self._tail = np.zeros((0,) + squared.shape[1:])
+        # Windowed sums as differences of a cumulative sum over the carried tail and the new block.
+        extended = np.concatenate((self._tail, squared), axis=0)
+        cumsum = np.cumsum(extended, axis=0)
+        cumsum = np.concatenate((np.zeros((1,) + cumsum.shape[1:]), cumsum), axis=0)
+        end = np.arange(len(self._tail) + 1, len(extended) + 1)
+        start = np.maximum(end - self._window_size, 0)
+        sums = cumsum[end] - cumsum[start]
+        self._tail = (
+            extended[-(self._window_size - 1) :]
+            if self._window_size > 1
+            else extended[:0]
+        )
+        return np.sqrt(np.maximum(sums, 0.0) / (end - start)[:, None])
+
+    def reset(self) -> None:
+        self._tail = None
+
+
+class Magnitude(Transform):
+    """Euclidean norm across channels, e.g. the acceleration magnitude of an IMU."""
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        return np.linalg.norm(x, axis=1, keepdims=True)
+
+    def get_num_channels(self, num_channels: int) -> int:
+        return 1
+
+
+class Scale(Transform):
+    """Affine unit conversion of all channels."""
+
+    def __init__(self, gain: float = 1.0, offset: float = 0.0):
+        """Constructor of the scaling.
+
+        Args:
+            gain (float, optional): Multiplier of the signal. Defaults to `1.0`.
+            offset (float, optional): Constant added after scaling. Defaults to `0.0`.
+        """
+        self._gain = gain
+        self._offset = offset
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        return x * self._gain + self._offset
+
+
+class TransformChain(Transform):
+    """Sequence of transforms applied one after the other."""
+
+    def __init__(self, transforms: list[Transform]):
+        self._transforms = transforms
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        for transform in self._transforms:
+            x = transform(x)
+        return x
+
+    def get_num_channels(self, num_channels: int) -> int:
+        for transform in self._transforms:
+            num_channels = transform.get_num_channels(num_channels)
+        return num_channels
+
+    def reset(self) -> None:
+        for transform in self._transforms:
+            transform.reset()
+
+
+def build_transform_chain(
+    specs: list[dict], sampling_rate_hz: float | None = None
+) -> TransformChain:
+    """Create a transform chain from its configuration, e.g. from an experiment config file.
+
+    Each spec has a 'type' among 'sos', 'butter', 'rms', 'magnitude', 'scale',
+    and the constructor arguments of the corresponding transform. Butterworth filters
+    use `sampling_rate_hz`, unless their spec sets it.
+
+    Args:
+        specs (list[dict]): Transforms to apply, in order.
+        sampling_rate_hz (float | None, optional): Sampling rate of the transformed signal. Defaults to `None`.
+
+    Raises:
+        ValueError: If a transform type is unknown.
+        ImportError: If filters are configured without `scipy` installed.
+
+    Returns:
+        TransformChain: Chain with a fresh state.
+    """
+    transforms = []
+    for spec in specs:
+        spec = dict(spec)
+        transform_type = spec.pop("type")
+        if transform_type == "sos":
+            transforms.append(SosFilter(**spec))
+        elif transform_type == "butter":
+            spec.setdefault("sampling_rate_hz", sampling_rate_hz)
+            transforms.append(SosFilter.from_butter(**spec))
+        elif transform_type == "rms":
+            transforms.append(MovingRms(**spec))
+        elif transform_type == "magnitude":
+            transforms.append(Magnitude())
+        elif transform_type == "scale":
+            transforms.append(Scale(**spec))
+        else:
+            raise ValueError("Transform type '%s' is not supported." % transform_type)
+    return TransformChain(transforms)
@@ -26,16 +26,61 @@
 # ############
 
 import threading
-from wsgiref.simple_server import make_server
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import make_server, WSGIServer
+from flask import Response, abort, jsonify, request
+import dash_bootstrap_components as dbc
+import zmq
 
 from hermes.base.nodes.consumer import Consumer
+from hermes.utils.msgpack_utils import deserialize
+from hermes.utils.time_utils import get_time
 from hermes.utils.types import LoggingSpec
 from hermes.utils.zmq_utils import *
 from hermes.gui.gui_utils import server, app
+from hermes.gui.mjpeg import MJPEG_BOUNDARY
+from hermes.gui.display_relay import DEFAULT_RELAY_RATE_HZ, PORT_DISPLAY_RELAY
+from hermes.gui.retention import RetentionPolicy
+from hermes.gui.annotations import annotation_timeline
+from hermes.gui.compression import ResponseCompressor
+from hermes.gui.scheduler import render_scheduler
+from hermes.gui.layout_cache import LayoutCache
+from hermes.gui.widgets import (
+    Visualizer,
+    VideoVisualizer,
+    StreamHealthVisualizer,
+    DataExportVisualizer,
+)
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    """WSGI server handling each request in its own thread, for long-lived MJPEG responses."""
+
+    daemon_threads = True
 
 
 class DataVisualizer(Consumer):
-    """Consumer node that visualizes streaming data using Dash GUI."""
+    """Consumer node that visualizes streaming data using Dash GUI.
+
+    Dispatches each received data packet to the widgets built on its `Stream`
+    and exposes a `/mjpeg/<unique_id>` route for each video widget in MJPEG mode.
+
+    Can aggregate the streams of several HERMES hosts into one dashboard: streams
+    whose spec has a `host_ip` are received directly from the `DisplayRelay`
+    of that host (on the spec's `port_relay`, or `PORT_DISPLAY_RELAY`), which
+    limits their rate at the source, instead of through the local Broker. Their
+    health is measured against the spec's `relay_rate_hz`, or `DEFAULT_RELAY_RATE_HZ`.
+
+    Evicts buffered samples older than what its widgets read, unless they are kept to be
+    dumped to disk at the end, and reports memory use of the buffers on the `/diagnostics` route.
+    Notes received from a `NotesStreamer` are added to the shared `annotation_timeline`.
+    Compresses large responses for remote viewing over weak links, reporting the
+    compression ratio and CPU cost on the `/diagnostics` route too.
+    Periodic widget updates share a CPU-time budget per tick, degrading low-priority
+    widgets under load, with the scheduling decisions also reported on `/diagnostics`.
+    Widgets of the same type share pattern-matching callbacks, and the serialized layout
+    and callback graph are cached per experiment config, for fast page loads and restarts.
+    """
 
     @classmethod
     def _log_source_tag(cls) -> str:
@@ -50,6 +95,14 @@ class DataVisualizer(Consumer):
         port_sub: str = PORT_FRONTEND,
         port_sync: str = PORT_SYNC_HOST,
         port_killsig: str = PORT_KILL,
+        stream_health_spec: dict | None = None,
+        data_export_spec: dict | None = None,
+        retention_period_s: float | None = 1.0,
+        compression_spec: dict | None = None,
+        render_budget_spec: dict | None = None,
+        layout_cache_spec: dict | None = None,
+        is_compressing: bool = True,
+        is_caching_layout: bool = True,
         **_,
     ):
 
@@ -62,20 +115,118 @@ class DataVisualizer(Consumer):
             port_killsig=port_killsig,
         )
 
+        # Streams of remote hosts are received from their display relays, at display rate.
+        self._remote_endpoints: dict[str, str] = {
+            spec["topic"]: "tcp://%s:%s"
+            % (spec["host_ip"], spec.get("port_relay", PORT_DISPLAY_RELAY))
+            for spec in stream_in_specs
+            if spec.get("host_ip") is not None
+        }
+        self._sub_remote: zmq.SyncSocket | None = None
+        # Rate the remote hosts' relays forward each of their topics at, for health statistics.
+        relay_rates_hz = {
+            spec["topic"]: spec.get("relay_rate_hz", DEFAULT_RELAY_RATE_HZ)
+            for spec in stream_in_specs
+            if spec.get("host_ip") is not None
+        }
+
+        if render_budget_spec is not None:
+            render_scheduler.configure(**render_budget_spec)
+
+        # Reuse the layout built for the same experiment config, unless disabled with `is_caching_layout=False`.
+        self._layout_cache = (
+            LayoutCache(
+                config={
+                    "stream_in_specs": stream_in_specs,
+                    "stream_health_spec": stream_health_spec,
+                    "data_export_spec": data_export_spec,
+                },
+                stream_classes=[type(stream) for stream in self._streams.values()],
+                **(layout_cache_spec or {}),
+            )
+            if is_caching_layout
+            else None
+        )
+        # Widgets are still needed for their data and callbacks, but not their figure templates.
+        Visualizer.defer_figures(
+            self._layout_cache is not None and self._layout_cache.is_hit
+        )
+
         # Init all Dash widgets before launching the server and the GUI thread.
         # NOTE: order Dash widgets in the order of streamer specs provided upstream.
+        visualizers = [stream.build_visulizer() for stream in self._streams.values()]
+        # Optional export of the buffered data of selected streams.
+        self._data_export = (
+            DataExportVisualizer(streams=self._streams, **data_export_spec)
+            if data_export_spec is not None
+            else None
+        )
+        # Keep only as much data in memory as the widgets read,
+        #   except for the devices Storage still has to dump to disk at the end.
+        self._retention = RetentionPolicy(
+            streams=self._streams,
+            visualizers=Visualizer.get_instances(),
+            period_s=retention_period_s or 0.0,
+            is_evicting=retention_period_s is not None,
+            unbounded_devices=RetentionPolicy.get_dumped_devices(
+                self._streams, logging_spec
+            ),
+        )
+        # Optional stream health panel on top, fed with packets of all topics.
+        self._stream_health = (
+            StreamHealthVisualizer(
+                streams=self._streams,
+                memory_usage_fn=self._retention.get_device_memory_bytes,
+                relay_rates_hz=relay_rates_hz,
+                **stream_health_spec,
+            )
+            if stream_health_spec is not None
+            else None
+        )
+        if self._data_export is not None:
+            visualizers.insert(0, self._data_export.layout)
+        if self._stream_health is not None:
+            visualizers.insert(0, self._stream_health.layout)
         app.layout = dbc.Container(
-            [
-                visualizer
-                for visualizer in [
-                    stream.build_visulizer() for stream in self._streams.values()
-                ]
-                if visualizer is not None
-            ]
+            [visualizer for visualizer in visualizers if visualizer is not None]
+        )
+        Visualizer.defer_figures(False)
+        if self._layout_cache is not None:
+            self._layout_cache.init_app(app, server)
+
+        # Route incoming packets of each topic to the widgets built on its Stream.
+        self._packet_listeners: dict[str, list[Visualizer]] = {
+            topic_name: [v for v in Visualizer.get_instances() if v.stream is stream]
+            for topic_name, stream in self._streams.items()
+        }
+        if self._stream_health is not None:
+            for listeners in self._packet_listeners.values():
+                listeners.append(self._stream_health)
+
+        # Expose live video widgets as MJPEG streams, bypassing Dash callbacks.
+        self._mjpeg_videos = {
+            v.unique_id: v for v in VideoVisualizer.get_instances() if v.broadcasters
+        }
+        server.add_url_rule(
+            "/mjpeg/<unique_id>", endpoint="mjpeg", view_func=self._serve_mjpeg
+        )
+        # Compress responses, unless disabled with `is_compressing=False`.
+        self._compressor = (
+            ResponseCompressor(**(compression_spec or {})) if is_compressing else None
+        )
+        if self._compressor is not None:
+            self._compressor.init_app(server)
+        server.add_url_rule(
+            "/diagnostics", endpoint="diagnostics", view_func=self._serve_diagnostics
         )
 
         # Launch Dash GUI thread.
-        self._flask_server = make_server(DNS_LOCALHOST, int(PORT_GUI), server)
+        self._flask_server = make_server(
+            DNS_LOCALHOST,
+            int(PORT_GUI),
+            server,
+            server_class=_ThreadingWSGIServer,
+        )
         self._flask_server_thread = threading.Thread(
             target=self._flask_server.serve_forever
         )
@@ -86,8 +237,99 @@ class DataVisualizer(Consumer):
         )
         self._dash_app_thread.start()
 
+    def _serve_mjpeg(self, unique_id: str) -> Response:
+        if unique_id not in self._mjpeg_videos:
+            abort(404)
+        broadcaster = self._mjpeg_videos[unique_id].get_broadcaster(
+            is_full_resolution=request.args.get("full") == "1"
+        )
+        return Response(
+            broadcaster.stream(),
+            mimetype="multipart/x-mixed-replace; boundary=%s" % MJPEG_BOUNDARY,
+        )
+
+    def _serve_diagnostics(self) -> Response:
+        return jsonify(
+            {
+                "retention": {
+                    "is_evicting": self._retention.is_evicting,
+                    "memory_bytes": self._retention.get_memory_usage(),
+                },
+                "compression": (
+                    self._compressor.get_statistics()
+                    if self._compressor is not None
+                    else None
+                ),
+                "render": render_scheduler.get_statistics(),
+            }
+        )
+
+    def _initialize(self):
+        super()._initialize()
+        if self._remote_endpoints:
+            # Socket to subscribe to display relays of remote hosts,
+            #   while not receiving their full-rate data through the local Broker.
+            self._sub_remote = self._ctx.socket(zmq.SUB)
+            for endpoint in set(self._remote_endpoints.values()):
+                self._sub_remote.connect(endpoint)
+            for topic_name in self._remote_endpoints.keys():
+                self._sub.unsubscribe(topic_name)
+                self._sub_remote.subscribe(topic_name)
+
+    def _activate_data_poller(self) -> None:
+        super()._activate_data_poller()
+        if self._sub_remote is not None:
+            self._poller.register(self._sub_remote, zmq.POLLIN)
+
+    def _on_poll(self, poll_res):
+        if self._sub_remote is not None and self._sub_remote in poll_res[0]:
+            self._poll_data_fn(self._sub_remote)
+        super()._on_poll(poll_res)
+
+    def _poll_data_packets(self, sub: zmq.SyncSocket | None = None) -> None:
+        topic, payload = (sub or self._sub).recv_multipart()
+        receive_time = get_time()
+        msg = deserialize(payload)
+        topic_tree: list[str] = topic.decode("utf-8").split(".")
+        self._on_data_packet(topic_tree[0], receive_time, msg)
+
+    def _poll_ending_data_packets(self, sub: zmq.SyncSocket | None = None) -> None:
+        topic, payload = (sub or self._sub).recv_multipart()
+        receive_time = get_time()
+        topic_tree: list[str] = topic.decode("utf-8").split(".")
+        # 'END' empty packet from a Producer.
+        if CMD_END.encode("utf-8") in payload:
+            self._is_producer_ended[topic_tree[0]] = True
+            if all(list(self._is_producer_ended.values())):
+                self._is_done = True
+        # Regular data packets.
+        else:
+            msg = deserialize(payload)
+            self._on_data_packet(topic_tree[0], receive_time, msg)
+
+    def _on_data_packet(self, topic_name: str, receive_time: float, msg: dict) -> None:
+        """Store the received packet and notify the widgets subscribed to its topic."""
+        self._streams[topic_name].append_data(process_time_s=receive_time, **msg)
+        self._retention.on_data_packet(
+            topic=topic_name, process_time_s=receive_time, data=msg["data"]
+        )
+        annotation_timeline.on_data_packet(
+            process_time_s=receive_time,
+            data=msg["data"],
+            stream=self._streams[topic_name],
+        )
+        for visualizer in self._packet_listeners[topic_name]:
+            visualizer.on_data_packet(
+                process_time_s=receive_time, topic=topic_name, **msg
+            )
+
     def _cleanup(self):
+        for video in self._mjpeg_videos.values():
+            for broadcaster in video.broadcasters:
+                broadcaster.close()
         self._flask_server.shutdown()
         self._flask_server_thread.join()
         self._dash_app_thread.join()
+        if self._sub_remote is not None:
+            self._sub_remote.close()
         super()._cleanup()
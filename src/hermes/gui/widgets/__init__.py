@@ -1,9 +1,13 @@
-from .visualizer import Visualizer
+from .visualizer import Visualizer, FigureVisualizer
 from .video import VideoVisualizer
 from .gaze import GazeVisualizer
 
 # from .InsolePressureVisualizer import InsolePressureVisualizer
 from .lineplot import LinePlotVisualizer
+from .spectrogram import SpectrogramVisualizer
+from .raster_overview import RasterOverviewVisualizer
 from .experiment_control import ExperimentControlVisualizer
+from .stream_health import StreamHealthVisualizer
+from .data_export import DataExportVisualizer
 
 # from .SkeletonVisualizer import SkeletonVisualizer
@@ -0,0 +1,347 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from collections import OrderedDict
+import os
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from dash import Output, Input, State, dcc, html
+import dash_bootstrap_components as dbc
+from flask import Response, abort, send_from_directory
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    IS_PARQUET_AVAILABLE = True
+except ImportError:
+    IS_PARQUET_AVAILABLE = False
+
+from hermes.gui.widgets import Visualizer
+from hermes.base.stream import Stream
+from hermes.gui.gui_utils import server, app
+
+
+class DataExportVisualizer(Visualizer):
+    """Export of the recently buffered data of selected streams, during a trial.
+
+    Snapshots the last seconds of each selected sub-stream from the in-memory `Stream`s,
+    converts them to arrays in bulk, and writes an NPZ archive or a zip of Parquet
+    tables (one per sub-stream, requires `pyarrow`) in a background thread, so live updates
+    keep running. The file is then offered as a download link served by the Flask server,
+    and deleted once downloaded, or when it expires unclaimed.
+
+    Only the exportable sub-streams are retained for the longest exportable window,
+    which by default leaves out devices streaming video or other frames.
+    """
+
+    def __init__(
+        self,
+        streams: OrderedDict[str, Stream],
+        export_dir: str | None = None,
+        default_duration_s: float = 30.0,
+        max_duration_s: float = 60.0,
+        paths: list[str] | None = None,
+        job_ttl_s: float = 600.0,
+        col_width: int = 12,
+    ):
+        """Constructor of the data export panel.
+
+        Args:
+            streams (OrderedDict[str, Stream]): Streams of the `DataVisualizer`, keyed by topic.
+            export_dir (str | None, optional): Directory to write exported files to. Defaults to a new temporary directory.
+            default_duration_s (float, optional): Default length of the exported window. Defaults to `30.0`.
+            max_duration_s (float, optional): Longest exportable window, retained in memory for the exportable sub-streams. Defaults to `60.0`.
+            paths (list[str] | None, optional): Exportable sub-streams, as 'topic/device/stream' paths.
+                Defaults to all sub-streams of the devices without frame sub-streams.
+            job_ttl_s (float, optional): How long a finished export is kept for download. Defaults to `600.0`.
+            col_width (int, optional): Width of the panel in the grid. Defaults to `12`.
+        """
+        super().__init__(stream=None, col_width=col_width, priority="high")
+        self._streams = streams
+        self._export_dir = export_dir or tempfile.mkdtemp(prefix="hermes-export-")
+        os.makedirs(self._export_dir, exist_ok=True)
+        self._jobs: dict[str, dict] = {}
+        self._jobs_lock = threading.Lock()
+        self._job_ttl_s = job_ttl_s
+        self._max_duration_s = max_duration_s
+
+        # Flat list of exportable sub-streams, as 'topic/device/stream' paths.
+        self._paths: OrderedDict[str, tuple[str, str, str]] = OrderedDict()
+        for topic_name, stream in streams.items():
+            for device_name in stream.get_device_names():
+                stream_names = [
+                    stream_name
+                    for stream_name in stream.get_stream_names(device_name)
+                    if stream_name != "process_time_s"
+                ]
+                # Sub-streams of a device are retained together, so skip whole devices with frames.
+                if paths is None and any(
+                    self._is_frame(stream.get_stream_info(device_name, stream_name))
+                    for stream_name in stream_names
+                ):
+                    continue
+                for stream_name in stream_names:
+                    path = "%s/%s/%s" % (topic_name, device_name, stream_name)
+                    if paths is None or path in paths:
+                        self._paths[path] = (topic_name, device_name, stream_name)
+
+        formats = [{"label": "NPZ", "value": "npz"}]
+        formats.append(
+            {
+                "label": "Parquet",
+                "value": "parquet",
+                "disabled": not IS_PARQUET_AVAILABLE,
+            }
+        )
+        self._layout = dbc.Col(
+            [
+                dcc.Dropdown(
+                    list(self._paths.keys()),
+                    multi=True,
+                    placeholder="Streams to export",
+                    id="data-export-streams",
+                ),
+                dcc.RadioItems(formats, "npz", id="data-export-format", inline=True),
+                dcc.Input(
+                    id="data-export-duration",
+                    type="number",
+                    min=0,
+                    max=max_duration_s,
+                    value=default_duration_s,
+                ),
+                dbc.Button(
+                    "Export", id="data-export-btn", color="primary", className="me-1"
+                ),
+                html.Span(id="data-export-status", style={"verticalAlign": "middle"}),
+                dcc.Store(id="data-export-job"),
+                dcc.Interval(
+                    id="data-export-interval",
+                    interval=500,
+                    n_intervals=0,
+                    disabled=True,
+                ),
+            ],
+            width=self._col_width,
+        )
+        self._activate_callbacks()
+
+    def get_retention(self) -> dict[tuple[Stream, str, str], tuple[int, float]]:
+        return {
+            (self._streams[topic_name], device_name, stream_name): (
+                0,
+                self._max_duration_s,
+            )
+            for topic_name, device_name, stream_name in self._paths.values()
+        }
+
+    @staticmethod
+    def _is_frame(info: dict) -> bool:
+        """[Internal] Whether a sub-stream carries video or other multi-dimensional frames."""
+        return bool(info.get("is_video")) or len(info.get("sample_size") or ()) >= 2
+
+    def _snapshot(
+        self, topic_name: str, device_name: str, stream_name: str, duration_s: float
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        """Copy the buffered samples of a sub-stream within the last `duration_s` seconds into arrays.
+
+        Locates the start of the window on the buffered timestamps first, to copy only the window.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray] | None: Timestamps and samples, or `None` if the sub-stream is empty.
+        """
+        stream = self._streams[topic_name]
+        newest = stream.get_data(
+            device_name=device_name, stream_name=stream_name, starting_index=-1
+        )
+        if newest is None or not len(newest["time_s"]):
+            return None
+        num_timesteps = self._count_samples_after(
+            stream=stream,
+            device_name=device_name,
+            stream_name=stream_name,
+            reference_time_s=newest["time_s"][-1] - duration_s,
+        )
+        new_data = stream.get_data(
+            device_name=device_name,
+            stream_name=stream_name,
+            starting_index=-num_timesteps,
+        )
+        return np.asarray(new_data["time_s"]), np.asarray(new_data["data"])
+
+    def _export(
+        self, job_id: str, paths: list[str], format: str, duration_s: float
+    ) -> None:
+        """[Internal] Snapshot and write the selected sub-streams, run in a background thread."""
+        job = self._jobs[job_id]
+        try:
+            snapshots = OrderedDict()
+            for path in paths:
+                snapshot = self._snapshot(*self._paths[path], duration_s)
+                if snapshot is not None:
+                    snapshots[path.replace("/", ".")] = snapshot
+            filename = "hermes_%s_%s.%s" % (
+                time.strftime("%Y-%m-%d_%H-%M-%S"),
+                job_id[:8],
+                "npz" if format == "npz" else "zip",
+            )
+            filepath = os.path.join(self._export_dir, filename)
+            if format == "npz":
+                arrays = {}
+                for key, (time_s, data) in snapshots.items():
+                    arrays["%s.time_s" % key] = time_s
+                    arrays["%s.data" % key] = data
+                np.savez(filepath, **arrays)
+            else:
+                # Parquet files are compressed already, store them in the zip as is.
+                with zipfile.ZipFile(filepath, "w", zipfile.ZIP_STORED) as archive:
+                    for key, (time_s, data) in snapshots.items():
+                        columns = data.reshape(len(data), -1)
+                        table = pa.table(
+                            {
+                                "time_s": time_s,
+                                **{
+                                    "data_%d" % j: columns[:, j]
+                                    for j in range(columns.shape[1])
+                                },
+                            }
+                        )
+                        with archive.open("%s.parquet" % key, "w") as f:
+                            pq.write_table(table, f)
+            job["filename"] = filename
+            job["status"] = "done"
+        except Exception as e:
+            job["error"] = str(e)
+            job["status"] = "error"
+        job["finished_s"] = time.time()
+
+    def _expire_jobs(self) -> None:
+        """[Internal] Forget finished exports older than the TTL, deleting their files."""
+        now_s = time.time()
+        with self._jobs_lock:
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if now_s - job.get("finished_s", now_s) > self._job_ttl_s
+            ]
+            for job_id in expired:
+                self._remove_file(self._jobs.pop(job_id).get("filename"))
+
+    def _serve_export(self, filename: str) -> Response:
+        """[Internal] Send an exported file once, deleting it after the download."""
+        with self._jobs_lock:
+            job_id = next(
+                (
+                    job_id
+                    for job_id, job in self._jobs.items()
+                    if job.get("filename") == filename
+                ),
+                None,
+            )
+            if job_id is None:
+                abort(404)
+            del self._jobs[job_id]
+        response = send_from_directory(self._export_dir, filename, as_attachment=True)
+        # Passed through as is, the file would be closed without the callbacks of the response.
+        response.direct_passthrough = False
+        response.call_on_close(lambda: self._remove_file(filename))
+        return response
+
+    def _remove_file(self, filename: str | None) -> None:
+        """[Internal] Delete an exported file, if still there."""
+        if filename is None:
+            return
+        try:
+            os.remove(os.path.join(self._export_dir, filename))
+        except OSError:
+            pass
+
+    # Callback definition must be wrapped inside an object method
+    #   to get access to the class instance object with reference to `Stream`.
+    def _activate_callbacks(self):
+        server.add_url_rule(
+            "/export/<path:filename>",
+            endpoint="export",
+            view_func=self._serve_export,
+        )
+
+        @app.callback(
+            Output("data-export-job", "data"),
+            Output("data-export-interval", "disabled"),
+            Output("data-export-status", "children", allow_duplicate=True),
+            Input("data-export-btn", "n_clicks"),
+            State("data-export-streams", "value"),
+            State("data-export-format", "value"),
+            State("data-export-duration", "value"),
+            prevent_initial_call=True,
+        )
+        def start_export(n, paths, format, duration_s):
+            self._expire_jobs()
+            if not paths:
+                return None, True, "Select streams to export"
+            job_id = uuid.uuid4().hex
+            with self._jobs_lock:
+                self._jobs[job_id] = {"status": "running"}
+            threading.Thread(
+                target=self._export,
+                args=(
+                    job_id,
+                    paths,
+                    format,
+                    min(float(duration_s or 0), self._max_duration_s),
+                ),
+                daemon=True,
+            ).start()
+            return job_id, False, "Exporting..."
+
+        @app.callback(
+            Output("data-export-status", "children"),
+            Output("data-export-interval", "disabled", allow_duplicate=True),
+            Input("data-export-interval", "n_intervals"),
+            State("data-export-job", "data"),
+            prevent_initial_call=True,
+        )
+        def poll_export(n, job_id):
+            job = self._jobs.get(job_id)
+            if job is None:
+                return "Export expired", True
+            elif job["status"] == "running":
+                return "Exporting...", False
+            elif job["status"] == "error":
+                return "Export failed: %s" % job["error"], True
+            else:
+                return (
+                    html.A(
+                        "Download %s" % job["filename"],
+                        href="/export/%s" % job["filename"],
+                    ),
+                    True,
+                )
@@ -28,19 +28,23 @@
 from dash import Output, Input, State, dcc, html
 import dash_bootstrap_components as dbc
 import zmq
-import time
 
 from hermes.gui.widgets import Visualizer
 from hermes.base.stream import Stream
+from hermes.utils.time_utils import get_time
 from hermes.utils.zmq_utils import *
 from hermes.gui.gui_utils import app
+from hermes.gui.annotations import annotation_timeline
 
 
 class ExperimentControlVisualizer(Visualizer):
-    """Visualizer for experiment control."""
+    """Visualizer for experiment control.
+
+    Marked activities are also added to the shared `annotation_timeline`, to overlay on plots.
+    """
 
     def __init__(self, stream: Stream, activities: list[str], col_width: int = 6):
-        super().__init__(stream=stream, col_width=col_width)
+        super().__init__(stream=stream, col_width=col_width, priority="high")
 
         self._ctx: zmq.Context = zmq.Context.instance()
         self._eye_pause: zmq.SyncSocket = self._ctx.socket(zmq.REQ)
@@ -84,6 +88,10 @@ class ExperimentControlVisualizer(Visualizer):
         )
         self._activate_callbacks()
 
+    def get_retention(self) -> dict[tuple[Stream, str, str], tuple[int, float]]:
+        # Only appends marked activities, without reading them back.
+        return {}
+
     # Callback definition must be wrapped inside an object method
     #   to get access to the class instance object with reference to `Stream`.
     def _activate_callbacks(self):
@@ -132,7 +140,10 @@ class ExperimentControlVisualizer(Visualizer):
             prevent_initial_call=True,
         )
         def mark_activity(n, activity):
+            # On the clock of the received samples, to overlay at the right place on plots.
+            time_s = get_time()
             self._stream.append_data(
-                time_s=time.time(), data={"experiment": {"activity": activity}}
+                time_s=time_s, data={"experiment": {"activity": activity}}
             )
+            annotation_timeline.add_activity(time_s, activity)
             return activity
@@ -25,18 +25,129 @@
 #
 # ############
 
-from dash import Output, Input, State, dcc
+from threading import Lock
+from dash import Output, Input, Patch, dcc
 import dash_bootstrap_components as dbc
-import plotly.express as px
 import plotly.graph_objects as go
+import numpy as np
 
-from hermes.gui.widgets import Visualizer
+from hermes.gui.widgets import FigureVisualizer
 from hermes.base.stream import Stream
 from hermes.gui.gui_utils import app
+from hermes.gui.scheduler import render_scheduler
+from hermes.gui.frame_utils import DEFAULT_TIER_WIDTHS, FrameTiers, add_width_probe
 
 
-class GazeVisualizer(Visualizer):
-    """Visualizer for gaze streams."""
+class GazeDensity:
+    """Rolling density of gaze positions over the world frame.
+
+    Fixed-size 2D histogram with exponential forgetting, kept as of the newest sample:
+    each new sample decays the accumulated density to its timestamp, then is binned
+    straight away. The decay is a lazy global factor, folded into the bins only before
+    it underflows, so a sample costs O(1), regardless of the number of bins, the length
+    of the remembered window, or whether any client renders the density.
+    Samples and reads share the clock of the buffered samples' `time_s`.
+    """
+
+    def __init__(
+        self,
+        num_bins: tuple[int, int],
+        half_life_s: float,
+        width_px: int,
+        height_px: int,
+    ):
+        """Constructor of the gaze density accumulator.
+
+        Args:
+            num_bins (tuple[int, int]): Number of (vertical, horizontal) bins of the histogram.
+            half_life_s (float): Time after which a gaze sample's contribution halves.
+            width_px (int): Width of the native world frame.
+            height_px (int): Height of the native world frame.
+        """
+        self._num_bins = num_bins
+        self._tau_s = half_life_s / np.log(2)
+        self._scale = np.array([num_bins[1] / width_px, num_bins[0] / height_px])
+        # Histogram scaled by `1 / _weight`: decaying all bins multiplies only the weight.
+        self._hist = np.zeros(num_bins, dtype=np.float64)
+        self._weight: float = 1.0
+        self._time_s: float | None = None
+        self._lock = Lock()
+        self._num_samples: int = 0
+
+    @property
+    def num_samples(self) -> int:
+        """Number of gaze samples added so far, identifying the accumulated content."""
+        return self._num_samples
+
+    def add(
+        self,
+        time_s: float | np.ndarray,
+        x: float | np.ndarray,
+        y: float | np.ndarray,
+    ) -> None:
+        """Bin new gaze samples, in pixel coordinates of the native world frame.
+
+        Args:
+            time_s (float | np.ndarray): Timestamps of the samples.
+            x (float | np.ndarray): Horizontal gaze coordinates.
+            y (float | np.ndarray): Vertical gaze coordinates.
+        """
+        t = np.atleast_1d(np.asarray(time_s, dtype=np.float64))
+        xy = np.stack(np.broadcast_arrays(np.atleast_1d(x), np.atleast_1d(y)), axis=-1)
+        ny, nx = self._num_bins
+        col, row = np.floor(xy.astype(np.float64) * self._scale).astype(np.int64).T
+        is_inside = (col >= 0) & (col < nx) & (row >= 0) & (row < ny)
+        with self._lock:
+            self._num_samples += len(t)
+            newest_s = float(t.max())
+            if self._time_s is None:
+                self._time_s = newest_s
+            elif newest_s > self._time_s:
+                self._weight *= np.exp(-(newest_s - self._time_s) / self._tau_s)
+                self._time_s = newest_s
+            # Out-of-order samples count for what is left of them by now.
+            weights = (
+                np.exp(-(self._time_s - t[is_inside]) / self._tau_s) / self._weight
+            )
+            if len(weights) == 1:
+                self._hist[row[is_inside][0], col[is_inside][0]] += weights[0]
+            elif len(weights):
+                self._hist += np.bincount(
+                    row[is_inside] * nx + col[is_inside],
+                    weights=weights,
+                    minlength=ny * nx,
+                ).reshape(self._num_bins)
+            # Fold the weight into the bins only before it underflows, once per ~1000 half-lives.
+            if self._weight < 1e-200:
+                self._hist *= self._weight
+                self._weight = 1.0
+
+    def get(self, time_s: float) -> np.ndarray:
+        """Get the density as of a point in time, e.g. of the displayed world frame.
+
+        Args:
+            time_s (float): Time w.r.t. which to weigh the samples, never past the newest sample.
+
+        Returns:
+            np.ndarray: Density histogram of shape `num_bins`, rows top to bottom.
+        """
+        with self._lock:
+            if self._time_s is None or time_s <= self._time_s:
+                return self._hist * self._weight
+            return self._hist * (
+                self._weight * np.exp(-(time_s - self._time_s) / self._tau_s)
+            )
+
+
+class GazeVisualizer(FigureVisualizer):
+    """Visualizer for gaze streams.
+
+    Serves the world camera frame at the resolution tier matching the displayed size
+    of the client's graph, stretched over the native frame size, so gaze coordinates
+    and overlays stay in native pixel units regardless of the served tier.
+    Optionally overlays a semi-transparent heatmap of where the gaze has been
+    over the past few seconds.
+    """
 
     def __init__(
         self,
@@ -47,70 +158,250 @@ class GazeVisualizer(Visualizer):
         legend_name: str,
         update_interval_ms: int,  # TODO: have 2 update intervals (for video and for gaze overlay)
         col_width: int = 6,
+        resolution_tiers: list[int] | None = None,
+        is_density_overlay: bool = False,
+        density_bins: tuple[int, int] = (36, 64),
+        density_half_life_s: float = 2.0,
+        alignment_timesteps: int = 100,
+        alignment_tolerance_s: float = 0.1,
+        is_interpolate_gaze: bool = True,
+        jpeg_quality: int = 80,
+        priority: str = "low",
     ):
-        super().__init__(stream=stream, col_width=col_width)
+        super().__init__(stream=stream, col_width=col_width, priority=priority)
 
         self._world_data_path = world_data_path
         self._gaze_data_path = gaze_data_path
         self._legend_name = legend_name
         self._update_interval_ms = update_interval_ms
         self._unique_id = unique_id
+        self._alignment_timesteps = alignment_timesteps
+        self._alignment_tolerance_s = alignment_tolerance_s
+        self._is_interpolate_gaze = is_interpolate_gaze
+        self._jpeg_quality = jpeg_quality
+        self._frame_tiers = FrameTiers(resolution_tiers or DEFAULT_TIER_WIDTHS)
+        self._density: GazeDensity | None = None
+        if is_density_overlay:
+            frame_width_px, frame_height_px = self._get_frame_size()
+            self._density = GazeDensity(
+                num_bins=density_bins,
+                half_life_s=density_half_life_s,
+                width_px=frame_width_px,
+                height_px=frame_height_px,
+            )
 
-        self._image = dcc.Graph(id="%s-gaze" % (self._unique_id))
-        self._interval = dcc.Interval(
-            id="%s-gaze-interval" % (self._unique_id),
-            interval=self._update_interval_ms,
-            n_intervals=0,
+        self._image, self._interval, self._version = self._build_graph(
+            graph_name="gaze",
+            interval_name="gaze-interval",
+            update_interval_ms=self._update_interval_ms,
+            is_versioned=True,
+        )
+        self._width = dcc.Store(id=self._get_id("gaze-width"))
+        self._enlarge_btn = dbc.Button(
+            "Enlarge",
+            id=self._get_id("gaze-enlarge"),
+            color="secondary",
+            size="sm",
+            n_clicks=0,
+        )
+        self._layout = dbc.Col(
+            [
+                self._image,
+                self._enlarge_btn,
+                self._interval,
+                self._width,
+                self._version,
+            ],
+            id=self._get_id("gaze-col"),
+            width=self._col_width,
         )
-        self._layout = dbc.Col([self._image, self._interval], width=self._col_width)
         self._activate_callbacks()
 
+    def _get_frame_size(self) -> tuple[int, int]:
+        """[Internal] Native (width, height) of the world frames, from their declared `sample_size`.
+
+        Raises:
+            ValueError: If the world sub-stream does not declare the size of its frames.
+        """
+        world_device_name, world_stream_name = list(self._world_data_path.items())[0]
+        sample_size = self._stream.get_stream_info(
+            world_device_name, world_stream_name
+        ).get("sample_size")
+        if sample_size is None or len(sample_size) < 2:
+            raise ValueError(
+                "Gaze density of '%s/%s' needs the (height, width) 'sample_size' of its frames."
+                % (world_device_name, world_stream_name)
+            )
+        return int(sample_size[1]), int(sample_size[0])
+
+    def get_retention(self) -> dict[tuple[Stream, str, str], tuple[int, float]]:
+        world_device_name, world_stream_name = list(self._world_data_path.items())[0]
+        gaze_device_name, gaze_stream_name = list(self._gaze_data_path.items())[0]
+        return {
+            (self._stream, world_device_name, world_stream_name): (1, 0.0),
+            (self._stream, gaze_device_name, gaze_stream_name): (
+                self._alignment_timesteps,
+                0.0,
+            ),
+        }
+
+    def on_data_packet(self, process_time_s: float, data: dict, **_) -> None:
+        if self._density is None:
+            return
+        gaze_device_name, gaze_stream_name = list(self._gaze_data_path.items())[0]
+        if (data.get(gaze_device_name) or {}).get(gaze_stream_name) is None:
+            return
+        # Weigh samples by their own timestamp, on the clock of the world frames' `time_s`.
+        new_data = self._stream.get_data(
+            device_name=gaze_device_name,
+            stream_name=gaze_stream_name,
+            starting_index=-1,
+        )
+        if new_data is not None and len(new_data["time_s"]):
+            gaze_data = new_data["data"][-1]
+            self._density.add(new_data["time_s"][-1], gaze_data[0], gaze_data[1])
+
     # Callback definition must be wrapped inside an object method
     #   to get access to the class instance object with reference to `Stream`.
     def _activate_callbacks(self):
-        @app.callback(
-            Output("%s-gaze" % (self._unique_id), component_property="figure"),
-            Input(
-                "%s-gaze-interval" % (self._unique_id), component_property="n_intervals"
-            ),
-            State("%s-gaze" % (self._unique_id), component_property="figure"),
-            prevent_initial_call=True,
-        )
-        def update_live_data(n, old_fig):
-            # Display the captured image.
-            world_device_name, world_stream_name = list(self._world_data_path.items())[
-                0
-            ]
-            new_data = self._stream.get_data(
-                device_name=world_device_name,
-                stream_name=world_stream_name,
-                starting_index=-1,
+        cls = type(self)
+        if cls._is_registering("gaze-enlarge"):
+            add_width_probe(
+                element_id=cls._get_component_id("gaze"),
+                interval_id=cls._get_component_id("gaze-interval"),
+                store_id=cls._get_component_id("gaze-width"),
             )
-            if new_data is not None:
-                world_data = new_data["data"][0]
-                fig = px.imshow(img=world_data)
-                # fig.update(title_text=self._legend_name)
-                fig.update_layout(coloraxis_showscale=False)
-                fig.update_xaxes(showticklabels=False)
-                fig.update_yaxes(showticklabels=False)
-                # Overlay scene gaze point onto the image.
-                gaze_device_name, gaze_stream_name = list(self._gaze_data_path.items())[
-                    0
-                ]
-                new_gaze_data = self._stream.get_data(
-                    device_name=gaze_device_name,
-                    stream_name=gaze_stream_name,
-                    starting_index=-1,
+
+            @app.callback(
+                Output(cls._get_component_id("gaze-col"), component_property="width"),
+                Output(
+                    cls._get_component_id("gaze-enlarge"),
+                    component_property="children",
+                ),
+                Input(
+                    cls._get_component_id("gaze-enlarge"),
+                    component_property="n_clicks",
+                ),
+                prevent_initial_call=True,
+            )
+            def toggle_enlarge(n_clicks):
+                if n_clicks % 2:
+                    return 12, "Shrink"
+                else:
+                    return cls._get_triggered_instance()._col_width, "Enlarge"
+
+        self._activate_figure_callbacks(
+            graph_name="gaze",
+            interval_name="gaze-interval",
+            states=[("gaze-width", "data"), ("gaze-enlarge", "n_clicks")],
+            is_versioned=True,
+        )
+
+    def _build_figure(self) -> go.Figure:
+        # World frame, then the optional density heatmap, then the gaze marker on top.
+        traces = [go.Image(source=None, hoverinfo="skip")]
+        if self._density is not None:
+            traces.append(
+                go.Heatmap(
+                    z=None,
+                    zmin=0,
+                    colorscale=[
+                        [0, "rgba(255,0,0,0)"],
+                        [1, "rgba(255,0,0,0.6)"],
+                    ],
+                    zsmooth="best",
+                    showscale=False,
+                    hoverinfo="skip",
                 )
-                if new_gaze_data is not None:
-                    gaze_data = new_gaze_data["data"][0]
-                    fig.add_trace(
-                        go.Scatter(
-                            x=gaze_data[0],
-                            y=gaze_data[1],
-                            marker=dict(color="red", size=16),
-                        )
-                    )
-                return fig
-            else:
-                return old_fig
+            )
+        traces.append(
+            go.Scatter(x=[], y=[], mode="markers", marker=dict(color="red", size=16))
+        )
+        fig = go.Figure(traces)
+        # fig.update(title_text=self._legend_name)
+        fig.update_layout(margin=dict(l=0, r=0, t=0, b=0), showlegend=False)
+        fig.update_xaxes(showticklabels=False, constrain="domain")
+        fig.update_yaxes(
+            showticklabels=False,
+            autorange="reversed",
+            scaleanchor="x",
+            constrain="domain",
+        )
+        return fig
+
+    def _get_client_tier(
+        self, width_px: int | None, n_clicks: int
+    ) -> tuple[int | None, bool]:
+        """[Internal] Width and full resolution flag of the tier to serve a client, falling back
+        to the smallest tier while the scheduler degrades the widget."""
+        is_degraded = render_scheduler.is_degraded()
+        return (
+            None if is_degraded else width_px,
+            bool(n_clicks % 2) and not is_degraded,
+        )
+
+    def _get_figure_version(self, width_px: int | None, n_clicks: int) -> list | None:
+        world_device_name, world_stream_name = list(self._world_data_path.items())[0]
+        new_data = self._stream.get_data(
+            device_name=world_device_name,
+            stream_name=world_stream_name,
+            starting_index=-1,
+        )
+        if new_data is None:
+            return None
+        client_width_px, is_full_resolution = self._get_client_tier(width_px, n_clicks)
+        factor = self._frame_tiers.get_factor(
+            native_width_px=new_data["data"][0].shape[1],
+            client_width_px=client_width_px,
+            is_full_resolution=is_full_resolution,
+        )
+        # The gaze marker is aligned to the frame, only the density changes in between frames.
+        return [
+            float(new_data["time_s"][0]),
+            factor,
+            self._density.num_samples if self._density is not None else None,
+        ]
+
+    def _update_figure(self, patch: Patch, width_px: int | None, n_clicks: int) -> bool:
+        # Display the captured image.
+        world_device_name, world_stream_name = list(self._world_data_path.items())[0]
+        new_data = self._stream.get_data(
+            device_name=world_device_name,
+            stream_name=world_stream_name,
+            starting_index=-1,
+        )
+        if new_data is None:
+            return False
+        self._frame_tiers.update(new_data["data"][0], new_data["time_s"][0])
+        client_width_px, is_full_resolution = self._get_client_tier(width_px, n_clicks)
+        source, factor = self._frame_tiers.get_data_uri(
+            client_width_px=client_width_px,
+            is_full_resolution=is_full_resolution,
+            quality=self._jpeg_quality,
+        )
+        patch["data"][0]["source"] = source
+        patch["data"][0]["dx"] = factor
+        patch["data"][0]["dy"] = factor
+        # Overlay the rolling gaze density, stretched over the native frame.
+        if self._density is not None:
+            frame_height_px, frame_width_px = new_data["data"][0].shape[:2]
+            density = self._density.get(new_data["time_s"][0])
+            ny, nx = density.shape
+            patch["data"][1]["z"] = np.round(density, 3)
+            patch["data"][1]["x0"] = frame_width_px / nx / 2
+            patch["data"][1]["dx"] = frame_width_px / nx
+            patch["data"][1]["y0"] = frame_height_px / ny / 2
+            patch["data"][1]["dy"] = frame_height_px / ny
+        # Overlay the gaze point captured at the time of the frame.
+        (gaze_data,) = self._get_aligned_data(
+            reference_time_s=new_data["time_s"][0],
+            data_paths=[self._gaze_data_path],
+            num_timesteps=self._alignment_timesteps,
+            is_interpolate=self._is_interpolate_gaze,
+            tolerance_s=self._alignment_tolerance_s,
+        )
+        # Hide the marker rather than pin a stale gaze point to the frame.
+        marker_idx = 1 if self._density is None else 2
+        patch["data"][marker_idx]["x"] = [] if gaze_data is None else [gaze_data[0]]
+        patch["data"][marker_idx]["y"] = [] if gaze_data is None else [gaze_data[1]]
+        return True
@@ -25,19 +25,35 @@
 #
 # ############
 
-from dash import Output, Input, State, dcc
+from threading import Lock
+from dash import Patch, dcc
 import dash_bootstrap_components as dbc
-from plotly.tools import make_subplots
-import plotly.express as px
+from plotly.subplots import make_subplots
+import plotly.graph_objects as go
 import numpy as np
 
-from hermes.gui.widgets import Visualizer
+from hermes.gui.widgets import FigureVisualizer
 from hermes.base.stream import Stream
-from hermes.gui.gui_utils import app
+from hermes.gui.annotations import annotation_timeline, add_shapes_probe
+from hermes.gui.transforms import TransformChain, build_transform_chain
 
 
-class LinePlotVisualizer(Visualizer):
-    """Visualizer for line plot streams."""
+class LinePlotVisualizer(FigureVisualizer):
+    """Visualizer for line plot streams.
+
+    By default draws one SVG trace per DOF of each sub-stream, on its own subplot.
+    For dense multi-sensor plots, the WebGL render mode packs channels into as few
+    `Scattergl` traces as possible: either one trace per sub-stream with channels
+    separated by gaps (`channel_packing="separators"`), or a single trace with
+    each normalized channel stacked at its own offset on a shared axis (`channel_packing="offsets"`).
+
+    Overlays the activities and notes of the shared `annotation_timeline` as shaded regions
+    and vertical lines, sending each client only the shapes entering or leaving the plotted window.
+
+    Sub-streams can be displayed through a chain of `transforms` (filters, RMS envelope,
+    magnitude, unit scaling), applied once per tick to only the newly arrived samples,
+    with the transform state carried over between ticks and the output shared by all clients.
+    """
 
     def __init__(
         self,
@@ -48,66 +64,317 @@ class LinePlotVisualizer(Visualizer):
         plot_duration_timesteps: int,
         update_interval_ms: int,
         col_width: int = 6,
+        is_webgl: bool = False,
+        channel_packing: str = "separators",
+        is_annotated: bool = True,
+        transforms: dict[str, list[dict]] | None = None,
+        priority: str = "normal",
     ):
-        super().__init__(stream=stream, col_width=col_width)
+        super().__init__(stream=stream, col_width=col_width, priority=priority)
         self._data_path = data_path
         self._legend_names = legend_names
         self._plot_duration_timesteps = plot_duration_timesteps
         self._update_interval_ms = update_interval_ms
         self._unique_id = unique_id
+        self._is_webgl = is_webgl
+        if channel_packing not in ("separators", "offsets"):
+            raise ValueError(
+                "Channel packing '%s' is not one of 'separators', 'offsets'."
+                % channel_packing
+            )
+        self._channel_packing = channel_packing
+        self._is_annotated = is_annotated
 
-        self._figure = (dcc.Graph(id="%s-fig" % (self._unique_id)),)
-        self._interval = dcc.Interval(
-            id="%s-fig-interval" % (self._unique_id),
-            interval=self._update_interval_ms,
-            n_intervals=0,
+        device_name, stream_names = list(self._data_path.items())[0]
+        self._transforms: dict[str, TransformChain] = {
+            stream_name: build_transform_chain(
+                specs,
+                sampling_rate_hz=float(
+                    self._stream.get_stream_info(device_name, stream_name)[
+                        "sampling_rate_hz"
+                    ]
+                    or 0.0
+                )
+                or None,
+            )
+            for stream_name, specs in (transforms or {}).items()
+        }
+        self._num_dofs: list[int] = []
+        # Whether channels keep their legend names, or are renamed by a transform changing their number.
+        self._is_legend_named: list[bool] = []
+        for stream_name in stream_names:
+            num_dofs = int(
+                np.prod(
+                    self._stream.get_stream_info(device_name, stream_name)[
+                        "sample_size"
+                    ]
+                )
+            )
+            if stream_name in self._transforms:
+                num_dofs_out = self._transforms[stream_name].get_num_channels(num_dofs)
+            else:
+                num_dofs_out = num_dofs
+            self._num_dofs.append(num_dofs_out)
+            self._is_legend_named.append(num_dofs_out == num_dofs)
+        # Transformed samples of the plotted window, per sub-stream.
+        self._transform_lock = Lock()
+        self._transformed: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        # Subplots share the time axis of the bottom one.
+        self._xaxis_name = (
+            "xaxis%d" % len(stream_names)
+            if len(stream_names) > 1
+            and not (self._is_webgl and self._channel_packing == "offsets")
+            else "xaxis"
+        )
+
+        self._figure, self._interval = self._build_graph(
+            graph_name="fig",
+            interval_name="fig-interval",
+            update_interval_ms=self._update_interval_ms,
+        )
+        self._annotations = dcc.Store(id=self._get_id("fig-annotations"))
+        self._layout = dbc.Col(
+            [self._figure, self._interval, self._annotations], width=self._col_width
         )
-        self._layout = dbc.Col([self._figure, self._interval], width=self._col_width)
         self._activate_callbacks()
 
+    def get_retention(self) -> dict[tuple[Stream, str, str], tuple[int, float]]:
+        device_name, stream_names = list(self._data_path.items())[0]
+        return {
+            (self._stream, device_name, stream_name): (
+                self._plot_duration_timesteps,
+                0.0,
+            )
+            for stream_name in stream_names
+        }
+
     # Callback definition must be wrapped inside an object method
     #   to get access to the class instance object with reference to `Stream`.
     def _activate_callbacks(self):
-        @app.callback(
-            Output("%s-fig" % (self._unique_id), component_property="figure"),
-            Input(
-                "%s-fig-interval" % (self._unique_id), component_property="n_intervals"
-            ),
-            State("%s-fig" % (self._unique_id), component_property="figure"),
-            prevent_initial_call=True,
+        # Shared by annotated and plain plots, which draw no shapes and ignore the store.
+        self._activate_figure_callbacks(
+            graph_name="fig",
+            interval_name="fig-interval",
+            states=[("fig-annotations", "data")],
         )
-        def update_live_data(n, old_fig):
-            device_name, stream_names = self._data_path.items()[0]
-            new_data = self._stream.get_data_multiple_streams(
-                device_name=device_name,
-                stream_names=stream_names,
-                starting_index=-self._plot_duration_timesteps,
+        cls = type(self)
+        if cls._is_registering("fig-annotations"):
+            add_shapes_probe(
+                graph_id=cls._get_component_id("fig"),
+                store_id=cls._get_component_id("fig-annotations"),
             )
-            if new_data is not None:
-                fig = make_subplots(
-                    rows=len(new_data),
-                    cols=1,
-                    shared_yaxes=True,
-                    shared_xaxes=True,
-                    vertical_spacing=0.02,
-                    subplot_titles=stream_names,
-                )
 
-                # Create the line plot for each DOF.
-                for i, stream_data in enumerate(new_data):
-                    arr = np.array(stream_data["data"])
-                    for j in range(arr.shape[1]):
-                        fig.add_trace(
-                            px.scatter(
-                                x=stream_data["time_s"],
-                                y=arr[:, j],
-                                mode="lines",
-                                name=self._legend_names[j],
-                            ),
-                            row=i + 1,
-                            col=1,
-                        )
-                # fig.update(title_text=device_name)
-                return fig
+    def _build_figure(self) -> go.Figure:
+        device_name, stream_names = list(self._data_path.items())[0]
+        if self._is_webgl and self._channel_packing == "offsets":
+            # Single trace, each channel on its own unit-height lane of a shared axis.
+            fig = go.Figure(go.Scattergl(x=[], y=[], mode="lines"))
+            fig.update_yaxes(
+                tickmode="array",
+                tickvals=[k + 0.5 for k in range(sum(self._num_dofs))],
+                ticktext=[
+                    "%s %s" % (stream_name, self._get_channel_name(i, j))
+                    for i, stream_name in enumerate(stream_names)
+                    for j in range(self._num_dofs[i])
+                ],
+            )
+            fig.update_layout(showlegend=False)
+            return fig
+
+        fig = make_subplots(
+            rows=len(stream_names),
+            cols=1,
+            shared_yaxes=True,
+            shared_xaxes=True,
+            vertical_spacing=0.02,
+            subplot_titles=stream_names,
+        )
+        for i, stream_name in enumerate(stream_names):
+            if self._is_webgl:
+                # One trace for all DOFs of the sub-stream.
+                fig.add_trace(
+                    go.Scattergl(x=[], y=[], mode="lines", name=stream_name),
+                    row=i + 1,
+                    col=1,
+                )
             else:
-                return old_fig
+                # Create an empty line for each DOF, to fill with data on every tick.
+                for j in range(self._num_dofs[i]):
+                    fig.add_trace(
+                        go.Scatter(
+                            x=[], y=[], mode="lines", name=self._get_channel_name(i, j)
+                        ),
+                        row=i + 1,
+                        col=1,
+                    )
+        # fig.update(title_text=device_name)
+        return fig
+
+    def _update_figure(self, patch: Patch, annotations: dict | None = None) -> bool:
+        device_name, stream_names = list(self._data_path.items())[0]
+        new_data = self._stream.get_data_multiple_streams(
+            device_name=device_name,
+            stream_names=stream_names,
+            starting_index=-self._plot_duration_timesteps,
+        )
+        if new_data is None:
+            return False
+        new_data = [
+            self._apply_transforms(stream_name, stream_data)
+            for stream_name, stream_data in zip(stream_names, new_data)
+        ]
+        if not self._is_webgl:
+            trace_idx = 0
+            for i, stream_data in enumerate(new_data):
+                # Sized by the known DOFs, so that an empty sub-stream clears its lines.
+                arr = np.asarray(stream_data["data"]).reshape(
+                    len(stream_data["data"]), self._num_dofs[i]
+                )
+                for j in range(self._num_dofs[i]):
+                    patch["data"][trace_idx]["x"] = stream_data["time_s"]
+                    patch["data"][trace_idx]["y"] = arr[:, j]
+                    trace_idx += 1
+        elif self._channel_packing == "separators":
+            for i, stream_data in enumerate(new_data):
+                x, y = self._pack_channels(stream_data)
+                patch["data"][i]["x"] = x
+                patch["data"][i]["y"] = y
+        else:
+            packed = [
+                self._pack_channels(stream_data, lane_offset=sum(self._num_dofs[:i]))
+                for i, stream_data in enumerate(new_data)
+            ]
+            patch["data"][0]["x"] = np.concatenate([x for x, _ in packed])
+            patch["data"][0]["y"] = np.concatenate([y for _, y in packed])
+        time_s = [d["time_s"] for d in new_data if len(d["time_s"])]
+        if self._is_annotated and time_s:
+            self._update_annotations(
+                patch,
+                annotations,
+                start_s=min(t[0] for t in time_s),
+                end_s=max(t[-1] for t in time_s),
+            )
+        return True
+
+    def _apply_transforms(self, stream_name: str, stream_data: dict) -> dict:
+        """Transform the samples of a sub-stream that arrived since the last tick.
+
+        Appends the output to the transformed window of the sub-stream, shared by all clients,
+        so each sample goes through the transforms exactly once.
+
+        Args:
+            stream_name (str): Name of the sub-stream.
+            stream_data (dict): Timestamps and samples of the plotted window of the sub-stream.
+
+        Returns:
+            dict: Timestamps and samples of the transformed window, or `stream_data` as is if not transformed.
+        """
+        transform = self._transforms.get(stream_name)
+        if transform is None or not len(stream_data["time_s"]):
+            return stream_data
+        time_s = np.asarray(stream_data["time_s"], dtype=np.float64)
+        with self._transform_lock:
+            transformed = self._transformed.get(stream_name)
+            if transformed is not None and time_s[-1] < transformed[0][-1]:
+                # Time went backwards, e.g. a restarted recording.
+                transform.reset()
+                transformed = None
+            start = (
+                0
+                if transformed is None
+                else int(np.searchsorted(time_s, transformed[0][-1], side="right"))
+            )
+            if start < len(time_s):
+                new_data = np.asarray(
+                    stream_data["data"][start:], dtype=np.float64
+                ).reshape(len(time_s) - start, -1)
+                new_time_s, new_values = time_s[start:], transform(new_data)
+                if transformed is not None:
+                    new_time_s = np.concatenate((transformed[0], new_time_s))
+                    new_values = np.concatenate((transformed[1], new_values))
+                transformed = (
+                    new_time_s[-self._plot_duration_timesteps :],
+                    new_values[-self._plot_duration_timesteps :],
+                )
+                self._transformed[stream_name] = transformed
+            return {"time_s": transformed[0], "data": transformed[1]}
+
+    def _get_channel_name(self, stream_idx: int, dof_idx: int) -> str:
+        """[Internal] Legend name of a DOF, numbered if a transform changed the number of DOFs."""
+        if self._is_legend_named[stream_idx]:
+            return self._legend_names[dof_idx]
+        elif self._num_dofs[stream_idx] == 1:
+            return list(self._data_path.values())[0][stream_idx]
+        else:
+            return "%d" % dof_idx
+
+    def _update_annotations(
+        self, patch: Patch, annotations: dict | None, start_s: float, end_s: float
+    ) -> None:
+        """Patch the client's annotation shapes to those within the plotted window.
+
+        Drops the shapes that scrolled out of the window, appends the new ones, and extends
+        the activity in progress, or redraws all if the client's shapes are out of date.
+
+        Args:
+            patch (Patch): Patch of the figure.
+            annotations (dict | None): Span of annotations drawn on the client's figure.
+            start_s (float): Start of the plotted window.
+            end_s (float): End of the plotted window.
+        """
+        # Pin the time axis to the data, so that shapes out of the window don't stretch it.
+        patch["layout"][self._xaxis_name]["range"] = [start_s, end_s]
+        generation, lo, hi = annotation_timeline.get_span(start_s, end_s)
+        shapes = patch["layout"]["shapes"]
+        if (
+            annotations is None
+            or annotations["generation"] != generation
+            or lo < annotations["lo"]
+            or hi < annotations["hi"]
+        ):
+            patch["layout"]["shapes"] = annotation_timeline.get_shapes(lo, hi, end_s)
+            return
+        for _ in range(min(lo, annotations["hi"]) - annotations["lo"]):
+            del shapes[0]
+        if annotations["activity"] is not None and annotations["activity"] >= lo:
+            shapes[annotations["activity"] - lo]["x1"] = annotation_timeline.get_end(
+                annotations["activity"], end_s
+            )
+        new_lo = max(lo, annotations["hi"])
+        if hi > new_lo:
+            shapes.extend(annotation_timeline.get_shapes(new_lo, hi, end_s))
+
+    @staticmethod
+    def _pack_channels(
+        stream_data: dict, lane_offset: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Pack all DOFs of a sub-stream into one line, separated by NaN gaps.
+
+        Args:
+            stream_data (dict): Timestamps and samples of the sub-stream.
+            lane_offset (int | None, optional): If set, normalize each DOF to [0.1, 0.9]
+                and shift it to its lane, starting at this lane index. Defaults to `None`.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: X and Y coordinates of the packed trace.
+        """
+        time_s = np.asarray(stream_data["time_s"], dtype=np.float64)
+        if not len(time_s):
+            # Nothing to draw yet, nor to normalize against.
+            return np.empty(0), np.empty(0)
+        arr = np.asarray(stream_data["data"], dtype=np.float64).reshape(len(time_s), -1)
+        if lane_offset is not None:
+            v_min = np.nanmin(arr, axis=0)
+            v_span = np.nanmax(arr, axis=0) - v_min
+            v_span[~(v_span > 0)] = 1.0
+            arr = (
+                0.1
+                + 0.8 * (arr - v_min) / v_span
+                + lane_offset
+                + np.arange(arr.shape[1])
+            )
+        num_dofs = arr.shape[1]
+        # (DOFs, samples + 1 NaN separator) flattened into one polyline.
+        x = np.tile(np.append(time_s, np.nan), num_dofs)
+        y = np.vstack((arr, np.full((1, num_dofs), np.nan))).T.ravel()
+        return x, y
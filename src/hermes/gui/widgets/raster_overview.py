@@ -0,0 +1,295 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from dash import Output, Input, State, Patch, dcc, no_update
+import dash_bootstrap_components as dbc
+import plotly.graph_objects as go
+import numpy as np
+
+from hermes.gui.widgets import FigureVisualizer
+from hermes.base.stream import Stream
+from hermes.gui.gui_utils import app
+from hermes.gui.frame_utils import to_data_uri
+
+
+def rasterize_lines(
+    time_s: np.ndarray,
+    values: np.ndarray,
+    time_range_s: tuple[float, float],
+    width_px: int,
+    strip_height_px: int,
+) -> np.ndarray:
+    """Rasterize multi-channel time series into one binary strip per channel.
+
+    Bins samples into pixel columns and, per column, fills the vertical span covered
+    by the samples in it and by the line connecting it to the previous column.
+    All channels are processed at once with vectorized reductions, so the cost
+    grows with the number of samples and pixels, not with the number of channels drawn.
+
+    Args:
+        time_s (np.ndarray): Ascending timestamps of shape (N,).
+        values (np.ndarray): Samples of shape (N, C).
+        time_range_s (tuple[float, float]): Time span mapped onto the width of the strips.
+        width_px (int): Width of the strips.
+        strip_height_px (int): Height of each channel's strip.
+
+    Returns:
+        np.ndarray: Boolean mask of shape (C, strip_height_px, width_px), top row is the channel's maximum.
+    """
+    t_start, t_end = time_range_s
+    num_channels = values.shape[1]
+    # Normalize each channel to its own strip, maximum on the top row.
+    v_min = np.nanmin(values, axis=0)
+    v_span = np.nanmax(values, axis=0) - v_min
+    v_span[~(v_span > 0)] = 1.0
+    y = (1 - (values - v_min) / v_span) * (strip_height_px - 1)
+    x = np.clip(
+        ((time_s - t_start) / max(t_end - t_start, 1e-12) * (width_px - 1)).astype(
+            np.int64
+        ),
+        0,
+        width_px - 1,
+    )
+
+    # Value of each channel at every column, linearly interpolated between samples.
+    columns = np.arange(width_px)
+    idx = np.clip(np.searchsorted(x, columns), 1, len(x) - 1) if len(x) > 1 else None
+    if idx is None:
+        y_col = np.repeat(y[:1], width_px, axis=0)
+    else:
+        x0, x1 = x[idx - 1], x[idx]
+        w = np.clip((columns - x0) / np.maximum(x1 - x0, 1), 0, 1)[:, None]
+        y_col = (1 - w) * y[idx - 1] + w * y[idx]
+
+    # Span covered by the line between consecutive columns.
+    y_prev = np.vstack((y_col[:1], y_col[:-1]))
+    lo = np.minimum(y_col, y_prev)
+    hi = np.maximum(y_col, y_prev)
+
+    # Widen each occupied column by the extremes of its samples.
+    starts = np.flatnonzero(np.diff(x, prepend=-1))
+    occupied = x[starts]
+    lo[occupied] = np.minimum(lo[occupied], np.minimum.reduceat(y, starts, axis=0))
+    hi[occupied] = np.maximum(hi[occupied], np.maximum.reduceat(y, starts, axis=0))
+
+    # (C, H, W) mask of the rows within the span of each column, samples outside the time range left blank.
+    rows = np.arange(strip_height_px)[None, :, None]
+    mask = (rows >= np.floor(lo).T[:, None, :]) & (rows <= np.ceil(hi).T[:, None, :])
+    is_in_range = (columns >= x[0]) & (columns <= x[-1])
+    mask &= is_in_range[None, None, :]
+    return mask.reshape(num_channels, strip_height_px, width_px)
+
+
+class RasterOverviewVisualizer(FigureVisualizer):
+    """Overview of high channel count streams, rasterized server-side into one image.
+
+    Draws every channel of the listed sub-streams as a strip of a single image,
+    so the browser renders one picture instead of hundreds of SVG traces and the cost
+    scales with pixels rather than with points or traces. Clicking a strip
+    opens the detailed line plot of that channel below the overview.
+    """
+
+    def __init__(
+        self,
+        stream: Stream,
+        unique_id: str,
+        data_path: dict[str, list[str]],
+        legend_names: list[str],
+        plot_duration_timesteps: int,
+        update_interval_ms: int,
+        width_px: int = 800,
+        strip_height_px: int = 16,
+        col_width: int = 12,
+        priority: str = "normal",
+    ):
+        super().__init__(stream=stream, col_width=col_width, priority=priority)
+        self._data_path = data_path
+        self._legend_names = legend_names
+        self._plot_duration_timesteps = plot_duration_timesteps
+        self._update_interval_ms = update_interval_ms
+        self._width_px = width_px
+        self._strip_height_px = strip_height_px
+        self._unique_id = unique_id
+
+        # Channel index -> (sub-stream index, DOF index), in strip order.
+        device_name, stream_names = list(self._data_path.items())[0]
+        self._channels: list[tuple[int, int]] = []
+        self._channel_names: list[str] = []
+        for i, stream_name in enumerate(stream_names):
+            sample_size = self._stream.get_stream_info(device_name, stream_name)[
+                "sample_size"
+            ]
+            for j in range(int(np.prod(sample_size))):
+                self._channels.append((i, j))
+                self._channel_names.append(
+                    "%s %s"
+                    % (
+                        stream_name,
+                        self._legend_names[j] if j < len(self._legend_names) else j,
+                    )
+                )
+        # Alternating strip backgrounds, to tell neighboring channels apart.
+        self._background = np.where(
+            (np.arange(len(self._channels)) % 2)[:, None, None, None],
+            np.array([235, 235, 235], dtype=np.uint8),
+            np.array([250, 250, 250], dtype=np.uint8),
+        )
+
+        self._figure, self._interval = self._build_graph(
+            graph_name="raster",
+            interval_name="raster-interval",
+            update_interval_ms=self._update_interval_ms,
+        )
+        self._detail = dcc.Graph(
+            id=self._get_id("raster-detail"),
+            figure=go.Figure(go.Scattergl(x=[], y=[], mode="lines")),
+            style={"display": "none"},
+        )
+        self._selected = dcc.Store(id=self._get_id("raster-selected"))
+        self._layout = dbc.Col(
+            [self._figure, self._interval, self._detail, self._selected],
+            width=self._col_width,
+        )
+        self._activate_callbacks()
+
+    def get_retention(self) -> dict[tuple[Stream, str, str], tuple[int, float]]:
+        device_name, stream_names = list(self._data_path.items())[0]
+        return {
+            (self._stream, device_name, stream_name): (
+                self._plot_duration_timesteps,
+                0.0,
+            )
+            for stream_name in stream_names
+        }
+
+    def _get_data(self) -> list[dict] | None:
+        device_name, stream_names = list(self._data_path.items())[0]
+        return self._stream.get_data_multiple_streams(
+            device_name=device_name,
+            stream_names=stream_names,
+            starting_index=-self._plot_duration_timesteps,
+        )
+
+    # Callback definition must be wrapped inside an object method
+    #   to get access to the class instance object with reference to `Stream`.
+    def _activate_callbacks(self):
+        self._activate_figure_callbacks(
+            graph_name="raster",
+            interval_name="raster-interval",
+        )
+        cls = type(self)
+        if not cls._is_registering("raster-detail"):
+            return
+
+        @app.callback(
+            Output(cls._get_component_id("raster-selected"), "data"),
+            Output(cls._get_component_id("raster-detail"), "style"),
+            Output(cls._get_component_id("raster-detail"), "figure"),
+            Input(cls._get_component_id("raster"), "clickData"),
+            prevent_initial_call=True,
+        )
+        def select_channel(click_data):
+            if not click_data or not click_data.get("points"):
+                return no_update, no_update, no_update
+            visualizer = cls._get_triggered_instance()
+            channel = int(click_data["points"][0]["y"] // visualizer._strip_height_px)
+            channel = min(max(channel, 0), len(visualizer._channels) - 1)
+            fig = go.Figure(go.Scattergl(x=[], y=[], mode="lines"))
+            fig.update_layout(
+                title_text=visualizer._channel_names[channel],
+                margin=dict(l=40, r=10, t=30, b=20),
+                height=250,
+            )
+            return channel, {"display": "block"}, fig
+
+        @app.callback(
+            Output(
+                cls._get_component_id("raster-detail"),
+                "figure",
+                allow_duplicate=True,
+            ),
+            Input(cls._get_component_id("raster-interval"), "n_intervals"),
+            State(cls._get_component_id("raster-selected"), "data"),
+            prevent_initial_call=True,
+        )
+        def update_detail(n, channel):
+            if channel is None:
+                return no_update
+            visualizer = cls._get_triggered_instance()
+            new_data = visualizer._get_data()
+            if new_data is None:
+                return no_update
+            i, j = visualizer._channels[channel]
+            arr = np.asarray(new_data[i]["data"])
+            patch = Patch()
+            patch["data"][0]["x"] = new_data[i]["time_s"]
+            patch["data"][0]["y"] = arr.reshape(len(arr), -1)[:, j]
+            return patch
+
+    def _build_figure(self) -> go.Figure:
+        fig = go.Figure(go.Image(source=None, hoverinfo="y"))
+        fig.update_xaxes(showticklabels=False)
+        fig.update_yaxes(
+            autorange="reversed",
+            tickmode="array",
+            tickvals=[
+                (c + 0.5) * self._strip_height_px for c in range(len(self._channels))
+            ],
+            ticktext=self._channel_names,
+        )
+        fig.update_layout(
+            margin=dict(l=0, r=0, t=0, b=0),
+            height=max(200, len(self._channels) * self._strip_height_px),
+        )
+        return fig
+
+    def _update_figure(self, patch: Patch) -> bool:
+        new_data = self._get_data()
+        if new_data is None or not all(len(d["time_s"]) for d in new_data):
+            return False
+        # Common time axis for all sub-streams in view.
+        t_start = min(d["time_s"][0] for d in new_data)
+        t_end = max(d["time_s"][-1] for d in new_data)
+        masks = []
+        for stream_data in new_data:
+            arr = np.asarray(stream_data["data"], dtype=np.float64)
+            masks.append(
+                rasterize_lines(
+                    time_s=np.asarray(stream_data["time_s"]),
+                    values=arr.reshape(len(arr), -1),
+                    time_range_s=(t_start, t_end),
+                    width_px=self._width_px,
+                    strip_height_px=self._strip_height_px,
+                )
+            )
+        mask = np.concatenate(masks, axis=0)
+        # (C, H, W, 3) strips with dark lines over the alternating backgrounds, stacked vertically.
+        img = np.where(mask[..., None], np.uint8(30), self._background)
+        patch["data"][0]["source"] = to_data_uri(
+            img.reshape(-1, self._width_px, 3), format="PNG"
+        )
+        return True
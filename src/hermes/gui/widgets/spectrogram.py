@@ -0,0 +1,284 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from threading import Lock
+from dash import Patch
+import dash_bootstrap_components as dbc
+import plotly.graph_objects as go
+import plotly.colors as pc
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from hermes.gui.widgets import FigureVisualizer
+from hermes.base.stream import Stream
+from hermes.gui.frame_utils import to_data_uri
+
+
+class ShortTimeSpectrum:
+    """Incremental short-time Fourier transform of a multi-channel signal.
+
+    Samples are added in blocks of any size, e.g. one per packet, and every complete
+    frame is transformed as soon as its last sample arrives, with the unframed remainder
+    carried over to the next block, so the columns are the same as those of a batch STFT
+    of the whole signal. The newest columns are kept in a ring buffer.
+    """
+
+    def __init__(
+        self,
+        window_size: int,
+        hop_size: int,
+        num_columns: int,
+        num_freqs: int | None = None,
+    ):
+        """Constructor of the incremental STFT.
+
+        Args:
+            window_size (int): Number of samples per frame, tapered with a Hann window.
+            hop_size (int): Number of samples between the starts of consecutive frames.
+            num_columns (int): Number of newest spectral columns to keep.
+            num_freqs (int | None, optional): Number of lowest frequency bins to keep. Defaults to `None`, keeping all.
+        """
+        self._window_size = window_size
+        self._hop_size = hop_size
+        self._num_columns = num_columns
+        self._num_freqs = num_freqs
+        self._taper = np.hanning(window_size)
+        self._tail: np.ndarray | None = None
+        self._columns: np.ndarray | None = None
+        self._num_columns_written: int = 0
+        self._lock = Lock()
+
+    @property
+    def num_columns_written(self) -> int:
+        """Number of columns transformed so far, identifying the content of the ring buffer."""
+        return self._num_columns_written
+
+    def add(self, samples: np.ndarray) -> int:
+        """Transform the frames completed by a block of new samples.
+
+        Args:
+            samples (np.ndarray): New samples of shape `(samples, channels)`.
+
+        Returns:
+            int: Number of new spectral columns.
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        with self._lock:
+            x = (
+                samples
+                if self._tail is None
+                else np.concatenate((self._tail, samples), axis=0)
+            )
+            num_frames = (
+                (len(x) - self._window_size) // self._hop_size + 1
+                if len(x) >= self._window_size
+                else 0
+            )
+            self._tail = x[num_frames * self._hop_size :]
+            if not num_frames:
+                return 0
+
+            # Transform only the frames that fit in the ring buffer,
+            #   (frames, channels, window) -> one batched FFT over all frames and channels.
+            num_kept = min(num_frames, self._num_columns)
+            frames = sliding_window_view(x, self._window_size, axis=0)[
+                (num_frames - num_kept) * self._hop_size :: self._hop_size
+            ][:num_kept]
+            spectrum = np.fft.rfft(frames * self._taper, axis=-1)[
+                ..., : self._num_freqs
+            ]
+            power_db = 10 * np.log10(np.abs(spectrum) ** 2 + 1e-12)
+
+            if self._columns is None:
+                self._columns = np.full(
+                    (self._num_columns, *power_db.shape[1:]), np.nan
+                )
+            idx = (
+                self._num_columns_written + num_frames - num_kept + np.arange(num_kept)
+            ) % self._num_columns
+            self._columns[idx] = power_db
+            self._num_columns_written += num_frames
+            return num_frames
+
+    def get_columns(self) -> np.ndarray | None:
+        """Get the kept spectral columns in dB, oldest to newest.
+
+        Returns:
+            np.ndarray | None: Columns of shape `(num_columns, channels, freqs)`, `NaN` where
+                not yet written, or `None` before the first column.
+        """
+        with self._lock:
+            if self._columns is None:
+                return None
+            start = self._num_columns_written % self._num_columns
+            return np.roll(self._columns, -start, axis=0)
+
+
+class SpectrogramVisualizer(FigureVisualizer):
+    """Visualizer of the frequency content of multi-channel streams (e.g. EMG, IMU).
+
+    Computes a short-time Fourier transform incrementally, as packets arrive: every
+    `hop_size` new samples, the completed frames of all channels are transformed in one
+    vectorized FFT call, regardless of whether and how often clients render, so no
+    samples are missed. Spectral columns are kept in a ring buffer and rendered as one
+    compact image, with channels stacked vertically.
+    """
+
+    def __init__(
+        self,
+        stream: Stream,
+        unique_id: str,
+        data_path: dict[str, str],
+        legend_names: list[str],
+        sampling_rate_hz: float,
+        update_interval_ms: int,
+        window_size: int = 256,
+        hop_size: int = 64,
+        num_columns: int = 200,
+        max_frequency_hz: float | None = None,
+        dynamic_range_db: float = 60.0,
+        col_width: int = 6,
+        priority: str = "low",
+    ):
+        super().__init__(stream=stream, col_width=col_width, priority=priority)
+
+        self._data_path = data_path
+        self._legend_names = legend_names
+        self._sampling_rate_hz = sampling_rate_hz
+        self._update_interval_ms = update_interval_ms
+        self._hop_size = hop_size
+        self._dynamic_range_db = dynamic_range_db
+        self._unique_id = unique_id
+
+        freqs_hz = np.fft.rfftfreq(window_size, d=1 / sampling_rate_hz)
+        self._num_freqs = (
+            len(freqs_hz)
+            if max_frequency_hz is None
+            else int(np.searchsorted(freqs_hz, max_frequency_hz, side="right"))
+        )
+        self._colormap = np.array(
+            [pc.unlabel_rgb(c) for c in pc.sample_colorscale("Viridis", 256)],
+            dtype=np.uint8,
+        )
+
+        # Incremental STFT state, shared by all clients, fed by the data receiving thread.
+        self._spectrum = ShortTimeSpectrum(
+            window_size=window_size,
+            hop_size=hop_size,
+            num_columns=num_columns,
+            num_freqs=self._num_freqs,
+        )
+        self._pending: list[np.ndarray] = []
+        self._image_uri: str | None = None
+        self._image_num_columns: int = 0
+
+        self._figure, self._interval, self._version = self._build_graph(
+            graph_name="spectrogram",
+            interval_name="spectrogram-interval",
+            update_interval_ms=self._update_interval_ms,
+            is_versioned=True,
+        )
+        self._layout = dbc.Col(
+            [self._figure, self._interval, self._version], width=self._col_width
+        )
+        self._activate_callbacks()
+
+    def get_retention(self) -> dict[tuple[Stream, str, str], tuple[int, float]]:
+        # Samples are consumed from the packets, not read back from the buffer.
+        return {}
+
+    def on_data_packet(self, process_time_s: float, data: dict, **_) -> None:
+        device_name, stream_name = list(self._data_path.items())[0]
+        sample = (data.get(device_name) or {}).get(stream_name)
+        if sample is None:
+            return
+        # Batch samples per hop, to transform with one FFT call per completed frame.
+        self._pending.append(np.asarray(sample, dtype=np.float64).reshape(1, -1))
+        if len(self._pending) >= self._hop_size:
+            samples = np.concatenate(self._pending, axis=0)
+            self._pending = []
+            self._spectrum.add(samples)
+
+    def _render_image(self) -> np.ndarray:
+        """Map the ring buffer of spectral columns, oldest to newest, to an RGB image.
+
+        Returns:
+            np.ndarray: Image of shape (channels x frequencies, columns, 3), low frequencies at the bottom of each strip.
+        """
+        columns = self._spectrum.get_columns()
+        # (columns, channels, freqs) -> (channels, freqs reversed, columns) -> stacked strips.
+        strips = columns.transpose(1, 2, 0)[:, ::-1, :]
+        image_db = strips.reshape(-1, strips.shape[-1])
+        max_db = np.nanmax(image_db)
+        levels = np.clip(
+            (image_db - (max_db - self._dynamic_range_db)) / self._dynamic_range_db,
+            0,
+            1,
+        )
+        levels = np.nan_to_num(levels, nan=0.0)
+        return self._colormap[(levels * 255).astype(np.uint8)]
+
+    # Callback definition must be wrapped inside an object method
+    #   to get access to the class instance object with reference to `Stream`.
+    def _activate_callbacks(self):
+        self._activate_figure_callbacks(
+            graph_name="spectrogram",
+            interval_name="spectrogram-interval",
+            is_versioned=True,
+        )
+
+    def _get_figure_version(self) -> int:
+        return self._spectrum.num_columns_written
+
+    def _build_figure(self) -> go.Figure:
+        device_name, stream_name = list(self._data_path.items())[0]
+        num_channels = int(
+            np.prod(
+                self._stream.get_stream_info(device_name, stream_name)["sample_size"]
+            )
+        )
+        fig = go.Figure(go.Image(source=None, hoverinfo="skip"))
+        fig.update_xaxes(showticklabels=False)
+        fig.update_yaxes(
+            autorange="reversed",
+            tickmode="array",
+            tickvals=[(i + 0.5) * self._num_freqs for i in range(num_channels)],
+            ticktext=self._legend_names[:num_channels],
+        )
+        fig.update_layout(margin=dict(l=0, r=0, t=0, b=0))
+        return fig
+
+    def _update_figure(self, patch: Patch) -> bool:
+        # Render once per new batch of columns and share the image with all clients.
+        num_columns_written = self._spectrum.num_columns_written
+        if num_columns_written != self._image_num_columns:
+            self._image_uri = to_data_uri(self._render_image(), format="PNG")
+            self._image_num_columns = num_columns_written
+        if self._image_uri is None:
+            return False
+        patch["data"][0]["source"] = self._image_uri
+        return True
@@ -0,0 +1,364 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from collections import OrderedDict
+import math
+from typing import Callable
+from dash import Output, Input, dcc, dash_table
+import dash_bootstrap_components as dbc
+import numpy as np
+
+from hermes.gui.widgets import Visualizer
+from hermes.base.stream import Stream
+from hermes.gui.gui_utils import app
+from hermes.utils.time_utils import get_time
+
+
+class StreamStatistics:
+    """Rolling health statistics of one device tree, updated in O(1) per packet.
+
+    Uses exponentially weighted moving averages, so neither memory nor update cost
+    depend on the length of the averaging window.
+    """
+
+    __slots__ = (
+        "declared_rate_hz",
+        "max_rate_hz",
+        "num_packets",
+        "num_gaps",
+        "last_arrival_s",
+        "mean_dt_s",
+        "var_dt_s",
+        "mean_latency_s",
+        "last_sample_time_s",
+        "_is_displayed",
+        "_alpha",
+        "_gap_factor",
+    )
+
+    def __init__(
+        self,
+        declared_rate_hz: float,
+        alpha: float,
+        gap_factor: float,
+        max_rate_hz: float | None = None,
+    ):
+        self.declared_rate_hz = declared_rate_hz
+        self.max_rate_hz = max_rate_hz
+        self.num_packets: int = 0
+        self.num_gaps: int = 0
+        self.last_arrival_s: float | None = None
+        self.mean_dt_s: float | None = None
+        self.var_dt_s: float = 0.0
+        self.mean_latency_s: float | None = None
+        self.last_sample_time_s: float | None = None
+        self._is_displayed: bool = True
+        self._alpha = alpha
+        self._gap_factor = gap_factor
+
+    def update(
+        self, arrival_s: float, sample_time_s: float | np.ndarray | None = None
+    ) -> None:
+        """Account for a newly arrived packet.
+
+        Args:
+            arrival_s (float): Time-of-arrival of the packet.
+            sample_time_s (float | np.ndarray | None, optional): Time the sample was published or captured at,
+                on the same synchronized clock, to measure the latency at its display. The newest
+                of an array of timestamps is used. Defaults to `None`.
+        """
+        a = self._alpha
+        self.num_packets += 1
+        if self.last_arrival_s is not None:
+            dt = arrival_s - self.last_arrival_s
+            if self.mean_dt_s is None:
+                self.mean_dt_s = dt
+            else:
+                # Incremental exponentially weighted mean and variance.
+                diff = dt - self.mean_dt_s
+                self.mean_dt_s += a * diff
+                self.var_dt_s = (1 - a) * (self.var_dt_s + a * diff * diff)
+            expected_rate_hz = self.expected_rate_hz
+            expected_dt = (
+                1.0 / expected_rate_hz if expected_rate_hz > 0 else self.mean_dt_s
+            )
+            if dt > self._gap_factor * expected_dt:
+                self.num_gaps += 1
+        self.last_arrival_s = arrival_s
+        if sample_time_s is not None:
+            self.last_sample_time_s = float(np.asarray(sample_time_s).ravel()[-1])
+            self._is_displayed = False
+
+    def on_render(self, render_s: float) -> None:
+        """Account for a display of the newest sample, measuring its latency on first display.
+
+        Args:
+            render_s (float): Time the sample was rendered at, on the same synchronized clock.
+        """
+        if self._is_displayed:
+            return
+        self._is_displayed = True
+        latency_s = render_s - self.last_sample_time_s
+        self.mean_latency_s = (
+            latency_s
+            if self.mean_latency_s is None
+            else self.mean_latency_s + self._alpha * (latency_s - self.mean_latency_s)
+        )
+
+    @property
+    def expected_rate_hz(self) -> float:
+        """Declared rate, capped by the rate of the display relay the packets come through, if any."""
+        if self.max_rate_hz is None:
+            return self.declared_rate_hz
+        elif self.declared_rate_hz > 0:
+            return min(self.declared_rate_hz, self.max_rate_hz)
+        else:
+            return self.max_rate_hz
+
+    @property
+    def rate_hz(self) -> float | None:
+        return 1.0 / self.mean_dt_s if self.mean_dt_s else None
+
+    @property
+    def jitter_s(self) -> float:
+        return math.sqrt(self.var_dt_s)
+
+
+class StreamHealthVisualizer(Visualizer):
+    """Compact table of the health of every stream the `DataVisualizer` subscribes to.
+
+    Driven by the incoming packets: for each device tree, tracks the effective sampling rate
+    against the declared `sampling_rate_hz`, inter-arrival jitter, number of gaps,
+    latency from publishing a sample to its first display by a widget of its stream,
+    and the age of the newest sample at display time. Values outside the thresholds are highlighted.
+    Optionally shows the memory held by the buffered samples of each device tree.
+    Streams received from the `DisplayRelay` of a remote host are marked as relayed,
+    and their rate and gaps are measured against the rate of the relay instead.
+    """
+
+    def __init__(
+        self,
+        streams: OrderedDict[str, Stream],
+        update_interval_ms: int = 1000,
+        time_stream_name: str | None = None,
+        alpha: float = 0.05,
+        gap_factor: float = 2.5,
+        min_rate_ratio: float = 0.9,
+        max_jitter_ms: float = 10.0,
+        max_latency_ms: float = 100.0,
+        max_age_s: float = 1.0,
+        memory_usage_fn: Callable[[str, str], int] | None = None,
+        relay_rates_hz: dict[str, float] | None = None,
+        col_width: int = 12,
+    ):
+        """Constructor of the stream health panel.
+
+        Args:
+            streams (OrderedDict[str, Stream]): Streams of the `DataVisualizer`, keyed by topic.
+            update_interval_ms (int, optional): Refresh period of the table. Defaults to `1000`.
+            time_stream_name (str | None, optional): Sub-stream carrying the capture timestamp of each sample,
+                to measure latency from capture instead. Defaults to `None`, measuring from the packets' publish `time_s`.
+            alpha (float, optional): Smoothing factor of the moving averages. Defaults to `0.05`.
+            gap_factor (float, optional): Multiple of the expected sampling period counted as a gap. Defaults to `2.5`.
+            min_rate_ratio (float, optional): Effective to declared rate ratio below which to highlight. Defaults to `0.9`.
+            max_jitter_ms (float, optional): Jitter above which to highlight. Defaults to `10.0`.
+            max_latency_ms (float, optional): Latency above which to highlight. Defaults to `100.0`.
+            max_age_s (float, optional): Age of the newest sample above which to highlight a stalled stream. Defaults to `1.0`.
+            memory_usage_fn (Callable[[str, str], int] | None, optional): Getter of the bytes buffered for a topic
+                and device name, to show a memory column. Defaults to `None`.
+            relay_rates_hz (dict[str, float] | None, optional): Maximal rate of the devices of each topic
+                received through a `DisplayRelay`, keyed by topic. Defaults to `None`.
+            col_width (int, optional): Width of the panel in the grid. Defaults to `12`.
+        """
+        super().__init__(stream=None, col_width=col_width, priority="high")
+        self._streams = streams
+        self._update_interval_ms = update_interval_ms
+        self._time_stream_name = time_stream_name
+        self._memory_usage_fn = memory_usage_fn
+        self._relay_rates_hz = relay_rates_hz or {}
+
+        self._statistics: OrderedDict[tuple[str, str], StreamStatistics] = OrderedDict()
+        for topic_name, stream in streams.items():
+            for device_name in stream.get_device_names():
+                stream_names = [
+                    s
+                    for s in stream.get_stream_names(device_name)
+                    if s != "process_time_s"
+                ]
+                declared_rate_hz = (
+                    float(
+                        stream.get_stream_info(device_name, stream_names[0])[
+                            "sampling_rate_hz"
+                        ]
+                        or 0.0
+                    )
+                    if stream_names
+                    else 0.0
+                )
+                self._statistics[(topic_name, device_name)] = StreamStatistics(
+                    declared_rate_hz=declared_rate_hz,
+                    alpha=alpha,
+                    gap_factor=gap_factor,
+                    max_rate_hz=self._relay_rates_hz.get(topic_name),
+                )
+
+        columns = [
+            "Stream",
+            "Declared [Hz]",
+            "Rate [Hz]",
+            "Rate [%]",
+            "Jitter [ms]",
+            "Gaps",
+            "Latency [ms]",
+            "Age [s]",
+        ]
+        if memory_usage_fn is not None:
+            columns.append("Buffered [MB]")
+        self._table = dash_table.DataTable(
+            id="stream-health-table",
+            columns=[{"name": c, "id": c} for c in columns],
+            data=[],
+            style_cell={"fontSize": "small", "padding": "2px 6px"},
+            style_data_conditional=[
+                {
+                    "if": {
+                        "filter_query": "{Rate [%%]} < %f" % (100 * min_rate_ratio),
+                        "column_id": "Rate [%]",
+                    },
+                    "backgroundColor": "#f8d7da",
+                },
+                {
+                    "if": {
+                        "filter_query": "{Jitter [ms]} > %f" % max_jitter_ms,
+                        "column_id": "Jitter [ms]",
+                    },
+                    "backgroundColor": "#fff3cd",
+                },
+                {
+                    "if": {"filter_query": "{Gaps} > 0", "column_id": "Gaps"},
+                    "backgroundColor": "#fff3cd",
+                },
+                {
+                    "if": {
+                        "filter_query": "{Latency [ms]} > %f" % max_latency_ms,
+                        "column_id": "Latency [ms]",
+                    },
+                    "backgroundColor": "#f8d7da",
+                },
+                {
+                    "if": {
+                        "filter_query": "{Age [s]} > %f" % max_age_s,
+                        "column_id": "Age [s]",
+                    },
+                    "backgroundColor": "#f8d7da",
+                },
+            ],
+        )
+        self._interval = dcc.Interval(
+            id="stream-health-interval",
+            interval=self._update_interval_ms,
+            n_intervals=0,
+        )
+        self._layout = dbc.Col([self._table, self._interval], width=self._col_width)
+        Visualizer.add_render_listener(self._on_render)
+        self._activate_callbacks()
+
+    def on_data_packet(
+        self,
+        process_time_s: float,
+        data: dict,
+        topic: str,
+        time_s: float | None = None,
+        **_,
+    ) -> None:
+        for device_name, streams_data in data.items():
+            statistics = self._statistics.get((topic, device_name))
+            if statistics is None or streams_data is None:
+                continue
+            sample_time_s = (
+                streams_data.get(self._time_stream_name)
+                if self._time_stream_name is not None
+                else time_s
+            )
+            statistics.update(process_time_s, sample_time_s)
+
+    def _on_render(self, visualizer: Visualizer, render_s: float) -> None:
+        """Measure the latency of the newest samples of the stream a widget just displayed."""
+        for (topic_name, _), statistics in self._statistics.items():
+            if self._streams[topic_name] is visualizer.stream:
+                statistics.on_render(render_s)
+
+    def _get_rows(self) -> list[dict]:
+        """Snapshot the statistics of all streams into table rows."""
+        now = get_time()
+        rows = []
+        for (topic_name, device_name), statistics in self._statistics.items():
+            rate_hz = statistics.rate_hz
+            expected_rate_hz = statistics.expected_rate_hz
+            row = {
+                "Stream": (
+                    "%s/%s" % (topic_name, device_name)
+                    if statistics.max_rate_hz is None
+                    else "%s/%s (relayed at %g Hz)"
+                    % (topic_name, device_name, statistics.max_rate_hz)
+                ),
+                "Declared [Hz]": round(statistics.declared_rate_hz, 2),
+                "Rate [Hz]": None if rate_hz is None else round(rate_hz, 2),
+                "Rate [%]": (
+                    round(100 * rate_hz / expected_rate_hz, 1)
+                    if rate_hz is not None and expected_rate_hz > 0
+                    else None
+                ),
+                "Jitter [ms]": round(1000 * statistics.jitter_s, 2),
+                "Gaps": statistics.num_gaps,
+                "Latency [ms]": (
+                    None
+                    if statistics.mean_latency_s is None
+                    else round(1000 * statistics.mean_latency_s, 1)
+                ),
+                "Age [s]": (
+                    None
+                    if statistics.last_arrival_s is None
+                    else round(now - statistics.last_arrival_s, 2)
+                ),
+            }
+            if self._memory_usage_fn is not None:
+                row["Buffered [MB]"] = round(
+                    self._memory_usage_fn(topic_name, device_name) / 2**20, 2
+                )
+            rows.append(row)
+        return rows
+
+    # Callback definition must be wrapped inside an object method
+    #   to get access to the class instance object with reference to `Stream`.
+    def _activate_callbacks(self):
+        @app.callback(
+            Output("stream-health-table", component_property="data"),
+            Input("stream-health-interval", component_property="n_intervals"),
+        )
+        def update_live_data(n):
+            return self._get_rows()
@@ -25,17 +25,29 @@
 #
 # ############
 
-from dash import Output, Input, State, dcc
+from dash import Output, Input, Patch, dcc, html
 import dash_bootstrap_components as dbc
-import plotly.express as px
+import plotly.graph_objects as go
 
-from hermes.gui.widgets import Visualizer
+from hermes.gui.widgets import FigureVisualizer
 from hermes.base.stream import Stream
 from hermes.gui.gui_utils import app
+from hermes.gui.scheduler import render_scheduler
+from hermes.gui.frame_utils import DEFAULT_TIER_WIDTHS, FrameTiers, add_width_probe
+from hermes.gui.mjpeg import FrameBroadcaster
 
 
-class VideoVisualizer(Visualizer):
-    """Visualizer for video streams."""
+class VideoVisualizer(FigureVisualizer):
+    """Visualizer for video streams.
+
+    Serves each client the downscaled resolution tier matching the displayed size
+    of its graph, and the native resolution only while the view is enlarged.
+
+    In MJPEG mode, frames are instead pushed to the browser's `<img>` element
+    as soon as they arrive, over the `DataVisualizer`'s `/mjpeg/<unique_id>` route,
+    without involving Dash callbacks. The enlarged view switches to the native resolution
+    stream of the `/mjpeg/<unique_id>?full=1` route.
+    """
 
     def __init__(
         self,
@@ -45,47 +57,246 @@ class VideoVisualizer(Visualizer):
         legend_name: str,
         update_interval_ms: int,
         col_width: int = 6,
+        resolution_tiers: list[int] | None = None,
+        is_mjpeg: bool = False,
+        mjpeg_width_px: int | None = None,
+        mjpeg_quality: int = 80,
+        jpeg_quality: int = 80,
+        priority: str = "low",
     ):
-        super().__init__(stream=stream, col_width=col_width)
+        super().__init__(stream=stream, col_width=col_width, priority=priority)
 
         self._data_path = data_path
         self._legend_name = legend_name
         self._update_interval_ms = update_interval_ms
         self._unique_id = unique_id
+        self._frame_tiers = FrameTiers(resolution_tiers or DEFAULT_TIER_WIDTHS)
+        self._is_mjpeg = is_mjpeg
+        self._mjpeg_width_px = mjpeg_width_px
+        self._jpeg_quality = jpeg_quality
 
-        self._image = dcc.Graph(id="%s-video" % (self._unique_id))
-        self._interval = dcc.Interval(
-            id="%s-video-interval" % (self._unique_id),
-            interval=self._update_interval_ms,
-            n_intervals=0,
+        # MJPEG and graph views have different components, so get their own callbacks.
+        self._enlarge_btn = dbc.Button(
+            "Enlarge",
+            id=self._get_id("mjpeg-enlarge" if self._is_mjpeg else "video-enlarge"),
+            color="secondary",
+            size="sm",
+            n_clicks=0,
         )
-        self._layout = dbc.Col([self._image, self._interval], width=self._col_width)
+        if self._is_mjpeg:
+            # Each broadcaster encodes frames only while it has clients.
+            self._broadcasters = {
+                False: FrameBroadcaster(
+                    quality=mjpeg_quality, transform=self._downscale_mjpeg_frame
+                ),
+                True: FrameBroadcaster(quality=mjpeg_quality),
+            }
+            self._image = html.Img(
+                id=self._get_id("mjpeg"),
+                src=self._get_mjpeg_url(is_full_resolution=False),
+                style={"width": "100%"},
+            )
+            self._layout = dbc.Col(
+                [self._image, self._enlarge_btn],
+                id=self._get_id("mjpeg-col"),
+                width=self._col_width,
+            )
+        else:
+            self._broadcasters = {}
+            self._image, self._interval, self._version = self._build_graph(
+                graph_name="video",
+                interval_name="video-interval",
+                update_interval_ms=self._update_interval_ms,
+                is_versioned=True,
+            )
+            self._width = dcc.Store(id=self._get_id("video-width"))
+            self._layout = dbc.Col(
+                [
+                    self._image,
+                    self._enlarge_btn,
+                    self._interval,
+                    self._width,
+                    self._version,
+                ],
+                id=self._get_id("video-col"),
+                width=self._col_width,
+            )
         self._activate_callbacks()
 
+    @property
+    def unique_id(self) -> str:
+        return self._unique_id
+
+    @property
+    def broadcasters(self) -> list[FrameBroadcaster]:
+        return list(self._broadcasters.values())
+
+    def get_broadcaster(
+        self, is_full_resolution: bool = False
+    ) -> FrameBroadcaster | None:
+        """Get the MJPEG broadcaster of the downscaled or native resolution frames.
+
+        Args:
+            is_full_resolution (bool, optional): Whether to get the native resolution one. Defaults to `False`.
+
+        Returns:
+            FrameBroadcaster | None: Broadcaster, or `None` if not in MJPEG mode.
+        """
+        return self._broadcasters.get(is_full_resolution)
+
+    def _get_mjpeg_url(self, is_full_resolution: bool) -> str:
+        """[Internal] Route of the MJPEG stream of the widget served by the `DataVisualizer`."""
+        return "/mjpeg/%s%s" % (
+            self._unique_id,
+            "?full=1" if is_full_resolution else "",
+        )
+
+    def get_retention(self) -> dict[tuple[Stream, str, str], tuple[int, float]]:
+        device_name, stream_name = list(self._data_path.items())[0]
+        return {(self._stream, device_name, stream_name): (1, 0.0)}
+
+    def on_data_packet(self, process_time_s: float, data: dict, **_) -> None:
+        if not self._broadcasters:
+            return
+        device_name, stream_name = list(self._data_path.items())[0]
+        frame = (data.get(device_name) or {}).get(stream_name)
+        if frame is not None:
+            for broadcaster in self._broadcasters.values():
+                broadcaster.publish(frame)
+
+    def _downscale_mjpeg_frame(self, frame):
+        self._frame_tiers.update(frame)
+        return self._frame_tiers.get(client_width_px=self._mjpeg_width_px)[0]
+
     # Callback definition must be wrapped inside an object method
     #   to get access to the class instance object with reference to `Stream`.
     def _activate_callbacks(self):
-        @app.callback(
-            Output("%s-video" % (self._unique_id), component_property="figure"),
-            Input(
-                "%s-video-interval" % (self._unique_id),
-                component_property="n_intervals",
-            ),
-            State("%s-video" % (self._unique_id), component_property="figure"),
-            prevent_initial_call=True,
-        )
-        def update_live_data(n, old_fig):
-            device_name, stream_name = list(self._data_path.items())[0]
-            new_data = self._stream.get_data(
-                device_name=device_name, stream_name=stream_name, starting_index=-1
+        cls = type(self)
+        # In MJPEG mode the browser pulls frames itself, no periodic callbacks are needed.
+        if self._is_mjpeg:
+            if cls._is_registering("mjpeg-enlarge"):
+
+                @app.callback(
+                    Output(
+                        cls._get_component_id("mjpeg-col"), component_property="width"
+                    ),
+                    Output(
+                        cls._get_component_id("mjpeg-enlarge"),
+                        component_property="children",
+                    ),
+                    Output(cls._get_component_id("mjpeg"), component_property="src"),
+                    Input(
+                        cls._get_component_id("mjpeg-enlarge"),
+                        component_property="n_clicks",
+                    ),
+                    prevent_initial_call=True,
+                )
+                def toggle_enlarge_mjpeg(n_clicks):
+                    visualizer = cls._get_triggered_instance()
+                    if n_clicks % 2:
+                        return (
+                            12,
+                            "Shrink",
+                            visualizer._get_mjpeg_url(is_full_resolution=True),
+                        )
+                    else:
+                        return (
+                            visualizer._col_width,
+                            "Enlarge",
+                            visualizer._get_mjpeg_url(is_full_resolution=False),
+                        )
+
+            return
+
+        if cls._is_registering("video-enlarge"):
+
+            @app.callback(
+                Output(cls._get_component_id("video-col"), component_property="width"),
+                Output(
+                    cls._get_component_id("video-enlarge"),
+                    component_property="children",
+                ),
+                Input(
+                    cls._get_component_id("video-enlarge"),
+                    component_property="n_clicks",
+                ),
+                prevent_initial_call=True,
+            )
+            def toggle_enlarge(n_clicks):
+                if n_clicks % 2:
+                    return 12, "Shrink"
+                else:
+                    return cls._get_triggered_instance()._col_width, "Enlarge"
+
+        if cls._is_registering("video-width"):
+            add_width_probe(
+                element_id=cls._get_component_id("video"),
+                interval_id=cls._get_component_id("video-interval"),
+                store_id=cls._get_component_id("video-width"),
             )
-            if new_data is not None:
-                img = new_data["data"][0]
-                fig = px.imshow(img=img)
-                # fig.update(title_text=self._legend_name)
-                fig.update_layout(coloraxis_showscale=False)
-                fig.update_xaxes(showticklabels=False)
-                fig.update_yaxes(showticklabels=False)
-                return fig
-            else:
-                return old_fig
+
+        self._activate_figure_callbacks(
+            graph_name="video",
+            interval_name="video-interval",
+            states=[("video-width", "data"), ("video-enlarge", "n_clicks")],
+            is_versioned=True,
+        )
+
+    def _build_figure(self) -> go.Figure:
+        fig = go.Figure(go.Image(source=None, hoverinfo="skip"))
+        # fig.update(title_text=self._legend_name)
+        fig.update_layout(margin=dict(l=0, r=0, t=0, b=0))
+        fig.update_xaxes(showticklabels=False, constrain="domain")
+        fig.update_yaxes(
+            showticklabels=False,
+            autorange="reversed",
+            scaleanchor="x",
+            constrain="domain",
+        )
+        return fig
+
+    def _get_client_tier(
+        self, width_px: int | None, n_clicks: int
+    ) -> tuple[int | None, bool]:
+        """[Internal] Width and full resolution flag of the tier to serve a client, falling back
+        to the smallest tier while the scheduler degrades the widget."""
+        is_degraded = render_scheduler.is_degraded()
+        return (
+            None if is_degraded else width_px,
+            bool(n_clicks % 2) and not is_degraded,
+        )
+
+    def _get_figure_version(self, width_px: int | None, n_clicks: int) -> list | None:
+        device_name, stream_name = list(self._data_path.items())[0]
+        new_data = self._stream.get_data(
+            device_name=device_name, stream_name=stream_name, starting_index=-1
+        )
+        if new_data is None:
+            return None
+        client_width_px, is_full_resolution = self._get_client_tier(width_px, n_clicks)
+        factor = self._frame_tiers.get_factor(
+            native_width_px=new_data["data"][0].shape[1],
+            client_width_px=client_width_px,
+            is_full_resolution=is_full_resolution,
+        )
+        return [float(new_data["time_s"][0]), factor]
+
+    def _update_figure(self, patch: Patch, width_px: int | None, n_clicks: int) -> bool:
+        device_name, stream_name = list(self._data_path.items())[0]
+        new_data = self._stream.get_data(
+            device_name=device_name, stream_name=stream_name, starting_index=-1
+        )
+        if new_data is None:
+            return False
+        self._frame_tiers.update(new_data["data"][0], new_data["time_s"][0])
+        client_width_px, is_full_resolution = self._get_client_tier(width_px, n_clicks)
+        source, factor = self._frame_tiers.get_data_uri(
+            client_width_px=client_width_px,
+            is_full_resolution=is_full_resolution,
+            quality=self._jpeg_quality,
+        )
+        # Stretch the served tier over the native frame size, to keep a fixed coordinate system.
+        patch["data"][0]["source"] = source
+        patch["data"][0]["dx"] = factor
+        patch["data"][0]["dy"] = factor
+        return True
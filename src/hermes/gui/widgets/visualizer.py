@@ -26,23 +26,491 @@
 # ############
 
 from abc import ABC, abstractmethod
+from bisect import bisect_left
+import time
+from typing import Any, Callable, Sequence
+from dash import Output, Input, State, Patch, MATCH, ctx, dcc, no_update
 import dash_bootstrap_components as dbc
+import plotly.graph_objects as go
+import numpy as np
 
 from hermes.base.stream import Stream
+from hermes.utils.time_utils import get_time
+from hermes.gui.gui_utils import app
+from hermes.gui.scheduler import RENDER_PRIORITIES, SKIP, render_scheduler
 
 
 class Visualizer(ABC):
-    """Abstract base class for all visualizers."""
+    """Abstract base class for all visualizers.
 
-    def __init__(self, stream: Stream, col_width: int):
+    Keeps a registry of constructed widgets for the `DataVisualizer` to wire
+    server-side routes and to dispatch incoming data packets to.
+
+    Widgets declare how much history of each sub-stream they read with `get_retention`,
+    so the `DataVisualizer` can evict older samples from its `Stream`s.
+
+    Components of widgets with a `_unique_id` get pattern-matching ids, of the same
+    type for all widgets of a class and indexed by the `_unique_id`, so that each
+    callback is registered once per widget class and dispatched to the triggering
+    instance, keeping the callback graph independent of the number of widgets.
+    """
+
+    _instances: list["Visualizer"] = []
+    _instances_by_id: dict[tuple[type, str], "Visualizer"] = {}
+    _registered_callbacks: set[tuple[type, str]] = set()
+    _render_listeners: list[Callable[["Visualizer", float], None]] = []
+    _is_deferring_figures: bool = False
+
+    def __init__(self, stream: Stream, col_width: int, priority: str = "normal"):
+        if priority not in RENDER_PRIORITIES:
+            raise ValueError(
+                "Render priority '%s' is not one of %s." % (priority, RENDER_PRIORITIES)
+            )
         self._stream = stream
         self._col_width = col_width
+        self._priority = priority
         self._layout = None
+        Visualizer._instances.append(self)
+
+    @classmethod
+    def get_instances(cls) -> list["Visualizer"]:
+        """Get all constructed widgets of this type, in the order of construction.
+
+        Returns:
+            list[Visualizer]: Registered instances of the class or its subclasses.
+        """
+        return [v for v in Visualizer._instances if isinstance(v, cls)]
+
+    @classmethod
+    def defer_figures(cls, is_deferred: bool) -> None:
+        """Skip building the figure templates of widgets constructed from now on.
+
+        For when the layout is served from a `LayoutCache` instead, the widgets are then
+        built only for their data and callbacks.
+
+        Args:
+            is_deferred (bool): Whether to leave the graphs of new widgets without a figure.
+        """
+        Visualizer._is_deferring_figures = is_deferred
+
+    @classmethod
+    def add_render_listener(
+        cls, listener: Callable[["Visualizer", float], None]
+    ) -> None:
+        """Get notified of every figure update sent to a client, e.g. to measure display latency.
+
+        Args:
+            listener (Callable[[Visualizer, float], None]): Called with the updated widget and the time of the update.
+        """
+        Visualizer._render_listeners.append(listener)
 
     @property
     def layout(self) -> dbc.Col:
         return self._layout
 
+    @property
+    def stream(self) -> Stream:
+        return self._stream
+
+    @property
+    def priority(self) -> str:
+        return self._priority
+
+    def get_retention(
+        self,
+    ) -> dict[tuple[Stream, str, str], tuple[int, float]] | None:
+        """Declare the history of sub-streams the widget reads from the buffered `Stream`s.
+
+        Samples older than what all widgets declare may be evicted from memory.
+        Widgets that don't read buffered data, or only consume packets as they arrive,
+        declare an empty dictionary. Widgets that declare nothing, which is the default,
+        may read any history of their `Stream`, whose devices are then never evicted.
+
+        Returns:
+            dict[tuple[Stream, str, str], tuple[int, float]] | None: Number of newest samples and duration
+                in seconds of newest samples to retain, keyed by `Stream`, device and sub-stream names,
+                or `None` if undeclared.
+        """
+        return None
+
+    def on_data_packet(self, process_time_s: float, data: dict, **_) -> None:
+        """Hook called by the `DataVisualizer` for each packet received on the widget's `Stream`.
+
+        Runs in the data receiving thread, after the packet is appended to the `Stream`,
+        so must return quickly. Does nothing by default.
+
+        Args:
+            process_time_s (float): Time-of-arrival of the packet.
+            data (dict): Newly received sample, keyed by device and sub-stream names.
+        """
+        pass
+
+    @classmethod
+    def _get_component_id(cls, name: str, index: str | Any = MATCH) -> dict:
+        """Get the pattern-matching id of a component of the widget class.
+
+        Args:
+            name (str): Name of the component within the widget.
+            index (str | Any, optional): `_unique_id` of the widget. Defaults to `MATCH`, as a callback pattern.
+
+        Returns:
+            dict: Id with the component type of the widget class and the index of the widget.
+        """
+        return {"type": "%s-%s" % (cls.__name__, name), "index": index}
+
+    def _get_id(self, name: str) -> dict:
+        """Get the pattern-matching id of a component of this widget."""
+        return self._get_component_id(name, self._unique_id)
+
+    @classmethod
+    def _is_registering(cls, name: str) -> bool:
+        """Whether the named callbacks of the widget class are yet to be registered, marking them as registered.
+
+        Args:
+            name (str): Name of the callbacks within the widget class.
+
+        Returns:
+            bool: `True` for the first widget of the class only.
+        """
+        if (cls, name) in Visualizer._registered_callbacks:
+            return False
+        Visualizer._registered_callbacks.add((cls, name))
+        return True
+
+    @classmethod
+    def _get_triggered_instance(cls) -> "Visualizer":
+        """Find the widget of the class whose components triggered the running pattern-matching callback.
+
+        Returns:
+            Visualizer: Instance with the `_unique_id` of the callback's outputs.
+        """
+        outputs = ctx.outputs_list
+        unique_id = (outputs[0] if isinstance(outputs, list) else outputs)["id"][
+            "index"
+        ]
+        key = (cls, unique_id)
+        if key not in Visualizer._instances_by_id:
+            Visualizer._instances_by_id.update(
+                {
+                    (type(v), v._unique_id): v
+                    for v in Visualizer._instances
+                    if hasattr(v, "_unique_id")
+                }
+            )
+        return Visualizer._instances_by_id[key]
+
+    def _get_aligned_data(
+        self,
+        reference_time_s: float,
+        data_paths: list[dict[str, str]],
+        num_timesteps: int,
+        is_interpolate: bool = False,
+        tolerance_s: float = 0.0,
+    ) -> list[Any | None]:
+        """Sample sub-streams of the widget's `Stream` at the timestamp of a reference sample.
+
+        Looks up the samples closest in time among the `num_timesteps` newest of each sub-stream,
+        to pair data of streams with different rates and latencies (e.g. an overlay on a video frame).
+        Searches the buffered timestamps in place, fetching only the 2 samples around the reference.
+
+        Args:
+            reference_time_s (float): Timestamp of the reference sample.
+            data_paths (list[dict[str, str]]): Mappings of device name to sub-stream name to sample.
+            num_timesteps (int): Number of newest samples of each sub-stream to search.
+            is_interpolate (bool, optional): Whether to linearly interpolate between the neighboring samples. Defaults to `False`.
+            tolerance_s (float, optional): How far outside the searched samples' time range
+                the reference may lie and still pick the edge sample. Defaults to `0.0`.
+
+        Returns:
+            list[Any | None]: Aligned sample of each sub-stream, or `None` if it has no data
+                around the reference time.
+        """
+        aligned = []
+        for data_path in data_paths:
+            device_name, stream_name = list(data_path.items())[0]
+            num_after = self._count_samples_after(
+                stream=self._stream,
+                device_name=device_name,
+                stream_name=stream_name,
+                reference_time_s=reference_time_s,
+                num_timesteps=num_timesteps,
+            )
+            new_data = self._stream.get_data(
+                device_name=device_name,
+                stream_name=stream_name,
+                starting_index=-min(num_after + 1, num_timesteps),
+                ending_index=-(num_after - 1) if num_after > 1 else None,
+            )
+            if new_data is None or not len(new_data["time_s"]):
+                aligned.append(None)
+            else:
+                aligned.append(
+                    self._align_to_time(
+                        time_s=new_data["time_s"],
+                        data=new_data["data"],
+                        reference_time_s=reference_time_s,
+                        is_interpolate=is_interpolate,
+                        tolerance_s=tolerance_s,
+                    )
+                )
+        return aligned
+
+    @staticmethod
+    def _count_samples_after(
+        stream: Stream,
+        device_name: str,
+        stream_name: str,
+        reference_time_s: float,
+        num_timesteps: int | None = None,
+    ) -> int:
+        """Count the newest samples of a sub-stream timestamped at or after a reference time.
+
+        Gallops back from the newest sample, then bisects, probing single timestamps
+        of the buffer, in O(log k) probes for the k samples newer than the reference.
+
+        Args:
+            stream (Stream): Buffer of the sub-stream.
+            device_name (str): Device of the sub-stream.
+            stream_name (str): Name of the sub-stream.
+            reference_time_s (float): Timestamp to search for.
+            num_timesteps (int | None, optional): Number of newest samples to search at most.
+                Defaults to `None`, searching all buffered samples.
+
+        Returns:
+            int: Number of samples at or after the reference, up to `num_timesteps`.
+        """
+
+        def is_after(num_back: int) -> bool:
+            probe = stream.get_data(
+                device_name=device_name,
+                stream_name=stream_name,
+                starting_index=-num_back,
+                ending_index=-(num_back - 1) if num_back > 1 else None,
+            )
+            return (
+                probe is not None
+                and len(probe["time_s"]) > 0
+                and probe["time_s"][0] >= reference_time_s
+            )
+
+        # Invariant: the `lo` newest samples are at or after the reference, the `hi`-th is not.
+        lo, hi = 0, 1
+        while (num_timesteps is None or hi <= num_timesteps) and is_after(hi):
+            lo, hi = hi, 2 * hi
+        if num_timesteps is not None:
+            hi = min(hi, num_timesteps + 1)
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if is_after(mid):
+                lo = mid
+            else:
+                hi = mid
+        return lo
+
+    @staticmethod
+    def _align_to_time(
+        time_s: Sequence[float],
+        data: Sequence[Any],
+        reference_time_s: float,
+        is_interpolate: bool = False,
+        tolerance_s: float = 0.0,
+    ) -> Any | None:
+        """Pick the sample matching a reference timestamp by binary search, in O(log n).
+
+        Args:
+            time_s (Sequence[float]): Ascending timestamps of the samples.
+            data (Sequence[Any]): Samples corresponding to the timestamps.
+            reference_time_s (float): Timestamp to sample at.
+            is_interpolate (bool, optional): Whether to linearly interpolate between the neighboring samples,
+                instead of picking the nearest one. Defaults to `False`.
+            tolerance_s (float, optional): How far outside the samples' time range the reference
+                may lie and still pick the oldest or newest sample. Defaults to `0.0`.
+
+        Returns:
+            Any | None: Nearest or interpolated sample, or `None` if the reference lies
+                outside the samples' time range by more than the tolerance.
+        """
+        i = bisect_left(time_s, reference_time_s)
+        if i == 0:
+            if time_s[0] - reference_time_s > tolerance_s:
+                return None
+            return data[0]
+        if i == len(time_s):
+            if reference_time_s - time_s[-1] > tolerance_s:
+                return None
+            return data[-1]
+        t_before, t_after = time_s[i - 1], time_s[i]
+        if is_interpolate and t_after > t_before:
+            w = (reference_time_s - t_before) / (t_after - t_before)
+            return (1 - w) * np.asarray(data[i - 1]) + w * np.asarray(data[i])
+        elif t_after - reference_time_s < reference_time_s - t_before:
+            return data[i]
+        else:
+            return data[i - 1]
+
     @abstractmethod
     def _activate_callbacks(self) -> None:
         pass
+
+
+class FigureVisualizer(Visualizer):
+    """Abstract base class for visualizers periodically patching a Plotly figure.
+
+    Figure widgets follow a two-phase contract: `_build_figure` creates the static
+    figure template (layout, axes, colorscales, empty traces) once, and `_update_figure`
+    fills a Dash `Patch` with only the data that changed on each tick. The base class
+    creates the graph and wires the periodic update callback around the two.
+
+    Periodic figure updates are admitted by the shared `render_scheduler` according to the
+    widget's `priority`, so that low-priority widgets are degraded first when the GUI
+    process runs over its CPU budget.
+    """
+
+    @abstractmethod
+    def _build_figure(self) -> go.Figure:
+        """Build the static template of the widget's figure, sent to the client once.
+
+        Returns:
+            go.Figure: Figure with the complete layout and placeholder traces to patch.
+        """
+        pass
+
+    @abstractmethod
+    def _update_figure(self, patch: Patch, *states: Any) -> bool:
+        """Fill a `Patch` of the figure with the data that changed since the last tick.
+
+        Args:
+            patch (Patch): Empty patch of the figure template to assign new trace data, or layout changes, to.
+            *states (Any): Values of the extra `State`s passed to `_activate_figure_callbacks`.
+
+        Returns:
+            bool: Whether the figure changed, otherwise nothing is sent to the client.
+        """
+        pass
+
+    def _get_figure_version(self, *states: Any) -> Any:
+        """Identify the content `_update_figure` would send, for figures registered as versioned.
+
+        Each client keeps the version of its figure, and the update is skipped, without
+        encoding anything, while it equals the current one (e.g. no new video frame arrived).
+
+        Args:
+            *states (Any): Values of the extra `State`s passed to `_activate_figure_callbacks`.
+
+        Returns:
+            Any: JSON-serializable version of the figure's content, or `None` to always update.
+        """
+        return None
+
+    def _build_graph(
+        self,
+        graph_name: str,
+        interval_name: str,
+        update_interval_ms: int,
+        is_versioned: bool = False,
+    ) -> list:
+        """Create the graph, initialized with the figure template, and its refresh interval.
+
+        Args:
+            graph_name (str): Name of the `dcc.Graph` within the widget.
+            interval_name (str): Name of the `dcc.Interval` driving the updates.
+            update_interval_ms (int): Refresh period of the figure.
+            is_versioned (bool, optional): Whether to also create the `dcc.Store` of the version
+                of the client's figure, see `_get_figure_version`. Defaults to `False`.
+
+        Returns:
+            list: Components to place in the widget's layout.
+        """
+        version = (
+            [dcc.Store(id=self._get_id("%s-version" % graph_name))]
+            if is_versioned
+            else []
+        )
+        return [
+            dcc.Graph(
+                id=self._get_id(graph_name),
+                figure=(
+                    self._build_figure()
+                    if not Visualizer._is_deferring_figures
+                    else None
+                ),
+            ),
+            dcc.Interval(
+                id=self._get_id(interval_name),
+                interval=update_interval_ms,
+                n_intervals=0,
+            ),
+            *version,
+        ]
+
+    def _activate_figure_callbacks(
+        self,
+        graph_name: str,
+        interval_name: str,
+        states: list[tuple[str, str]] | None = None,
+        is_versioned: bool = False,
+    ) -> None:
+        """Register the periodic callback that patches the figures of the widget class with new data.
+
+        Skips the tick if the `render_scheduler` does not admit it, and reports the CPU time of the update.
+
+        Args:
+            graph_name (str): Name of the `dcc.Graph` created by `_build_graph`.
+            interval_name (str): Name of the `dcc.Interval` created by `_build_graph`.
+            states (list[tuple[str, str]] | None, optional): Names and properties of the widget's components
+                whose client-side values to pass on to `_update_figure`. Defaults to `None`.
+            is_versioned (bool, optional): Whether to skip updates of clients whose figure is at
+                the current `_get_figure_version`, as created by `_build_graph`. Defaults to `False`.
+        """
+        cls = type(self)
+        if not cls._is_registering(graph_name):
+            return
+        states = states or []
+        version_name = "%s-version" % graph_name
+
+        @app.callback(
+            Output(cls._get_component_id(graph_name), component_property="figure"),
+            *(
+                [Output(cls._get_component_id(version_name), component_property="data")]
+                if is_versioned
+                else []
+            ),
+            Input(
+                cls._get_component_id(interval_name), component_property="n_intervals"
+            ),
+            *[
+                State(cls._get_component_id(name), component_property=prop)
+                for name, prop in states
+            ],
+            *(
+                [State(cls._get_component_id(version_name), component_property="data")]
+                if is_versioned
+                else []
+            ),
+            prevent_initial_call=True,
+        )
+        def update_live_data(n, *state_values):
+            unchanged = (no_update, no_update) if is_versioned else no_update
+            visualizer = cls._get_triggered_instance()
+            widget_id = "%s/%s" % (graph_name, visualizer._unique_id)
+            if render_scheduler.admit(widget_id, visualizer._priority) == SKIP:
+                return unchanged
+            start_s = time.thread_time()
+            if is_versioned:
+                *state_values, client_version = state_values
+                version = visualizer._get_figure_version(*state_values)
+                if version is not None and version == client_version:
+                    render_scheduler.record(widget_id, time.thread_time() - start_s)
+                    return unchanged
+            patch = Patch()
+            is_changed = visualizer._update_figure(patch, *state_values)
+            render_scheduler.record(widget_id, time.thread_time() - start_s)
+            if not is_changed:
+                return unchanged
+            render_s = get_time()
+            for listener in Visualizer._render_listeners:
+                listener(visualizer, render_s)
+            if is_versioned:
+                return patch, version
+            else:
+                return patch
@@ -0,0 +1,86 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from hermes.gui.annotations import AnnotationTimeline
+
+
+def _make_timeline() -> AnnotationTimeline:
+    timeline = AnnotationTimeline()
+    timeline.add_activity(0.0, "walk")
+    timeline.add_note(5.0, "stumble")
+    timeline.add_activity(10.0, "sit")
+    timeline.add_note(15.0, "sensor loose")
+    timeline.add_activity(20.0, "walk")
+    return timeline
+
+
+def test_span_includes_the_activity_in_progress():
+    timeline = _make_timeline()
+    # Index 2 is the 'sit' activity, started before the visible range.
+    assert timeline.get_span(12.0, 18.0) == (0, 2, 4)
+    assert timeline.get_span(3.0, 6.0) == (0, 0, 2)
+    assert timeline.get_span(25.0, 30.0) == (0, 4, 5)
+
+
+def test_span_before_any_annotation_is_empty():
+    timeline = _make_timeline()
+    _, lo, hi = timeline.get_span(-10.0, -5.0)
+    assert lo == hi == 0
+
+
+def test_activities_end_at_the_next_one():
+    timeline = _make_timeline()
+    assert timeline.get_end(0, now_s=30.0) == 10.0
+    assert timeline.get_end(4, now_s=30.0) == 30.0
+
+
+def test_out_of_order_annotations_bump_the_generation():
+    timeline = _make_timeline()
+    timeline.add_note(25.0, "in order")
+    assert timeline.generation == 0
+    timeline.add_note(12.0, "late")
+    assert timeline.generation == 1
+    generation, lo, hi = timeline.get_span(11.0, 13.0)
+    assert (generation, lo, hi) == (1, 2, 4)
+    shapes = timeline.get_shapes(lo, hi, now_s=30.0)
+    assert [shape["name"] for shape in shapes] == ["1:2", "1:3"]
+    assert [shape["type"] for shape in shapes] == ["rect", "line"]
+
+
+def test_notes_are_placed_at_their_buffered_timestamp():
+    class _Stream:
+        def get_data(self, device_name, stream_name, starting_index=None):
+            return {"time_s": [42.0], "data": ["note"]}
+
+    timeline = AnnotationTimeline()
+    timeline.on_data_packet(
+        50.0, {"experiment-notes": {"notes": b"note"}}, stream=_Stream()
+    )
+    timeline.on_data_packet(60.0, {"experiment-notes": {"notes": "fallback"}})
+    timeline.on_data_packet(70.0, {"imu": {"acc": 0.0}})
+    _, lo, hi = timeline.get_span(0.0, 100.0)
+    assert [shape["x0"] for shape in timeline.get_shapes(lo, hi, 100.0)] == [42.0, 60.0]
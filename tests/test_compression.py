@@ -0,0 +1,95 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import base64
+import gzip
+import json
+import os
+
+from flask import Flask, Response
+
+from hermes.gui.compression import ResponseCompressor
+
+NUMBERS = json.dumps({"y": list(range(2000))})
+IMAGE = json.dumps(
+    {
+        "source": "data:image/jpeg;base64,%s"
+        % base64.b64encode(os.urandom(6000)).decode()
+    }
+)
+
+
+def _make_client(compressor: ResponseCompressor):
+    server = Flask(__name__)
+    server.add_url_rule(
+        "/numbers", "numbers", lambda: Response(NUMBERS, mimetype="application/json")
+    )
+    server.add_url_rule(
+        "/small", "small", lambda: Response('{"y": 1}', mimetype="application/json")
+    )
+    server.add_url_rule(
+        "/image", "image", lambda: Response(IMAGE, mimetype="application/json")
+    )
+    server.add_url_rule(
+        "/jpeg", "jpeg", lambda: Response(os.urandom(4096), mimetype="image/jpeg")
+    )
+    server.add_url_rule(
+        "/stream",
+        "stream",
+        lambda: Response((NUMBERS for _ in range(2)), mimetype="text/plain"),
+    )
+    compressor.init_app(server)
+    return server.test_client()
+
+
+def test_large_json_is_gzipped():
+    compressor = ResponseCompressor(is_brotli=False)
+    client = _make_client(compressor)
+    response = client.get("/numbers", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.data).decode() == NUMBERS
+    statistics = compressor.get_statistics()["application/json"]
+    assert statistics["num_compressed"] == 1
+    assert statistics["ratio"] > 1
+
+
+def test_responses_not_worth_compressing_are_sent_as_is():
+    compressor = ResponseCompressor(is_brotli=False)
+    client = _make_client(compressor)
+    for path in ["/small", "/image", "/jpeg", "/stream"]:
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers, path
+    # Only the image-heavy JSON was inspected and skipped.
+    assert compressor.get_statistics()["application/json"]["num_skipped"] == 1
+
+
+def test_clients_not_accepting_compression_get_plain_responses():
+    client = _make_client(ResponseCompressor(is_brotli=False))
+    response = client.get("/numbers", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.data.decode() == NUMBERS
@@ -0,0 +1,160 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from collections import OrderedDict
+import io
+import os
+import zipfile
+import numpy as np
+import pytest
+
+from hermes.gui.gui_utils import app, server
+from hermes.gui.widgets import data_export
+from hermes.gui.widgets.data_export import DataExportVisualizer
+
+
+class _Stream:
+    """Stand-in of the buffered `Stream` API read by the export."""
+
+    def __init__(self, infos: dict[str, dict[str, dict]], num_samples: int):
+        self._infos = infos
+        self._time_s = list(np.arange(num_samples) / 100)
+        self._data = {
+            device_name: {
+                stream_name: [
+                    np.full(info["sample_size"], i, dtype=np.float32)
+                    for i in range(num_samples)
+                ]
+                for stream_name, info in streams.items()
+            }
+            for device_name, streams in infos.items()
+        }
+
+    def get_device_names(self) -> list[str]:
+        return list(self._infos.keys())
+
+    def get_stream_names(self, device_name: str) -> list[str]:
+        return list(self._infos[device_name].keys())
+
+    def get_stream_info(self, device_name: str, stream_name: str) -> dict:
+        return self._infos[device_name][stream_name]
+
+    def get_data(self, device_name, stream_name, starting_index, ending_index=None):
+        return {
+            "time_s": self._time_s[starting_index:ending_index],
+            "data": self._data[device_name][stream_name][starting_index:ending_index],
+        }
+
+
+@pytest.fixture(scope="module")
+def export(tmp_path_factory) -> DataExportVisualizer:
+    # Routes and callbacks are registered on the shared app, once per process.
+    stream = _Stream(
+        {
+            "imu": {"acc": {"sample_size": [3]}},
+            "cam": {"frame": {"sample_size": [4, 4, 3], "is_video": True}},
+        },
+        num_samples=1000,
+    )
+    export = DataExportVisualizer(
+        streams=OrderedDict(topic=stream),
+        export_dir=str(tmp_path_factory.mktemp("export")),
+    )
+    app.layout = export.layout
+    return export
+
+
+def _run_export(export: DataExportVisualizer, format: str, duration_s: float) -> str:
+    export._jobs["job"] = {"status": "running"}
+    export._export("job", ["topic/imu/acc"], format, duration_s)
+    job = export._jobs["job"]
+    assert job["status"] == "done", job.get("error")
+    return job["filename"]
+
+
+def test_frame_devices_are_not_exportable_by_default(export):
+    assert list(export._paths.keys()) == ["topic/imu/acc"]
+
+
+def test_npz_snapshot_holds_the_requested_window(export):
+    filename = _run_export(export, "npz", duration_s=0.5)
+    with np.load(os.path.join(export._export_dir, filename)) as archive:
+        time_s = archive["topic.imu.acc.time_s"]
+        data = archive["topic.imu.acc.data"]
+    np.testing.assert_allclose(time_s, np.arange(949, 1000) / 100)
+    assert data.shape == (51, 3)
+    np.testing.assert_array_equal(data[:, 0], np.arange(949, 1000))
+
+
+def test_parquet_snapshot_holds_the_requested_window(export):
+    pq = pytest.importorskip("pyarrow.parquet")
+    filename = _run_export(export, "parquet", duration_s=0.1)
+    with zipfile.ZipFile(os.path.join(export._export_dir, filename)) as archive:
+        table = pq.read_table(io.BytesIO(archive.read("topic.imu.acc.parquet")))
+    assert table.column_names == ["time_s", "data_0", "data_1", "data_2"]
+    np.testing.assert_array_equal(table["data_2"].to_numpy(), np.arange(989, 1000))
+
+
+def test_exports_are_deleted_after_download(export):
+    filename = _run_export(export, "npz", duration_s=0.1)
+    filepath = os.path.join(export._export_dir, filename)
+    client = server.test_client()
+    response = client.get("/export/%s" % filename)
+    assert response.status_code == 200
+    assert response.data[:2] == b"PK"
+    response.close()
+    assert not os.path.exists(filepath)
+    assert "job" not in export._jobs
+    assert client.get("/export/%s" % filename).status_code == 404
+
+
+def test_unclaimed_exports_expire(export, monkeypatch):
+    filename = _run_export(export, "npz", duration_s=0.1)
+    filepath = os.path.join(export._export_dir, filename)
+    export._expire_jobs()
+    assert os.path.exists(filepath)
+    now_s = data_export.time.time()
+    monkeypatch.setattr(data_export.time, "time", lambda: now_s + export._job_ttl_s + 1)
+    export._expire_jobs()
+    assert not os.path.exists(filepath)
+    assert "job" not in export._jobs
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/export/unknown.npz",
+        "/export/../test_data_export.py",
+        "/export/%2e%2e/%2e%2e/etc/passwd",
+        "/export/..%2Fsecret.npz",
+    ],
+)
+def test_only_finished_exports_are_served(export, url):
+    # A file in the export directory is not served without a job.
+    with open(os.path.join(export._export_dir, "unknown.npz"), "wb") as f:
+        f.write(b"secret")
+    assert server.test_client().get(url).status_code == 404
@@ -0,0 +1,188 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import multiprocessing
+import socket
+import threading
+import time
+
+import numpy as np
+import zmq
+
+from hermes.gui.display_relay import DisplayRelay
+from hermes.utils.msgpack_utils import deserialize, serialize
+from hermes.utils.zmq_utils import CMD_END
+
+
+def _packet(topic: str, **devices) -> tuple[bytes, bytes]:
+    return ("%s.data" % topic).encode("utf-8"), serialize(data=devices)
+
+
+def _forwarded_data(packets: list[tuple[bytes, bytes]]) -> list[dict]:
+    return [deserialize(payload)["data"] for _, payload in packets]
+
+
+def test_end_is_matched_exactly():
+    relay = DisplayRelay(topics=["notes"], max_rate_hz=1.0)
+    topic, payload = _packet("notes", notes={"text": "THE END"})
+    assert CMD_END.encode("utf-8") in payload
+    assert _forwarded_data(relay._on_packet(topic, payload, 0.0)) == [
+        {"notes": {"text": "THE END"}}
+    ]
+    topic, payload = _packet("notes", notes={"text": "END again"})
+    assert relay._on_packet(topic, payload, 0.1) == []
+    # The held back note goes out before the end of the stream.
+    packets = relay._on_packet(topic, CMD_END.encode("utf-8"), 0.2)
+    assert _forwarded_data(packets[:1]) == [{"notes": {"text": "END again"}}]
+    assert packets[1] == (topic, CMD_END.encode("utf-8"))
+
+
+def test_devices_are_downsampled_independently():
+    relay = DisplayRelay(topics=["imu"], max_rate_hz=10.0)
+    forwarded = []
+    for i in range(100):
+        now_s = i / 100
+        topic, payload = _packet("imu", fast={"acc": i})
+        forwarded += relay._on_packet(topic, payload, now_s)
+        if i % 25 == 0:
+            topic, payload = _packet("imu", slow={"acc": i})
+            forwarded += relay._on_packet(topic, payload, now_s)
+        forwarded += relay._flush(now_s)
+    data = _forwarded_data(forwarded)
+    fast = [d["fast"]["acc"] for d in data if "fast" in d]
+    slow = [d["slow"]["acc"] for d in data if "slow" in d]
+    assert 9 <= len(fast) <= 11
+    assert slow == [0, 25, 50, 75]
+
+
+def test_latest_sample_of_a_period_is_forwarded():
+    relay = DisplayRelay(topics=["imu"], max_rate_hz=10.0)
+    topic, payload = _packet("imu", dev={"acc": 0})
+    assert len(relay._on_packet(topic, payload, 0.0)) == 1
+    for i in range(1, 5):
+        topic, payload = _packet("imu", dev={"acc": i})
+        assert relay._on_packet(topic, payload, i / 100) == []
+    assert relay._flush(0.05) == []
+    assert relay._get_poll_timeout_ms(0.05) == 50
+    assert _forwarded_data(relay._flush(0.1)) == [{"dev": {"acc": 4}}]
+    assert relay._flush(0.3) == []
+
+
+def test_packets_are_split_per_device():
+    relay = DisplayRelay(
+        topics=["imu"], max_rate_hz=10.0, rate_limits_hz={"imu/emg": float("inf")}
+    )
+    topic, payload = _packet("imu", acc={"x": 0}, emg={"x": np.arange(3)})
+    assert len(relay._on_packet(topic, payload, 0.0)) == 2
+    topic, payload = _packet("imu", acc={"x": 1}, emg={"x": np.arange(3) + 1})
+    data = _forwarded_data(relay._on_packet(topic, payload, 0.01))
+    assert list(data[0].keys()) == ["emg"]
+    np.testing.assert_array_equal(data[0]["emg"]["x"], np.arange(3) + 1)
+
+
+def _get_free_port() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return str(s.getsockname()[1])
+
+
+def _run_relay(topic: str, port_sub: str, port_pub: str, duration_s: float) -> None:
+    relay = DisplayRelay(
+        topics=[topic], max_rate_hz=20.0, port_sub=port_sub, port_pub=port_pub
+    )
+    threading.Timer(duration_s, relay.stop).start()
+    relay()
+
+
+def _run_producer(topic: str, port: str, num_samples: int, rate_hz: float) -> None:
+    pub = zmq.Context.instance().socket(zmq.PUB)
+    pub.bind("tcp://*:%s" % port)
+    # Let the relay start and subscribe before publishing.
+    time.sleep(2.0)
+    for i in range(num_samples):
+        pub.send_multipart(_packet(topic, fast={"acc": i}))
+        if i % 50 == 0:
+            pub.send_multipart(_packet(topic, slow={"acc": i}))
+        time.sleep(1.0 / rate_hz)
+    pub.send_multipart([("%s.data" % topic).encode("utf-8"), CMD_END.encode("utf-8")])
+    time.sleep(0.5)
+    pub.close()
+
+
+def test_hosts_stand_in_processes():
+    """Each host is a producer and its relay, in separate local processes, aggregated by one subscriber."""
+    mp = multiprocessing.get_context("spawn")
+    hosts = {"host%d" % k: (_get_free_port(), _get_free_port()) for k in range(2)}
+    num_samples, rate_hz = 500, 500.0
+    relays = [
+        mp.Process(target=_run_relay, args=(topic, port_sub, port_pub, 8.0))
+        for topic, (port_sub, port_pub) in hosts.items()
+    ]
+    for process in relays:
+        process.start()
+    sub = zmq.Context.instance().socket(zmq.SUB)
+    for _, port_pub in hosts.values():
+        sub.connect("tcp://127.0.0.1:%s" % port_pub)
+    sub.subscribe("")
+    producers = [
+        mp.Process(target=_run_producer, args=(topic, port_sub, num_samples, rate_hz))
+        for topic, (port_sub, _) in hosts.items()
+    ]
+    for process in producers:
+        process.start()
+
+    received = {topic: {"fast": [], "slow": []} for topic in hosts.keys()}
+    ended = set()
+    poller = zmq.Poller()
+    poller.register(sub, zmq.POLLIN)
+    deadline_s = time.time() + 15.0
+    while len(ended) < len(hosts) and time.time() < deadline_s:
+        if not poller.poll(timeout=100):
+            continue
+        topic, payload = sub.recv_multipart()
+        topic_name = topic.decode("utf-8").split(".")[0]
+        if payload == CMD_END.encode("utf-8"):
+            ended.add(topic_name)
+            continue
+        assert topic_name not in ended
+        for device_name, device_data in deserialize(payload)["data"].items():
+            received[topic_name][device_name].append(device_data["acc"])
+    sub.close()
+    for process in producers:
+        process.join(timeout=10)
+    for process in relays:
+        process.terminate()
+        process.join(timeout=10)
+
+    assert ended == set(hosts.keys())
+    duration_s = num_samples / rate_hz
+    for topic, devices in received.items():
+        # At 20 Hz, plus the leading and the trailing sample.
+        assert 5 <= len(devices["fast"]) <= 20 * duration_s * 1.5 + 2
+        assert devices["fast"] == sorted(devices["fast"])
+        assert devices["fast"][-1] == num_samples - 1
+        assert devices["slow"] == list(range(0, num_samples, 50))
@@ -0,0 +1,118 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import numpy as np
+import pytest
+
+from hermes.gui import frame_utils
+from hermes.gui.frame_utils import FrameTiers, downscale_area
+
+
+def _reference_downscale(frame: np.ndarray, factor: int) -> np.ndarray:
+    h = (frame.shape[0] // factor) * factor
+    w = (frame.shape[1] // factor) * factor
+    blocks = frame[:h, :w].reshape(
+        h // factor, factor, w // factor, factor, *frame.shape[2:]
+    )
+    return blocks.mean(axis=(1, 3))
+
+
+@pytest.mark.parametrize("shape", [(48, 64), (48, 64, 3), (50, 67, 3)])
+@pytest.mark.parametrize("factor", [2, 3, 4])
+def test_downscale_averages_blocks_with_rounding(shape, factor):
+    frame = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+    downscaled = downscale_area(frame, factor)
+    expected = _reference_downscale(frame, factor)
+    assert downscaled.dtype == np.uint8
+    assert downscaled.shape == expected.shape
+    # Rounded to the nearest integer, halves up.
+    np.testing.assert_array_equal(downscaled, np.floor(expected + 0.5))
+
+
+def test_downscale_keeps_the_dtype_without_overflow():
+    frame = np.full((64, 64), 65535, dtype=np.uint16)
+    np.testing.assert_array_equal(downscale_area(frame, 32), [[65535] * 2] * 2)
+    frame = np.arange(16, dtype=np.float32).reshape(4, 4)
+    downscaled = downscale_area(frame, 2)
+    assert downscaled.dtype == np.float32
+    np.testing.assert_allclose(downscaled, _reference_downscale(frame, 2))
+
+
+def test_downscale_by_one_is_the_same_frame():
+    frame = np.zeros((4, 4), dtype=np.uint8)
+    assert downscale_area(frame, 1) is frame
+
+
+def test_tiers_are_computed_once_per_frame(monkeypatch):
+    calls = []
+
+    def counting_downscale(frame, factor):
+        calls.append((frame.shape[1], factor))
+        return downscale_area(frame, factor)
+
+    monkeypatch.setattr(frame_utils, "downscale_area", counting_downscale)
+    tiers = FrameTiers(tier_widths=[160, 320])
+    tiers.update(np.zeros((480, 640, 3), dtype=np.uint8), key=1.0)
+
+    small, factor = tiers.get()
+    assert (small.shape, factor) == ((120, 160, 3), 4)
+    medium, factor = tiers.get(client_width_px=300)
+    assert (medium.shape, factor) == ((240, 320, 3), 2)
+    # Tiers are cached until the next frame.
+    assert tiers.get()[0] is small
+    assert calls == [(640, 4), (640, 2)]
+    full, factor = tiers.get(client_width_px=300, is_full_resolution=True)
+    assert (full.shape, factor) == ((480, 640, 3), 1)
+
+
+def test_tiers_are_derived_from_computed_tiers(monkeypatch):
+    calls = []
+
+    def counting_downscale(frame, factor):
+        calls.append((frame.shape[1], factor))
+        return downscale_area(frame, factor)
+
+    monkeypatch.setattr(frame_utils, "downscale_area", counting_downscale)
+    tiers = FrameTiers(tier_widths=[160, 320])
+    tiers.update(np.zeros((480, 640, 3), dtype=np.uint8))
+    tiers.get(client_width_px=300)
+    tiers.get()
+    assert calls == [(640, 2), (320, 2)]
+
+
+def test_data_uris_are_encoded_once_per_frame():
+    tiers = FrameTiers(tier_widths=[160])
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    tiers.update(frame, key=1.0)
+    uri, factor = tiers.get_data_uri()
+    assert factor == 2 and uri.startswith("data:image/jpeg;base64,")
+    assert tiers.get_data_uri()[0] is uri
+    # The same key is not a new frame.
+    tiers.update(frame.copy(), key=1.0)
+    assert tiers.get_data_uri()[0] is uri
+    tiers.update(frame + 255, key=2.0)
+    assert tiers.get_data_uri()[0] != uri
@@ -0,0 +1,98 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+from hermes.gui.widgets.gaze import GazeDensity, GazeVisualizer
+
+
+def test_samples_are_binned_on_arrival():
+    density = GazeDensity(num_bins=(3, 4), half_life_s=1.0, width_px=400, height_px=300)
+    density.add(0.0, 50, 50)
+    density.add(np.array([0.0, 0.0]), np.array([350, 1000]), np.array([250, 10]))
+    hist = density.get(0.0)
+    assert density.num_samples == 3
+    assert hist[0, 0] == 1.0
+    assert hist[2, 3] == 1.0
+    # Gaze off the frame is not counted.
+    assert hist.sum() == 2.0
+
+
+def test_density_decays_with_the_half_life():
+    density = GazeDensity(num_bins=(1, 1), half_life_s=2.0, width_px=10, height_px=10)
+    density.add(10.0, 5, 5)
+    assert np.isclose(density.get(12.0)[0, 0], 0.5)
+    assert np.isclose(density.get(14.0)[0, 0], 0.25)
+    # Reading the past never weighs a sample above 1.
+    assert density.get(5.0)[0, 0] == 1.0
+
+
+def test_out_of_order_samples_are_weighed_by_their_age():
+    in_order = GazeDensity(num_bins=(1, 2), half_life_s=1.0, width_px=2, height_px=1)
+    in_order.add(1.0, 0, 0)
+    in_order.add(2.0, 1, 0)
+    out_of_order = GazeDensity(
+        num_bins=(1, 2), half_life_s=1.0, width_px=2, height_px=1
+    )
+    out_of_order.add(2.0, 1, 0)
+    out_of_order.add(1.0, 0, 0)
+    np.testing.assert_allclose(in_order.get(3.0), out_of_order.get(3.0))
+    np.testing.assert_allclose(in_order.get(3.0), [[0.25, 0.5]])
+
+
+def test_memory_is_bounded_without_reads():
+    density = GazeDensity(num_bins=(2, 2), half_life_s=1.0, width_px=2, height_px=2)
+    for i in range(1000):
+        density.add(i / 100, i % 2, (i // 2) % 2)
+    assert density.num_samples == 1000
+    assert density.get(10.0).shape == (2, 2)
+
+
+def test_decay_stays_exact_across_renormalizations():
+    density = GazeDensity(num_bins=(1, 2), half_life_s=1.0, width_px=2, height_px=1)
+    # Thousands of half-lives, well past the underflow of a single decay factor.
+    for i in range(2000):
+        density.add(float(i), i % 2, 0)
+    hist = density.get(1999.0)
+    assert np.isfinite(hist).all()
+    # Geometric sums of the samples of each bin, halving per second.
+    np.testing.assert_allclose(hist, [[2 / 3, 4 / 3]])
+
+
+def test_frame_size_must_be_declared_for_the_density():
+    def get_frame_size(stream_info: dict):
+        widget = SimpleNamespace(
+            _world_data_path={"eye": "frame"},
+            _stream=SimpleNamespace(get_stream_info=lambda *_: stream_info),
+        )
+        return GazeVisualizer._get_frame_size(widget)
+
+    assert get_frame_size({"sample_size": [1080, 1920, 3]}) == (1920, 1080)
+    with pytest.raises(ValueError):
+        get_frame_size({})
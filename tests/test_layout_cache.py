@@ -0,0 +1,120 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import os
+from dash import Dash, Input, Output, dcc, html
+import pytest
+
+from hermes.gui import layout_cache
+from hermes.gui.layout_cache import LayoutCache
+
+CONFIG = {"stream_in_specs": [{"topic": "imu"}]}
+
+
+def _make_app() -> Dash:
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Interval(id="interval"), html.Div(id="out")])
+
+    @app.callback(Output("out", "children"), Input("interval", "n_intervals"))
+    def update(n):
+        return n
+
+    return app
+
+
+def _load(cache_dir: str, config: dict = CONFIG, **kwargs) -> LayoutCache:
+    """Start a run with the config, loading its layout once, as the first page load does."""
+    cache = LayoutCache(config=config, cache_dir=cache_dir, **kwargs)
+    app = _make_app()
+    cache.init_app(app, app.server)
+    response = app.server.test_client().get("/_dash-layout")
+    assert response.status_code == 200
+    assert b"interval" in response.data
+    return cache
+
+
+def test_layout_is_reused_for_the_same_config_and_code(tmp_path):
+    assert not _load(str(tmp_path)).is_hit
+    assert _load(str(tmp_path)).is_hit
+    assert not _load(str(tmp_path), config={"stream_in_specs": []}).is_hit
+
+
+def test_layout_is_rebuilt_when_the_code_changes(tmp_path, monkeypatch):
+    _load(str(tmp_path))
+    monkeypatch.setattr(layout_cache, "_get_code_version", lambda *_: "other")
+    assert not _load(str(tmp_path)).is_hit
+
+
+def test_layout_is_rebuilt_when_a_stream_class_changes(tmp_path, monkeypatch):
+    module_path = tmp_path / "imu_stream.py"
+    module_path.write_text("class ImuStream:\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    from imu_stream import ImuStream
+
+    cache_dir = str(tmp_path / "cache")
+    _load(cache_dir, stream_classes=[ImuStream])
+    assert _load(cache_dir, stream_classes=[ImuStream]).is_hit
+    # Editing the module of a Stream class changes its modification time.
+    os.utime(module_path, ns=(0, os.stat(module_path).st_mtime_ns + 10**9))
+    assert not _load(cache_dir, stream_classes=[ImuStream]).is_hit
+
+
+@pytest.mark.parametrize("route", ["/_dash-layout", "/_dash-dependencies"])
+def test_revalidated_responses_are_not_modified(tmp_path, route):
+    cache = LayoutCache(config=CONFIG, cache_dir=str(tmp_path))
+    app = _make_app()
+    cache.init_app(app, app.server)
+    client = app.server.test_client()
+    response = client.get(route)
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"%s"' % cache.key
+    response = client.get(route, headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+    assert response.data == b""
+    response = client.get(route, headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+
+
+def test_only_the_most_recently_used_layouts_are_kept(tmp_path):
+    for i in range(5):
+        path = tmp_path / ("layout-old%d.json" % i)
+        path.write_bytes(b"{}")
+        os.utime(path, (1000 + i, 1000 + i))
+    # Pruned when a run starts, before storing its own layout.
+    cache = _load(str(tmp_path), max_entries=3)
+    assert sorted(os.listdir(tmp_path)) == [
+        "layout-%s.json" % cache.key,
+        "layout-old2.json",
+        "layout-old3.json",
+        "layout-old4.json",
+    ]
+    LayoutCache(config=CONFIG, cache_dir=str(tmp_path), max_entries=2)
+    # The layout in use is marked as recently used, outliving the older ones.
+    assert sorted(os.listdir(tmp_path)) == [
+        "layout-%s.json" % cache.key,
+        "layout-old4.json",
+    ]
@@ -0,0 +1,58 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import numpy as np
+
+from hermes.gui.widgets.lineplot import LinePlotVisualizer
+
+STREAM_DATA = {
+    "time_s": [0.0, 0.1, 0.2],
+    "data": [[1.0, 10.0], [2.0, 10.0], [3.0, 10.0]],
+}
+
+
+def test_separators_pack_channels_between_nan_gaps():
+    x, y = LinePlotVisualizer._pack_channels(STREAM_DATA)
+    np.testing.assert_array_equal(x, [0.0, 0.1, 0.2, np.nan] * 2)
+    np.testing.assert_array_equal(y, [1.0, 2.0, 3.0, np.nan, 10.0, 10.0, 10.0, np.nan])
+
+
+def test_offsets_stack_normalized_channels_on_their_lanes():
+    x, y = LinePlotVisualizer._pack_channels(STREAM_DATA, lane_offset=2)
+    np.testing.assert_array_equal(x, [0.0, 0.1, 0.2, np.nan] * 2)
+    # Each channel spans [0.1, 0.9] of its lane, constant channels sit at the bottom.
+    np.testing.assert_allclose(
+        y, [2.1, 2.5, 2.9, np.nan, 3.1, 3.1, 3.1, np.nan], equal_nan=True
+    )
+
+
+def test_empty_sub_streams_pack_into_empty_traces():
+    for lane_offset in (None, 0):
+        x, y = LinePlotVisualizer._pack_channels(
+            {"time_s": [], "data": []}, lane_offset=lane_offset
+        )
+        assert x.shape == y.shape == (0,)
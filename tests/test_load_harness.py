@@ -0,0 +1,129 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import socket
+import threading
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+from dash import Dash, Input, Output, dcc, html
+import pytest
+import zmq
+
+from hermes.utils.msgpack_utils import deserialize
+from hermes.utils.zmq_utils import CMD_BYE, CMD_EXIT, CMD_GO, CMD_HELLO, IP_LOOPBACK
+from hermes.gui.load_harness import DashLoadTester, SyntheticPublisher
+
+
+def _get_free_port() -> str:
+    with socket.socket() as s:
+        s.bind((IP_LOOPBACK, 0))
+        return str(s.getsockname()[1])
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *_):
+        pass
+
+
+@pytest.fixture
+def publisher():
+    port_pub, port_sync = _get_free_port(), _get_free_port()
+    publisher = SyntheticPublisher(
+        topic_specs={"emg": {"emg-device": {"emg": [4]}}},
+        rate_hz=200.0,
+        port_pub=port_pub,
+        port_sync=port_sync,
+    )
+    publisher.start()
+    yield publisher, port_pub, port_sync
+    publisher.stop()
+
+
+def test_publisher_answers_handshakes_and_sends_timestamped_packets(publisher):
+    _, port_pub, port_sync = publisher
+    ctx = zmq.Context.instance()
+    sync = ctx.socket(zmq.REQ)
+    sync.connect("tcp://%s:%s" % (IP_LOOPBACK, port_sync))
+    sub = ctx.socket(zmq.SUB)
+    sub.connect("tcp://%s:%s" % (IP_LOOPBACK, port_pub))
+    sub.subscribe("emg")
+    try:
+        sync.send_multipart([b"visualizer", CMD_HELLO.encode("utf-8")])
+        assert sync.recv_multipart()[1] == CMD_GO.encode("utf-8")
+
+        assert sub.poll(5000)
+        topic, payload = sub.recv_multipart()
+        msg = deserialize(payload)
+        assert topic == b"emg.data"
+        assert set(msg) == {"time_s", "data"}
+        assert isinstance(msg["time_s"], float)
+        assert msg["data"]["emg-device"]["emg"].shape == (4,)
+
+        sync.send_multipart([b"visualizer", CMD_EXIT.encode("utf-8")])
+        assert sync.recv_multipart()[1] == CMD_BYE.encode("utf-8")
+    finally:
+        sync.close()
+        sub.close()
+
+
+def test_load_tester_replays_interval_callbacks():
+    app = Dash(__name__)
+    app.layout = html.Div(
+        [
+            dcc.Interval(id="interval", interval=50),
+            html.Div(id="out"),
+            dcc.Store(id="static"),
+        ]
+    )
+
+    @app.callback(Output("out", "children"), Input("interval", "n_intervals"))
+    def update(n_intervals):
+        return str(n_intervals)
+
+    @app.callback(Output("static", "data"), Input("out", "children"))
+    def follow(children):
+        return children
+
+    port = int(_get_free_port())
+    server = make_server(IP_LOOPBACK, port, app.server, handler_class=_QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        tester = DashLoadTester("http://%s:%d" % (IP_LOOPBACK, port))
+        # Only the interval-driven callback is replayed.
+        assert tester.discover() == 1
+        (step,) = tester.run([2], duration_s=0.5)
+        assert step["clients"] == 2
+        assert step["requests"] > 0
+        assert step["error_rate"] == 0.0
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def test_load_tester_is_restricted_to_localhost():
+    with pytest.raises(ValueError):
+        DashLoadTester("http://example.com:8005")
@@ -0,0 +1,139 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from io import BytesIO
+import queue
+import threading
+import time
+import numpy as np
+from PIL import Image
+import pytest
+
+from hermes.gui.mjpeg import FrameBroadcaster
+
+
+class _Client:
+    """Browser stand-in, reading the multipart stream of a broadcaster in its own thread."""
+
+    def __init__(self, broadcaster: FrameBroadcaster, num_frames: int | None = None):
+        self._stream = broadcaster.stream()
+        self._num_frames = num_frames
+        self.chunks: queue.Queue = queue.Queue()
+        self.is_done = threading.Event()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        for chunk in self._stream:
+            self.chunks.put(chunk)
+            if self.chunks.qsize() == self._num_frames:
+                # Disconnect, as a closed browser tab does.
+                self._stream.close()
+                break
+        self.is_done.set()
+
+    def get_frame(self, timeout_s: float = 5.0) -> np.ndarray:
+        chunk = self.chunks.get(timeout=timeout_s)
+        jpeg = chunk[chunk.index(b"\r\n\r\n") + 4 : -2]
+        return np.asarray(Image.open(BytesIO(jpeg)))
+
+
+def _wait_for_clients(broadcaster: FrameBroadcaster, num_clients: int) -> None:
+    deadline_s = time.monotonic() + 5.0
+    while broadcaster._num_clients != num_clients:
+        assert time.monotonic() < deadline_s
+        time.sleep(0.01)
+
+
+def _frame(value: int) -> np.ndarray:
+    return np.full((16, 16), value, dtype=np.uint8)
+
+
+@pytest.fixture
+def broadcaster():
+    broadcaster = FrameBroadcaster()
+    yield broadcaster
+    broadcaster.close()
+
+
+def test_frames_are_fanned_out_to_all_clients(broadcaster):
+    clients = [_Client(broadcaster) for _ in range(3)]
+    _wait_for_clients(broadcaster, 3)
+    broadcaster.publish(_frame(200))
+    for client in clients:
+        assert np.abs(client.get_frame().astype(int) - 200).max() <= 2
+
+
+def test_new_clients_do_not_get_frames_cached_before_they_connected(broadcaster):
+    client = _Client(broadcaster, num_frames=1)
+    _wait_for_clients(broadcaster, 1)
+    broadcaster.publish(_frame(50))
+    client.get_frame()
+    _wait_for_clients(broadcaster, 0)
+
+    client = _Client(broadcaster)
+    _wait_for_clients(broadcaster, 1)
+    with pytest.raises(queue.Empty):
+        client.chunks.get(timeout=0.2)
+    broadcaster.publish(_frame(150))
+    assert np.abs(client.get_frame().astype(int) - 150).max() <= 2
+
+    # A client joining a live stream starts from the current frame.
+    late_client = _Client(broadcaster)
+    assert np.abs(late_client.get_frame().astype(int) - 150).max() <= 2
+
+
+def test_frames_are_encoded_once_and_only_with_clients():
+    num_transforms = [0]
+
+    def transform(frame):
+        num_transforms[0] += 1
+        return frame[::2, ::2]
+
+    broadcaster = FrameBroadcaster(transform=transform)
+    try:
+        broadcaster.publish(_frame(10))
+        time.sleep(0.1)
+        assert num_transforms[0] == 0
+
+        clients = [_Client(broadcaster) for _ in range(2)]
+        _wait_for_clients(broadcaster, 2)
+        broadcaster.publish(_frame(10))
+        for client in clients:
+            assert client.get_frame().shape == (8, 8)
+        assert num_transforms[0] == 1
+    finally:
+        broadcaster.close()
+
+
+def test_close_releases_waiting_clients():
+    broadcaster = FrameBroadcaster()
+    client = _Client(broadcaster)
+    _wait_for_clients(broadcaster, 1)
+    broadcaster.close()
+    assert client.is_done.wait(5.0)
+    assert client.chunks.empty()
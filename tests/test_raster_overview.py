@@ -0,0 +1,74 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import numpy as np
+
+from hermes.gui.widgets.raster_overview import rasterize_lines
+
+
+def test_ramp_is_drawn_without_gaps():
+    time_s = np.linspace(0.0, 1.0, 1000)
+    mask = rasterize_lines(
+        time_s, time_s[:, None], (0.0, 1.0), width_px=50, strip_height_px=20
+    )
+    assert mask.shape == (1, 20, 50)
+    # Starts at the bottom, ends at the top, covering every column.
+    assert mask[0, -1, 0] and mask[0, 0, -1]
+    assert mask[0].any(axis=0).all()
+    rows = [np.flatnonzero(mask[0, :, k]) for k in range(50)]
+    for previous, current in zip(rows[:-1], rows[1:]):
+        assert current.min() <= previous.max() + 1
+
+
+def test_spikes_within_a_column_are_kept():
+    time_s = np.linspace(0.0, 1.0, 1000)
+    values = np.zeros((1000, 1))
+    values[500] = 1.0
+    mask = rasterize_lines(time_s, values, (0.0, 1.0), width_px=10, strip_height_px=8)
+    assert mask[0, 0].sum() >= 1
+    assert mask[0, -1].all()
+
+
+def test_columns_outside_the_samples_are_blank():
+    time_s = np.linspace(0.5, 1.0, 100)
+    values = np.sin(time_s)[:, None]
+    mask = rasterize_lines(time_s, values, (0.0, 1.0), width_px=20, strip_height_px=5)
+    assert not mask[0, :, :9].any()
+    assert mask[0, :, 10:].any(axis=0).all()
+
+
+def test_channels_are_normalized_independently():
+    time_s = np.linspace(0.0, 1.0, 200)
+    values = np.stack((np.sin(10 * time_s), 1000 * np.cos(7 * time_s), time_s * 0), 1)
+    mask = rasterize_lines(time_s, values, (0.0, 1.0), width_px=40, strip_height_px=10)
+    for c in range(values.shape[1]):
+        np.testing.assert_array_equal(
+            mask[c],
+            rasterize_lines(time_s, values[:, c : c + 1], (0.0, 1.0), 40, 10)[0],
+        )
+    # A flat channel is a single row.
+    assert mask[2].any(axis=1).sum() == 1
@@ -0,0 +1,172 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+from collections import OrderedDict
+
+
+from hermes.gui.retention import RetentionPolicy
+
+
+class _Stream:
+    """Stand-in of the `Stream` API used by the retention policy, recording evictions."""
+
+    def __init__(self, infos: dict[str, dict[str, dict]]):
+        self._infos = infos
+        self.cleared: list[tuple[str, str, int]] = []
+
+    def get_device_names(self) -> list[str]:
+        return list(self._infos.keys())
+
+    def get_stream_names(self, device_name: str) -> list[str]:
+        return list(self._infos[device_name].keys())
+
+    def get_stream_info(self, device_name: str, stream_name: str) -> dict:
+        return self._infos[device_name][stream_name]
+
+    def clear_data(self, device_name, stream_name, num_oldest_to_clear):
+        self.cleared.append((device_name, stream_name, num_oldest_to_clear))
+
+
+class _Widget:
+    def __init__(self, stream, retention):
+        self.stream = stream
+        self._retention = retention
+
+    def get_retention(self):
+        return self._retention
+
+
+def _make_stream() -> _Stream:
+    info = {"data_type": "float32", "sample_size": [3]}
+    return _Stream(
+        {
+            "imu": {"acc": info, "gyr": info},
+            "cam": {"frame": {"data_type": "uint8", "sample_size": [4, 4, 3]}},
+        }
+    )
+
+
+def _feed(policy: RetentionPolicy, num_packets: int, rate_hz: float) -> None:
+    for i in range(num_packets):
+        policy.on_data_packet(
+            "topic", i / rate_hz, {"imu": {"acc": None, "gyr": None}, "cam": None}
+        )
+
+
+def test_declared_retention_is_merged_per_device():
+    stream = _make_stream()
+    policy = RetentionPolicy(
+        OrderedDict(topic=stream),
+        [
+            _Widget(stream, {(stream, "imu", "acc"): (100, 0.0)}),
+            _Widget(stream, {(stream, "imu", "gyr"): (10, 5.0)}),
+            _Widget(None, {}),
+        ],
+    )
+    imu = policy._buffers[("topic", "imu")]
+    assert (imu.num_timesteps, imu.duration_s) == (100, 5.0)
+    # Devices no widget reads keep the latest sample only.
+    cam = policy._buffers[("topic", "cam")]
+    assert (cam.num_timesteps, cam.duration_s) == (1, 0.0)
+
+
+def test_eviction_keeps_sub_streams_aligned():
+    stream = _make_stream()
+    policy = RetentionPolicy(
+        OrderedDict(topic=stream),
+        [_Widget(stream, {(stream, "imu", "acc"): (50, 0.0)})],
+        period_s=1.0,
+    )
+    _feed(policy, num_packets=201, rate_hz=100.0)
+    assert policy._buffers[("topic", "imu")].num_samples == 50
+    cleared = {}
+    for device_name, stream_name, num in stream.cleared:
+        cleared[stream_name] = cleared.get(stream_name, 0) + num
+    assert cleared == {"acc": 151, "gyr": 151}
+    assert policy.get_memory_usage()["topic"]["imu"] == {
+        "acc": 50 * 12,
+        "gyr": 50 * 12,
+    }
+
+
+def test_duration_retains_samples_beyond_the_count():
+    stream = _make_stream()
+    policy = RetentionPolicy(
+        OrderedDict(topic=stream),
+        [_Widget(stream, {(stream, "imu", "acc"): (0, 0.5)})],
+        period_s=1.0,
+    )
+    _feed(policy, num_packets=201, rate_hz=100.0)
+    assert 50 <= policy._buffers[("topic", "imu")].num_samples <= 51
+
+
+def test_undeclared_widgets_opt_their_stream_out_of_eviction():
+    stream = _make_stream()
+    policy = RetentionPolicy(
+        OrderedDict(topic=stream),
+        [
+            _Widget(stream, {(stream, "imu", "acc"): (10, 0.0)}),
+            _Widget(stream, None),
+        ],
+    )
+    _feed(policy, num_packets=500, rate_hz=100.0)
+    assert stream.cleared == []
+    assert policy._buffers[("topic", "imu")].num_samples == 500
+
+
+def test_nothing_is_evicted_when_disabled():
+    stream = _make_stream()
+    policy = RetentionPolicy(OrderedDict(topic=stream), [], is_evicting=False)
+    _feed(policy, num_packets=500, rate_hz=100.0)
+    assert stream.cleared == []
+    assert policy.get_device_memory_bytes("topic", "imu") == 500 * 24
+
+
+def test_only_dumped_devices_opt_out_of_eviction():
+    stream = _Stream(
+        {
+            "imu": {"acc": {"data_type": "float64", "sample_size": [3]}},
+            "camera": {"frame": {"data_type": "uint8", "is_video": True}},
+        }
+    )
+    streams = OrderedDict(topic=stream)
+
+    class _Spec:
+        stream_hdf5 = True
+        dump_video = True
+
+    dumped_devices = RetentionPolicy.get_dumped_devices(streams, _Spec())
+    assert dumped_devices == [("topic", "camera")]
+
+    policy = RetentionPolicy(streams, [], unbounded_devices=dumped_devices)
+    for i in range(500):
+        policy.on_data_packet(
+            "topic", i / 100.0, {"imu": {"acc": None}, "camera": {"frame": None}}
+        )
+    assert all(device_name == "imu" for device_name, *_ in stream.cleared)
+    assert policy._buffers[("topic", "camera")].num_samples == 500
+    assert policy._buffers[("topic", "imu")].num_samples < 500
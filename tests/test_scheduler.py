@@ -0,0 +1,96 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import random
+
+import pytest
+
+from hermes.gui.scheduler import DEGRADE, RENDER, SKIP, RenderScheduler
+
+
+class _LoadedScheduler(RenderScheduler):
+    """Scheduler at a set load, instead of the measured one."""
+
+    load = 0.0
+
+
+def _count_decisions(load: float, priority: str, num_ticks: int = 1000) -> dict:
+    scheduler = _LoadedScheduler()
+    scheduler.load = load
+    for _ in range(num_ticks):
+        scheduler.admit("widget", priority)
+    widget = scheduler.get_statistics()["widgets"]["widget"]
+    return {
+        RENDER: widget["num_rendered"],
+        DEGRADE: widget["num_degraded"],
+        SKIP: widget["num_skipped"],
+    }
+
+
+@pytest.fixture(autouse=True)
+def _seed():
+    random.seed(0)
+
+
+def test_everything_renders_under_budget():
+    for priority in ["high", "normal", "low"]:
+        assert _count_decisions(0.2, priority) == {RENDER: 1000, DEGRADE: 0, SKIP: 0}
+
+
+def test_low_priority_degrades_first():
+    assert _count_decisions(0.7, "normal") == {RENDER: 1000, DEGRADE: 0, SKIP: 0}
+    assert _count_decisions(0.7, "low") == {RENDER: 0, DEGRADE: 1000, SKIP: 0}
+
+
+def test_over_budget_skips_by_priority():
+    assert _count_decisions(1.5, "high") == {RENDER: 1000, DEGRADE: 0, SKIP: 0}
+    normal = _count_decisions(1.5, "normal")
+    assert normal[DEGRADE] == 0
+    assert 400 <= normal[SKIP] <= 600
+    low = _count_decisions(1.5, "low")
+    assert low[RENDER] == 0
+    assert 700 <= low[SKIP] <= 900
+
+
+def test_decision_is_remembered_per_thread():
+    scheduler = _LoadedScheduler()
+    scheduler.load = 0.7
+    assert scheduler.admit("widget", "low") == DEGRADE
+    assert scheduler.is_degraded()
+    assert scheduler.admit("widget", "high") == RENDER
+    assert not scheduler.is_degraded()
+
+
+def test_render_cost_is_averaged_per_widget():
+    scheduler = _LoadedScheduler()
+    scheduler.admit("widget", "normal")
+    scheduler.record("widget", 0.010)
+    scheduler.record("widget", 0.020)
+    scheduler.record("unknown", 1.0)
+    widgets = scheduler.get_statistics()["widgets"]
+    assert widgets["widget"]["cpu_ms_mean"] == pytest.approx(11.0)
+    assert "unknown" not in widgets
@@ -0,0 +1,65 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import numpy as np
+import pytest
+
+from hermes.gui.widgets.spectrogram import ShortTimeSpectrum
+
+WINDOW_SIZE = 32
+HOP_SIZE = 8
+NUM_COLUMNS = 20
+
+
+def batch_stft(x: np.ndarray, num_freqs: int) -> np.ndarray:
+    starts = range(0, len(x) - WINDOW_SIZE + 1, HOP_SIZE)
+    frames = np.stack([x[i : i + WINDOW_SIZE].T for i in starts])
+    spectrum = np.fft.rfft(frames * np.hanning(WINDOW_SIZE), axis=-1)
+    return 10 * np.log10(np.abs(spectrum[..., :num_freqs]) ** 2 + 1e-12)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, HOP_SIZE, 3 * WINDOW_SIZE, 1000])
+def test_chunked_output_equals_batch_stft(chunk_size):
+    x = np.random.default_rng(0).standard_normal((500, 3))
+    spectrum = ShortTimeSpectrum(WINDOW_SIZE, HOP_SIZE, NUM_COLUMNS, num_freqs=10)
+    num_new = sum(
+        spectrum.add(x[i : i + chunk_size]) for i in range(0, len(x), chunk_size)
+    )
+    expected = batch_stft(x, num_freqs=10)
+    assert num_new == spectrum.num_columns_written == len(expected)
+    np.testing.assert_allclose(spectrum.get_columns(), expected[-NUM_COLUMNS:])
+
+
+def test_unwritten_columns_are_nan():
+    spectrum = ShortTimeSpectrum(WINDOW_SIZE, HOP_SIZE, NUM_COLUMNS)
+    assert spectrum.add(np.ones((WINDOW_SIZE - 1, 2))) == 0
+    assert spectrum.get_columns() is None
+    assert spectrum.add(np.ones((1, 2))) == 1
+    columns = spectrum.get_columns()
+    assert columns.shape == (NUM_COLUMNS, 2, WINDOW_SIZE // 2 + 1)
+    assert np.isnan(columns[:-1]).all()
+    assert not np.isnan(columns[-1]).any()
@@ -0,0 +1,86 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import numpy as np
+import pytest
+
+from hermes.gui.widgets.stream_health import StreamStatistics
+
+
+def _make_statistics(**kwargs) -> StreamStatistics:
+    return StreamStatistics(
+        **{"declared_rate_hz": 100.0, "alpha": 0.1, "gap_factor": 2.5, **kwargs}
+    )
+
+
+def test_rate_converges_to_the_arrival_rate_without_jitter():
+    statistics = _make_statistics()
+    for i in range(200):
+        statistics.update(i / 50)
+    assert statistics.num_packets == 200
+    assert statistics.rate_hz == pytest.approx(50.0)
+    assert statistics.jitter_s == pytest.approx(0.0, abs=1e-9)
+    # Every arrival is 2x the declared period, under the gap factor.
+    assert statistics.num_gaps == 0
+
+
+def test_jitter_and_gaps_of_irregular_arrivals():
+    statistics = _make_statistics(alpha=0.01)
+    arrival_s = np.cumsum(np.tile([0.005, 0.015], 500))
+    for t in arrival_s:
+        statistics.update(float(t))
+    assert statistics.rate_hz == pytest.approx(100.0, rel=0.05)
+    assert statistics.jitter_s == pytest.approx(0.005, rel=0.1)
+    statistics.update(float(arrival_s[-1]) + 0.1)
+    assert statistics.num_gaps == 1
+
+
+def test_relay_rate_caps_the_expected_rate():
+    assert _make_statistics(max_rate_hz=30.0).expected_rate_hz == 30.0
+    assert _make_statistics(max_rate_hz=300.0).expected_rate_hz == 100.0
+    assert (
+        _make_statistics(declared_rate_hz=0.0, max_rate_hz=30.0).expected_rate_hz
+        == 30.0
+    )
+
+
+def test_latency_is_measured_at_the_first_display_of_a_sample():
+    statistics = _make_statistics(alpha=0.5)
+    statistics.on_render(1.0)
+    assert statistics.mean_latency_s is None
+    # Sub-stream values are arrays, the newest timestamp counts.
+    statistics.update(10.0, np.array([[9.0], [9.9]]))
+    statistics.on_render(10.1)
+    assert statistics.mean_latency_s == pytest.approx(0.2)
+    # Re-rendering the same sample, e.g. for another client, is not a new measurement.
+    statistics.on_render(12.0)
+    assert statistics.mean_latency_s == pytest.approx(0.2)
+    statistics.update(11.0, 10.8)
+    statistics.on_render(11.4)
+    assert statistics.mean_latency_s == pytest.approx(0.4)
+    assert isinstance(statistics.mean_latency_s, float)
+    assert round(1000 * statistics.mean_latency_s, 1) == 400.0
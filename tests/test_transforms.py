@@ -0,0 +1,121 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import numpy as np
+import pytest
+
+from hermes.gui import transforms
+from hermes.gui.transforms import (
+    MovingRms,
+    SosFilter,
+    Transform,
+    build_transform_chain,
+)
+
+# 2nd-order low-pass sections, as designed by `scipy.signal.butter(4, 10, fs=100, output="sos")`.
+SOS = np.array(
+    [
+        [0.00482434335771623, 0.00964868671543246, 0.00482434335771623]
+        + [1.0, -1.0485995763626117, 0.2961403575616696],
+        [1.0, 2.0, 1.0, 1.0, -1.3209134308194264, 0.6327387928852766],
+    ]
+)
+
+
+def _signal(num_samples: int = 500, num_channels: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((num_samples, num_channels)) + np.arange(num_channels)
+
+
+def _apply_in_chunks(transform, x: np.ndarray, chunk_sizes: list[int]) -> np.ndarray:
+    bounds = np.cumsum([0] + chunk_sizes)
+    return np.concatenate([transform(x[a:b]) for a, b in zip(bounds[:-1], bounds[1:])])
+
+
+CHUNK_SIZES = [1, 7, 64, 3, 125, 300]
+
+
+def test_sos_filter_is_the_same_in_chunks():
+    pytest.importorskip("scipy")
+    x = _signal()
+    y = SosFilter(SOS)(x)
+    np.testing.assert_allclose(_apply_in_chunks(SosFilter(SOS), x, CHUNK_SIZES), y)
+
+
+def test_sos_filter_requires_scipy(monkeypatch):
+    monkeypatch.setattr(transforms, "IS_SCIPY_AVAILABLE", False)
+    with pytest.raises(ImportError):
+        SosFilter(SOS)
+
+
+def test_sos_filter_starts_at_rest():
+    pytest.importorskip("scipy")
+    x = np.full((50, 2), 3.0)
+    np.testing.assert_allclose(SosFilter(SOS)(x), x)
+
+
+def test_moving_rms_is_the_same_in_chunks():
+    x = _signal()
+    y = MovingRms(window_size=20)(x)
+    np.testing.assert_allclose(
+        _apply_in_chunks(MovingRms(window_size=20), x, CHUNK_SIZES), y
+    )
+    expected = [
+        np.sqrt(np.mean(np.square(x[max(0, n - 19) : n + 1]), axis=0))
+        for n in range(len(x))
+    ]
+    np.testing.assert_allclose(y, expected)
+
+
+def test_chain_is_the_same_in_chunks_and_after_reset():
+    pytest.importorskip("scipy")
+    specs = [
+        {"type": "sos", "sos": SOS},
+        {"type": "rms", "window_size": 10},
+        {"type": "magnitude"},
+        {"type": "scale", "gain": 2.0},
+    ]
+    x = _signal()
+    chain = build_transform_chain(specs)
+    y = chain(x)
+    assert y.shape == (len(x), 1)
+    assert chain.get_num_channels(3) == 1
+    chain.reset()
+    np.testing.assert_allclose(_apply_in_chunks(chain, x, CHUNK_SIZES), y)
+
+
+def test_transform_must_implement_call():
+    class Identity(Transform):
+        pass
+
+    with pytest.raises(TypeError):
+        Identity()
+
+
+def test_unknown_transform_is_rejected():
+    with pytest.raises(ValueError):
+        build_transform_chain([{"type": "fft"}])
@@ -0,0 +1,82 @@
+############
+#
+# Copyright (c) 2024-2026 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+import numpy as np
+
+from hermes.gui.widgets import Visualizer
+
+TIME_S = [0.0, 1.0, 2.0, 3.0]
+DATA = [np.array([0.0]), np.array([10.0]), np.array([20.0]), np.array([30.0])]
+
+
+def test_align_to_time_picks_the_nearest_sample():
+    assert Visualizer._align_to_time(TIME_S, DATA, 1.4)[0] == 10.0
+    assert Visualizer._align_to_time(TIME_S, DATA, 1.6)[0] == 20.0
+    assert Visualizer._align_to_time(TIME_S, DATA, 2.0)[0] == 20.0
+
+
+def test_align_to_time_interpolates():
+    aligned = Visualizer._align_to_time(TIME_S, DATA, 1.25, is_interpolate=True)
+    np.testing.assert_allclose(aligned, [12.5])
+
+
+def test_align_to_time_is_none_out_of_range():
+    assert Visualizer._align_to_time(TIME_S, DATA, -0.5) is None
+    assert Visualizer._align_to_time(TIME_S, DATA, 3.5) is None
+    assert Visualizer._align_to_time(TIME_S, DATA, -0.5, tolerance_s=1.0)[0] == 0.0
+    assert Visualizer._align_to_time(TIME_S, DATA, 3.5, tolerance_s=1.0)[0] == 30.0
+
+
+class _BufferedStream:
+    """Stand-in of the `Stream` API read by the widgets, counting the samples copied."""
+
+    def __init__(self, time_s: list[float]):
+        self._time_s = time_s
+        self.num_copied = 0
+
+    def get_data(
+        self, device_name, stream_name, starting_index=None, ending_index=None
+    ):
+        time_s = self._time_s[starting_index:ending_index]
+        self.num_copied += len(time_s)
+        return {"time_s": time_s, "data": [np.array([t]) for t in time_s]}
+
+
+def test_count_samples_after_matches_bisection():
+    time_s = [i / 10 for i in range(1000)]
+    for reference_time_s in [-1.0, 0.0, 12.34, 50.0, 99.85, 99.9, 150.0]:
+        for num_timesteps in [None, 1, 10, 500, 2000]:
+            stream = _BufferedStream(time_s)
+            num_after = Visualizer._count_samples_after(
+                stream, "dev", "gaze", reference_time_s, num_timesteps
+            )
+            expected = sum(t >= reference_time_s for t in time_s)
+            if num_timesteps is not None:
+                expected = min(expected, num_timesteps)
+            assert num_after == expected
+            # Probes single timestamps only, logarithmically many.
+            assert stream.num_copied <= 2 * np.log2(len(time_s)) + 2